@@ -0,0 +1,149 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+# 업로드/트랜스코딩 동시 실행 제한 (admission control)
+# - 동시 실행 수와 처리 중 바이트 합계가 한도를 넘으면 FIFO 대기열에서 대기
+# - 대기열이 가득 차거나 대기 시간이 초과되면 AdmissionRejected (429 + Retry-After)
+# - Retry-After는 최근 처리 시간 평균과 대기열 길이로 추정
+# - 크기를 미리 모르는 요청(chunked 본문)은 작게 예약하고 받은 만큼 Reservation.charge로 늘림
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, name, reason, retry_after):
+        super().__init__(f"{name} is saturated ({reason})")
+        self.name = name
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+# 입장한 요청의 바이트 예약 (slot()이 돌려줌)
+class Reservation:
+    def __init__(self, controller, nbytes):
+        self.controller = controller
+        self.nbytes = nbytes
+
+    # 실제 크기가 예약을 넘으면 차이만큼 처리 중 바이트에 더함
+    # 이미 입장한 요청은 기다리지 않고, 늘어난 합계는 이후 입장 판단에 반영
+    def charge(self, nbytes):
+        if nbytes > self.nbytes:
+            self.controller.inflight_bytes += nbytes - self.nbytes
+            self.nbytes = nbytes
+
+
+class AdmissionController:
+    def __init__(self, name, max_active, max_bytes=None, max_queue=0, queue_timeout=30.0, retry_after=5):
+        self.name = name
+        self.max_active = max_active
+        self.max_bytes = max_bytes
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.inflight_bytes = 0
+        self.waiters = deque()
+        # 지표
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = {}
+        self.max_queue_depth = 0
+        self.wait_seconds = 0.0
+        self.avg_hold_seconds = None
+
+    def _fits(self, nbytes):
+        if self.active >= self.max_active:
+            return False
+        # 한도보다 큰 요청 하나는 혼자 처리되도록 허용
+        return not self.max_bytes or self.inflight_bytes == 0 or self.inflight_bytes + nbytes <= self.max_bytes
+
+    def _take(self, nbytes):
+        self.active += 1
+        self.inflight_bytes += nbytes
+        self.admitted += 1
+
+    def _reject(self, reason):
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        return AdmissionRejected(self.name, reason, self.estimate_retry_after())
+
+    def estimate_retry_after(self):
+        if not self.avg_hold_seconds:
+            return self.retry_after
+        rounds = (len(self.waiters) + 1) / self.max_active
+        return max(1, math.ceil(self.avg_hold_seconds * rounds))
+
+    # 대기열 앞에서부터 들어갈 수 있는 만큼 입장 (순서 유지를 위해 앞이 막히면 중단)
+    def _wake(self):
+        while self.waiters:
+            future, nbytes = self.waiters[0]
+            if future.done():
+                self.waiters.popleft()
+                continue
+            if not self._fits(nbytes):
+                break
+            self.waiters.popleft()
+            self._take(nbytes)
+            future.set_result(None)
+
+    async def acquire(self, nbytes=0):
+        if not self.waiters and self._fits(nbytes):
+            self._take(nbytes)
+            return
+        if len(self.waiters) >= self.max_queue:
+            raise self._reject("queue_full")
+        entry = (asyncio.get_running_loop().create_future(), nbytes)
+        self.waiters.append(entry)
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, len(self.waiters))
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(entry[0], self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._reject("timeout")
+        except asyncio.CancelledError:
+            # 입장 직후 취소되면 자리를 돌려줌
+            if entry[0].done() and not entry[0].cancelled():
+                self.release(nbytes)
+            raise
+        finally:
+            self.wait_seconds += time.monotonic() - started
+            if entry in self.waiters:
+                self.waiters.remove(entry)
+
+    def release(self, nbytes=0, held_seconds=None):
+        self.active -= 1
+        self.inflight_bytes -= nbytes
+        if held_seconds is not None:
+            # 지수 이동 평균
+            if self.avg_hold_seconds is None:
+                self.avg_hold_seconds = held_seconds
+            else:
+                self.avg_hold_seconds = 0.8 * self.avg_hold_seconds + 0.2 * held_seconds
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, nbytes=0):
+        await self.acquire(nbytes)
+        reservation = Reservation(self, nbytes)
+        started = time.monotonic()
+        try:
+            yield reservation
+        finally:
+            self.release(reservation.nbytes, time.monotonic() - started)
+
+    def stats(self):
+        return {
+            "active": self.active,
+            "max_active": self.max_active,
+            "inflight_bytes": self.inflight_bytes,
+            "max_bytes": self.max_bytes,
+            "queue_depth": len(self.waiters),
+            "max_queue": self.max_queue,
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": dict(self.rejected),
+            "wait_seconds": round(self.wait_seconds, 3),
+            "avg_hold_seconds": round(self.avg_hold_seconds, 3) if self.avg_hold_seconds else None,
+        }
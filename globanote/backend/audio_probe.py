@@ -0,0 +1,201 @@
+import struct
+
+# 업로드 첫 몇 KB만으로 오디오 컨테이너 판별 / 길이·샘플레이트 추정
+# 지원: RIFF/WAVE, fLaC, OggS(Vorbis/Opus), ID3 + MPEG 오디오 프레임
+
+PROBE_BYTES = 8192
+
+MPEG_BITRATES = {
+    # (version, layer) -> kbps 표 (인덱스 1~14)
+    (1, 1): [32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+MPEG_SAMPLE_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000], 2.5: [11025, 12000, 8000]}
+
+
+def sniff_format(header):
+    if len(header) >= 12 and header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return "wav"
+    if header[:4] == b"fLaC":
+        return "flac"
+    if header[:4] == b"OggS":
+        return "ogg"
+    if header[:3] == b"ID3" or find_mpeg_frame(header, 0) is not None:
+        return "mp3"
+    return None
+
+
+def probe_wav(header, total_size):
+    info = {"format": "wav"}
+    pos = 12
+    byte_rate = None
+    while pos + 8 <= len(header):
+        chunk_id = header[pos:pos + 4]
+        chunk_size = struct.unpack("<I", header[pos + 4:pos + 8])[0]
+        if chunk_id == b"fmt " and pos + 24 <= len(header):
+            _, channels, sample_rate, byte_rate, _, bits = struct.unpack(
+                "<HHIIHH", header[pos + 8:pos + 24]
+            )
+            info.update(channels=channels, sample_rate=sample_rate, bits_per_sample=bits)
+        elif chunk_id == b"data":
+            # 스트리밍 녹음은 data 크기가 0 또는 0xFFFFFFFF일 수 있음
+            data_size = chunk_size
+            if data_size in (0, 0xFFFFFFFF) and total_size:
+                data_size = total_size - pos - 8
+            if byte_rate:
+                info["duration"] = data_size / byte_rate
+            break
+        pos += 8 + chunk_size + (chunk_size & 1)
+    return info
+
+
+def probe_flac(header, total_size):
+    info = {"format": "flac"}
+    # 첫 메타데이터 블록은 항상 STREAMINFO
+    if len(header) >= 8 + 34 and header[4] & 0x7F == 0:
+        streaminfo = header[8:8 + 34]
+        packed = int.from_bytes(streaminfo[10:18], "big")
+        sample_rate = packed >> 44
+        channels = ((packed >> 41) & 0x7) + 1
+        bits = ((packed >> 36) & 0x1F) + 1
+        total_samples = packed & 0xFFFFFFFFF
+        info.update(channels=channels, sample_rate=sample_rate, bits_per_sample=bits)
+        if sample_rate and total_samples:
+            info["duration"] = total_samples / sample_rate
+    return info
+
+
+def probe_ogg(header, total_size):
+    info = {"format": "ogg"}
+    if len(header) < 27:
+        return info
+    segments = header[26]
+    packet = header[27 + segments:]
+    if packet[:7] == b"\x01vorbis" and len(packet) >= 28:
+        channels = packet[11]
+        sample_rate, _, nominal, _ = struct.unpack("<IiiI", packet[12:28])
+        info.update(codec="vorbis", channels=channels, sample_rate=sample_rate)
+        if nominal > 0 and total_size:
+            info["duration"] = total_size * 8 / nominal
+    elif packet[:8] == b"OpusHead" and len(packet) >= 16:
+        channels = packet[9]
+        sample_rate = struct.unpack("<I", packet[12:16])[0]
+        # Opus는 항상 48kHz로 디코딩
+        info.update(codec="opus", channels=channels, sample_rate=sample_rate or 48000)
+    return info
+
+
+# 연속된 두 프레임 헤더가 맞을 때만 MPEG 프레임으로 인정 (임의 데이터 오탐 방지)
+# 다음 프레임이 버퍼 밖이라 확인할 수 없으면 후보에서 제외
+# (allow_truncated: ID3 태그로 이미 mp3임을 알 때만 확인 없이 인정)
+def find_mpeg_frame(data, start, allow_truncated=False):
+    for pos in range(start, len(data) - 4):
+        if data[pos] == 0xFF and data[pos + 1] & 0xE0 == 0xE0:
+            frame = parse_mpeg_frame(data[pos:pos + 4])
+            if not frame:
+                continue
+            next_pos = pos + frame["length"]
+            if next_pos + 4 > len(data):
+                if allow_truncated:
+                    return pos, frame
+                continue
+            if not parse_mpeg_frame(data[next_pos:next_pos + 4]):
+                continue
+            return pos, frame
+    return None
+
+
+def parse_mpeg_frame(raw):
+    if raw[0] != 0xFF or raw[1] & 0xE0 != 0xE0:
+        return None
+    b1, b2, b3 = raw[1], raw[2], raw[3]
+    version = {3: 1, 2: 2, 0: 2.5}.get((b1 >> 3) & 0x3)
+    layer = {3: 1, 2: 2, 1: 3}.get((b1 >> 1) & 0x3)
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0x3
+    if version is None or layer is None or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    table = MPEG_BITRATES[(1 if version == 1 else 2, layer)]
+    bitrate = table[bitrate_index - 1] * 1000
+    sample_rate = MPEG_SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 0x1
+    if layer == 1:
+        length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 3 and version != 1:
+        length = 72 * bitrate // sample_rate + padding
+    else:
+        length = 144 * bitrate // sample_rate + padding
+    return {
+        "version": version,
+        "layer": layer,
+        "bitrate": bitrate,
+        "sample_rate": sample_rate,
+        "channels": 1 if (b3 >> 6) == 3 else 2,
+        "length": length,
+    }
+
+
+def probe_mp3(header, total_size):
+    info = {"format": "mp3"}
+    pos = 0
+    if header[:3] == b"ID3" and len(header) >= 10:
+        # ID3v2 크기는 syncsafe 정수
+        size = 0
+        for b in header[6:10]:
+            size = (size << 7) | (b & 0x7F)
+        pos = 10 + size
+        info["id3_size"] = pos
+        if pos >= len(header):
+            # 태그가 프로브 범위보다 크면 프레임 확인은 생략
+            return info
+    found = find_mpeg_frame(header, pos, allow_truncated="id3_size" in info)
+    if not found:
+        info["format"] = None
+        return info
+    frame_pos, frame = found
+    info.update(
+        sample_rate=frame["sample_rate"], channels=frame["channels"], bitrate=frame["bitrate"]
+    )
+    # VBR 파일은 Xing/Info 헤더의 프레임 수로 정확한 길이 계산
+    samples_per_frame = 1152 if frame["layer"] != 1 else 384
+    if frame["version"] != 1 and frame["layer"] == 3:
+        samples_per_frame = 576
+    for tag in (b"Xing", b"Info"):
+        tag_pos = header.find(tag, frame_pos, frame_pos + 64)
+        if tag_pos != -1 and tag_pos + 12 <= len(header):
+            flags = struct.unpack(">I", header[tag_pos + 4:tag_pos + 8])[0]
+            if flags & 0x1:
+                frames = struct.unpack(">I", header[tag_pos + 8:tag_pos + 12])[0]
+                info["duration"] = frames * samples_per_frame / frame["sample_rate"]
+                return info
+    if total_size:
+        info["duration"] = (total_size - frame_pos) * 8 / frame["bitrate"]
+    return info
+
+
+PROBES = {"wav": probe_wav, "flac": probe_flac, "ogg": probe_ogg, "mp3": probe_mp3}
+
+
+# 헤더 바이트 -> {"format", "sample_rate", "channels", "duration", ...}, 판별 불가 시 format None
+def probe_header(header, total_size=None):
+    audio_format = sniff_format(header)
+    if audio_format is None:
+        return {"format": None}
+    return PROBES[audio_format](header, total_size)
+
+
+# 프로브 결과로 처리 경로 결정: direct / transcode / split
+# 변환 필요 여부를 먼저 판단 (긴 파일도 지원하지 않는 샘플레이트면 변환 후 분할)
+def choose_pipeline(probe, convert_to_mp3=False, split_min_seconds=None):
+    sample_rate = probe.get("sample_rate")
+    # Transcribe 지원 범위(8~48kHz)를 벗어나면 변환
+    if convert_to_mp3 or (sample_rate and not 8000 <= sample_rate <= 48000):
+        return "transcode"
+    duration = probe.get("duration")
+    if split_min_seconds and duration and duration >= split_min_seconds:
+        return "split"
+    return "direct"
@@ -0,0 +1,52 @@
+import threading
+import time
+
+# boto3 클라이언트 지연 생성
+# - import 시점에는 설정 여부만 확인하고, 첫 사용(속성 접근) 때 한 번만 생성 (잠금으로 중복 생성 방지)
+# - boto3 import 자체도 첫 생성 때 수행 (콜드 스타트에서 제외)
+# - 기본 세션은 스레드 안전하지 않으므로 클라이언트마다 별도 Session 사용
+# - 생성된 클라이언트는 스레드 간 공유해도 안전함
+# - 색인처럼 import 시점에 만들면 안 되는 다른 객체에도 같은 방식으로 사용
+
+
+class LazyClient:
+    def __init__(self, name, factory, on_build=None):
+        self._name = name
+        self._factory = factory
+        self._on_build = on_build
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def built(self):
+        return self._client is not None
+
+    def get(self):
+        client = self._client
+        if client is None:
+            with self._lock:
+                if self._client is None:
+                    started = time.perf_counter()
+                    self._client = self._factory()
+                    if self._on_build:
+                        self._on_build(self._name, time.perf_counter() - started)
+                client = self._client
+        return client
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
+
+    def __repr__(self):
+        return f"<LazyClient {self._name} {'built' if self.built else 'pending'}>"
+
+
+def new_session(access_key, secret_key, region):
+    import boto3
+
+    return boto3.session.Session(
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+        region_name=region,
+    )
@@ -1,18 +1,100 @@
 import os
+import hmac
+import hashlib
 import uuid
 import json
-import boto3
+import re
 import tempfile
-import shutil
-import requests
 import base64
+import asyncio
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
-from contextlib import asynccontextmanager
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Body, Request
+from typing import Optional
+from contextlib import asynccontextmanager, contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import (
+    APIRouter,
+    FastAPI,
+    HTTPException,
+    Body,
+    Depends,
+    Header,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, FileResponse, RedirectResponse
 from botocore.exceptions import ClientError
 import logging
 from dotenv import load_dotenv
+from transcript_format import (
+    sec2str,
+    build_turns,
+    render_turn,
+    format_transcript,
+    build_segment_index,
+    select_turn_range,
+    slice_turns,
+)
+from search_index import SearchIndex
+from vector_index import VectorIndex, HashingEmbedder, BedrockEmbedder
+from split_transcribe import (
+    probe_duration,
+    detect_silences,
+    plan_chunks,
+    extract_chunk,
+    stitch_results,
+)
+from vad import remap_transcript, trim_silence_file
+from audio_probe import PROBE_BYTES, probe_header, choose_pipeline
+from upload_stream import UploadRejected, receive_upload
+from admission import AdmissionController, AdmissionRejected
+from pipeline_queue import PipelineQueue, RetryLater, PermanentError
+from storage import S3Storage, LocalStorage, StorageNotFound
+from local_transcribe import LocalTranscribeClient
+from http_cache import make_etag, content_hash, etag_matches, not_modified, json_response
+from metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    Registry,
+    InstrumentedProxy,
+    instrument_boto_client,
+    timed,
+)
+from tracing import create_tracer, TracedProxy, TracingMiddleware, trace_boto_client
+from profiler import (
+    AllocationTracker,
+    LoopLagMonitor,
+    ProfileBusy,
+    Profiler,
+    ProfilingMiddleware,
+    runtime_stats,
+)
+from streaming import (
+    AudioArchiver,
+    FakeStreamingRecognizer,
+    TranscribeStreamingRecognizer,
+)
+from aws_clients import LazyClient, new_session
+from startup import StartupReport
+from index_lock import lock_index_dirs
+from usage import (
+    ANONYMOUS_USER,
+    TRANSCRIBE_MODEL,
+    TRANSCRIBE_STREAMING_MODEL,
+    UsageAccumulator,
+    current_user,
+    summarize_usage,
+    usage_day,
+    usage_user,
+    write_usage_item,
+)
+
+# 콜드 스타트 구간 기록 (STARTUP_TARGET_SECONDS를 넘으면 경고)
+startup_report = StartupReport(float(os.getenv("STARTUP_TARGET_SECONDS", "0")) or None)
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -31,39 +113,271 @@ LOCAL_STORAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "te
 os.makedirs(LOCAL_STORAGE_DIR, exist_ok=True)
 logger.info(f"Local storage directory: {LOCAL_STORAGE_DIR}")
 
-# S3 클라이언트 초기화
-s3_client = None
-if AWS_ACCESS_KEY and AWS_SECRET_KEY and S3_BUCKET:
-    s3_client = boto3.client(
-        "s3",
-        aws_access_key_id=AWS_ACCESS_KEY,
-        aws_secret_access_key=AWS_SECRET_KEY,
-        region_name=AWS_REGION,
+# 단계별 지연/오류 메트릭 (/metrics, Prometheus 텍스트 형식)
+metrics = Registry()
+STAGE_SECONDS = metrics.histogram(
+    "globanote_stage_seconds", "Time spent in each processing stage", ["stage"]
+)
+STAGE_ERRORS = metrics.counter(
+    "globanote_stage_errors_total", "Processing stage failures", ["stage"]
+)
+STORAGE_SECONDS = metrics.histogram(
+    "globanote_storage_seconds", "Storage operation latency", ["backend", "operation"]
+)
+STORAGE_ERRORS = metrics.counter(
+    "globanote_storage_errors_total", "Storage operation failures", ["backend", "operation"]
+)
+TRANSCRIBE_SECONDS = metrics.histogram(
+    "globanote_transcribe_call_seconds", "Transcribe API call latency", ["backend", "operation"]
+)
+TRANSCRIBE_ERRORS = metrics.counter(
+    "globanote_transcribe_call_errors_total", "Transcribe API call failures", ["backend", "operation"]
+)
+AWS_CALL_SECONDS = metrics.histogram(
+    "globanote_aws_call_seconds", "AWS API call latency (S3, DynamoDB, Bedrock)", ["service", "operation"]
+)
+AWS_CALL_ERRORS = metrics.counter(
+    "globanote_aws_call_errors_total", "AWS API call failures", ["service", "operation"]
+)
+BEDROCK_TOKENS = metrics.counter(
+    "globanote_bedrock_tokens_total", "Bedrock tokens by model and direction", ["model", "direction"]
+)
+UPLOAD_BYTES = metrics.counter(
+    "globanote_upload_bytes_total", "Audio bytes received by the API server", ["source"]
+)
+
+
+# 작업(job_id) 단위 추적 (TRACE_EXPORTER=console,file 이면 활성화, 기본은 끔)
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none")
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join(LOCAL_STORAGE_DIR, "traces.jsonl"))
+tracer = create_tracer(TRACE_EXPORTER, TRACE_FILE)
+
+
+# 처리 단계: 지연 메트릭 + trace span
+@contextmanager
+def stage(name):
+    with tracer.span(name), timed(STAGE_SECONDS, STAGE_ERRORS, stage=name):
+        yield
+
+
+def record_bedrock_usage(model, response, user_id=ANONYMOUS_USER):
+    usage = response.get("usage") or {}
+    tracer.annotate(
+        input_tokens=usage.get("inputTokens"), output_tokens=usage.get("outputTokens")
+    )
+    usage_tracker.add(
+        user_id,
+        model,
+        calls=1,
+        input_tokens=usage.get("inputTokens", 0),
+        output_tokens=usage.get("outputTokens", 0),
+    )
+    if usage.get("inputTokens"):
+        BEDROCK_TOKENS.inc(usage["inputTokens"], model=model, direction="input")
+    if usage.get("outputTokens"):
+        BEDROCK_TOKENS.inc(usage["outputTokens"], model=model, direction="output")
+
+
+# 임베딩 호출 사용량 (BedrockEmbedder.on_usage, 사용자는 usage_user로 설정한 현재 사용자)
+def record_embedding_usage(model, calls, input_tokens):
+    usage_tracker.add(current_user.get(), model, calls=calls, input_tokens=input_tokens)
+    if input_tokens:
+        BEDROCK_TOKENS.inc(input_tokens, model=model, direction="input")
+
+# 사용자/일/모델별 사용량 (usage.py): 메모리에서 합산 후 USAGE_FLUSH_SECONDS마다 DynamoDB에 ADD
+USAGE_TABLE = os.getenv("USAGE_TABLE", f"{DYNAMODB_TABLE}-usage" if DYNAMODB_TABLE else "")
+USAGE_FLUSH_SECONDS = float(os.getenv("USAGE_FLUSH_SECONDS", "60"))
+# 예상 비용 계산용 단가 (JSON): {"모델 ID": {"input_per_1k_tokens": .., "output_per_1k_tokens": ..},
+#                             "transcribe"/"transcribe-streaming": {"per_audio_minute": ..}}
+USAGE_PRICES = json.loads(os.getenv("USAGE_PRICES") or "{}")
+usage_tracker = UsageAccumulator(flush_interval=USAGE_FLUSH_SECONDS)
+
+
+# 사용량 집계용 사용자 (폼/본문의 user_id 또는 X-User-Id 헤더)
+def request_user(request, fields=None):
+    user_id = (fields or {}).get("user_id") or request.headers.get("x-user-id")
+    return str(user_id)[:128] if user_id else ANONYMOUS_USER
+
+
+# AWS 클라이언트: 설정 여부만 확인하고 실제 생성은 첫 사용 때 (aws_clients.LazyClient)
+def new_aws_client(service):
+    client = new_session(AWS_ACCESS_KEY, AWS_SECRET_KEY, AWS_REGION).client(service)
+    instrument_boto_client(client, AWS_CALL_SECONDS, AWS_CALL_ERRORS)
+    return trace_boto_client(client, tracer)
+
+
+def new_dynamodb_resource():
+    resource = new_session(AWS_ACCESS_KEY, AWS_SECRET_KEY, AWS_REGION).resource("dynamodb")
+    instrument_boto_client(resource.meta.client, AWS_CALL_SECONDS, AWS_CALL_ERRORS)
+    trace_boto_client(resource.meta.client, tracer)
+    return resource
+
+
+def record_client_init(name, seconds):
+    startup_report.record(f"client:{name}", seconds)
+    logger.info(f"AWS client initialized: {name} ({seconds * 1000:.0f}ms)")
+
+
+def lazy_aws_client(name, factory):
+    return LazyClient(name, factory, on_build=record_client_init)
+
+
+AWS_CONFIGURED = bool(AWS_ACCESS_KEY and AWS_SECRET_KEY)
+s3_client = (
+    lazy_aws_client("s3", lambda: new_aws_client("s3"))
+    if AWS_CONFIGURED and S3_BUCKET
+    else None
+)
+dynamodb = lazy_aws_client("dynamodb", new_dynamodb_resource) if AWS_CONFIGURED else None
+bedrock_runtime = (
+    lazy_aws_client("bedrock-runtime", lambda: new_aws_client("bedrock-runtime"))
+    if AWS_CONFIGURED
+    else None
+)
+# 프롬프트 관리의 프롬프트 조회용 (요약 사용량에 기록할 모델 ID)
+bedrock_agent = (
+    lazy_aws_client("bedrock-agent", lambda: new_aws_client("bedrock-agent"))
+    if AWS_CONFIGURED
+    else None
+)
+transcribe_aws_client = lazy_aws_client("transcribe", lambda: new_aws_client("transcribe"))
+# 요청을 받기 시작한 뒤 백그라운드에서 미리 생성 (첫 요청이 생성 비용을 내지 않도록)
+AWS_CLIENT_PREWARM = os.getenv("AWS_CLIENT_PREWARM", "true").lower() == "true"
+
+
+def prewarm_aws_clients():
+    for client in (s3_client, dynamodb, bedrock_runtime):
+        if client:
+            try:
+                client.get()
+            except Exception as e:
+                logger.error(f"AWS client prewarm failed: {str(e)}")
+
+
+startup_report.mark("config")
+
+# 저장소 작업별 지연 기록 (없는 키 조회는 정상 흐름이므로 오류로 세지 않음)
+def instrumented_storage(target):
+    return InstrumentedProxy(
+        TracedProxy(target, tracer, f"storage.{target.kind}", ignore=(StorageNotFound,)),
+        STORAGE_SECONDS,
+        STORAGE_ERRORS,
+        ignore=(StorageNotFound,),
+        backend=target.kind,
+    )
+
+
+# 저장소: S3가 설정되지 않으면 LOCAL_STORAGE_DIR 아래 로컬 파일시스템 (키 구조는 동일)
+storage = instrumented_storage(
+    S3Storage(s3_client, S3_BUCKET)
+    if s3_client and S3_BUCKET
+    else LocalStorage(LOCAL_STORAGE_DIR)
+)
+
+# TRANSCRIBE_BACKEND=local: 합성 결과를 저장소에 쓰는 로컬 대용 (S3 미설정 시 기본값)
+TRANSCRIBE_BACKEND = os.getenv(
+    "TRANSCRIBE_BACKEND", "aws" if storage.kind == "s3" else "local"
+)
+local_transcribe_client = None
+if TRANSCRIBE_BACKEND == "local":
+    local_transcribe_client = LocalTranscribeClient(
+        storage, delay=float(os.getenv("LOCAL_TRANSCRIBE_DELAY", "0"))
     )
+logger.info(f"Storage: {storage.kind}, Transcribe backend: {TRANSCRIBE_BACKEND}")
+startup_report.mark("storage")
 
-# DynamoDB 클라이언트 초기화
-dynamodb = None
-if AWS_ACCESS_KEY and AWS_SECRET_KEY:
-    dynamodb = boto3.resource(
-        "dynamodb",
-        aws_access_key_id=AWS_ACCESS_KEY,
-        aws_secret_access_key=AWS_SECRET_KEY,
-        region_name=AWS_REGION,
+# Transcribe 클라이언트 (AWS 클라이언트는 프로세스에서 하나를 공유)
+def get_transcribe_client():
+    if local_transcribe_client:
+        client = TracedProxy(local_transcribe_client, tracer, "transcribe.local")
+    else:
+        client = transcribe_aws_client
+    return InstrumentedProxy(
+        client, TRANSCRIBE_SECONDS, TRANSCRIBE_ERRORS, backend=TRANSCRIBE_BACKEND
     )
 
-# Bedrock 클라이언트 초기화
-bedrock_runtime = None
-if AWS_ACCESS_KEY and AWS_SECRET_KEY:
+# 색인은 처음 사용할 때 로드 (backend를 import만 하는 backfill 등이 색인 잠금 없이 색인 파일을
+# 열거나 잘라내지 않도록), 서버는 lifespan에서 잠금을 얻은 뒤 바로 로드
+def record_index_load(name, seconds):
+    startup_report.record(name, seconds)
+    logger.info(f"Index loaded: {name} ({seconds * 1000:.0f}ms)")
+
+
+def lazy_index(name, factory):
+    return LazyClient(name, factory, on_build=record_index_load)
+
+
+# 트랜스크립트/요약 전문 검색 인덱스
+SEARCH_INDEX_DIR = os.getenv(
+    "SEARCH_INDEX_DIR", os.path.join(LOCAL_STORAGE_DIR, "search_index")
+)
+search_index = lazy_index("search_index", lambda: SearchIndex(SEARCH_INDEX_DIR))
+
+
+def update_search_index(job_id, turns=None, summary=None):
     try:
-        bedrock_runtime = boto3.client(
-            service_name="bedrock-runtime",
-            region_name=AWS_REGION,
-            aws_access_key_id=AWS_ACCESS_KEY,
-            aws_secret_access_key=AWS_SECRET_KEY,
-        )
-        logger.info("Bedrock client initialized successfully")
+        with stage("search_index"):
+            if turns is not None:
+                search_index.index_transcript(job_id, turns)
+            if summary:
+                search_index.index_summary(job_id, summary)
+    except Exception as e:
+        logger.error(f"Error updating search index: {str(e)}")
+
+
+# 회의 챗봇용 트랜스크립트 청크 벡터 인덱스
+VECTOR_INDEX_DIR = os.getenv(
+    "VECTOR_INDEX_DIR", os.path.join(LOCAL_STORAGE_DIR, "vector_index")
+)
+VECTOR_INDEX_MMAP = os.getenv("VECTOR_INDEX_MMAP", "false").lower() == "true"
+EMBEDDING_PROVIDER = os.getenv(
+    "EMBEDDING_PROVIDER", "bedrock" if bedrock_runtime else "hashing"
+)
+CHATBOT_MODEL_ID = os.getenv(
+    "CHATBOT_MODEL_ID", "anthropic.claude-3-haiku-20240307-v1:0"
+)
+
+
+def create_embedder():
+    if EMBEDDING_PROVIDER == "bedrock" and bedrock_runtime:
+        return BedrockEmbedder(bedrock_runtime, on_usage=record_embedding_usage)
+    return HashingEmbedder()
+
+
+vector_index = lazy_index(
+    "vector_index",
+    lambda: VectorIndex(VECTOR_INDEX_DIR, create_embedder(), mmap=VECTOR_INDEX_MMAP),
+)
+
+# 전사 이후 단계(결과 대기 -> 저장 -> 임베딩/요약)를 처리하는 내구성 작업 큐
+PIPELINE_DB_PATH = os.getenv(
+    "PIPELINE_DB_PATH", os.path.join(LOCAL_STORAGE_DIR, "pipeline.db")
+)
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "4"))
+PIPELINE_MAX_ATTEMPTS = int(os.getenv("PIPELINE_MAX_ATTEMPTS", "5"))
+# 실행 중 갱신이 이 시간 넘게 끊긴 작업은 죽은 워커의 것으로 보고 다시 실행
+PIPELINE_LEASE_SECONDS = float(os.getenv("PIPELINE_LEASE_SECONDS", "300"))
+# Transcribe 작업이 진행 중일 때 다시 확인하는 간격
+PIPELINE_POLL_SECONDS = float(os.getenv("PIPELINE_POLL_SECONDS", "15"))
+# 설정하면 저장 후 이 프롬프트로 요약까지 자동 생성
+PIPELINE_SUMMARY_PROMPT_ARN = os.getenv("PIPELINE_SUMMARY_PROMPT_ARN")
+pipeline = PipelineQueue(
+    PIPELINE_DB_PATH,
+    workers=PIPELINE_WORKERS,
+    max_attempts=PIPELINE_MAX_ATTEMPTS,
+    lease_seconds=PIPELINE_LEASE_SECONDS,
+)
+startup_report.mark("pipeline_queue")
+
+
+# backfill --indexes에서 직접 색인 (서버는 파이프라인 embed 단계에서 처리)
+def update_vector_index(job_id, turns):
+    try:
+        with stage("vector_index"):
+            vector_index.index_transcript(job_id, turns)
     except Exception as e:
-        logger.error(f"Error initializing Bedrock client: {str(e)}")
+        logger.error(f"Error updating vector index: {str(e)}")
+
 
 def create_dynamodb_table():
     try:
@@ -87,43 +401,171 @@ def create_dynamodb_table():
         logger.error(f"Error creating DynamoDB table: {e.response['Error']['Message']}")
         return None
 
-def save_transcription_to_dynamodb(job_id, transcript_data, file_name=None):
+
+# 테이블 확인: background(기본, 요청을 먼저 받음) | blocking(기존 동작) | off
+# 확인이 끝나기 전의 쓰기는 DYNAMODB_TABLE_WAIT_SECONDS까지 기다림 (새 테이블 생성 직후 대비)
+# lifespan이 백그라운드 확인을 시작할 때만 미확인 상태가 됨 (lifespan 없이 import한 스크립트/벤치는 대기 없음)
+DYNAMODB_TABLE_CHECK = os.getenv("DYNAMODB_TABLE_CHECK", "background").lower()
+DYNAMODB_TABLE_WAIT_SECONDS = float(os.getenv("DYNAMODB_TABLE_WAIT_SECONDS", "30"))
+table_checked = threading.Event()
+table_checked.set()
+
+
+def create_usage_table():
+    try:
+        existing_tables = dynamodb.meta.client.list_tables()["TableNames"]
+        if USAGE_TABLE in existing_tables:
+            return
+        table = dynamodb.create_table(
+            TableName=USAGE_TABLE,
+            KeySchema=[
+                {"AttributeName": "user_id", "KeyType": "HASH"},
+                {"AttributeName": "usage_key", "KeyType": "RANGE"},
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "user_id", "AttributeType": "S"},
+                {"AttributeName": "usage_key", "AttributeType": "S"},
+            ],
+            ProvisionedThroughput={"ReadCapacityUnits": 5, "WriteCapacityUnits": 5},
+        )
+        table.meta.client.get_waiter("table_exists").wait(TableName=USAGE_TABLE)
+        logger.info(f"Created DynamoDB usage table: {USAGE_TABLE}")
+    except ClientError as e:
+        logger.error(f"Error creating usage table: {e.response['Error']['Message']}")
+
+
+def write_usage(key, amounts):
+    write_usage_item(dynamodb.Table(USAGE_TABLE), key, amounts)
+
+
+def query_usage_items(user_id, month):
+    from boto3.dynamodb.conditions import Key
+
+    table = dynamodb.Table(USAGE_TABLE)
+    kwargs = {
+        "KeyConditionExpression": Key("user_id").eq(user_id) & Key("usage_key").begins_with(month)
+    }
+    items = []
+    while True:
+        response = table.query(**kwargs)
+        items.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def check_dynamodb_table():
+    started = time.perf_counter()
+    try:
+        create_dynamodb_table()
+        if USAGE_TABLE:
+            create_usage_table()
+    except Exception as e:
+        logger.error(f"DynamoDB table check failed: {str(e)}")
+    finally:
+        table_checked.set()
+        startup_report.record("table_check", time.perf_counter() - started)
+
+
+def wait_for_table():
+    if not table_checked.wait(DYNAMODB_TABLE_WAIT_SECONDS):
+        logger.warning("DynamoDB table check still running; writing anyway")
+
+
+# Transcribe 결과 JSON -> DynamoDB 항목
+def build_transcript_item(job_id, transcript_data, file_name=None):
+    transcript_text = ""
+    try:
+        if (
+            "results" in transcript_data
+            and "transcripts" in transcript_data["results"]
+        ):
+            transcript_text = transcript_data["results"]["transcripts"][0][
+                "transcript"
+            ]
+        elif "transcripts" in transcript_data:
+            transcript_text = transcript_data["transcripts"][0]["transcript"]
+    except (KeyError, IndexError) as e:
+        logger.warning(f"Could not extract transcript text: {str(e)}")
+        transcript_text = "Transcript text extraction failed"
+    file_creation_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    current_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return {
+        "id": job_id,
+        "fileName": file_name if file_name else f"{job_id}.json",
+        "transcript": transcript_text,
+        "fileCreationDate": file_creation_date,
+        "currentDate": current_date,
+    }
+
+
+# 트랜스크립트 속성만 갱신 (자동 요약 단계가 먼저 저장한 summary 유지)
+def update_transcript_item(table, item):
+    return table.update_item(
+        Key={"id": item["id"]},
+        UpdateExpression=(
+            "set fileName = :f, transcript = :t, currentDate = :d,"
+            " fileCreationDate = if_not_exists(fileCreationDate, :c)"
+        ),
+        ExpressionAttributeValues={
+            ":f": item["fileName"],
+            ":t": item["transcript"],
+            ":d": item["currentDate"],
+            ":c": item["fileCreationDate"],
+        },
+    )
+
+
+def save_transcription_to_dynamodb(job_id, transcript_data, file_name=None, turns=None):
     try:
         if not dynamodb:
             logger.warning("DynamoDB client not initialized. Cannot save transcript.")
             return None
+        wait_for_table()
         table = dynamodb.Table(DYNAMODB_TABLE)
-        transcript_text = ""
-        try:
-            if (
-                "results" in transcript_data
-                and "transcripts" in transcript_data["results"]
-            ):
-                transcript_text = transcript_data["results"]["transcripts"][0][
-                    "transcript"
-                ]
-            elif "transcripts" in transcript_data:
-                transcript_text = transcript_data["transcripts"][0]["transcript"]
-        except (KeyError, IndexError) as e:
-            logger.warning(f"Could not extract transcript text: {str(e)}")
-            transcript_text = "Transcript text extraction failed"
-        file_creation_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        current_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        item = {
-            "id": job_id,
-            "fileName": file_name if file_name else f"{job_id}.json",
-            "transcript": transcript_text,
-            "fileCreationDate": file_creation_date,
-            "currentDate": current_date,
-        }
-        response = table.put_item(Item=item)
+        item = build_transcript_item(job_id, transcript_data, file_name)
+        response = update_transcript_item(table, item)
         logger.info(f"Transcription data saved to DynamoDB: {job_id}")
+        update_search_index(
+            job_id,
+            turns=turns if turns is not None else build_turns(transcript_data),
+        )
         return response
     except Exception as e:
         logger.error(f"Error saving to DynamoDB: {str(e)}")
         return None
 
-def summarize_text_with_bedrock_promptmgmt(text, prompt_arn):
+# 요약 사용량의 model은 프롬프트 ARN이 아니라 프롬프트 변형(variant)에 설정된 모델 ID
+# SUMMARY_MODEL_ID를 설정하면 조회 없이 사용, 조회에 실패하면 SUMMARY_UNKNOWN_MODEL로 기록
+SUMMARY_MODEL_ID = os.getenv("SUMMARY_MODEL_ID")
+SUMMARY_UNKNOWN_MODEL = "bedrock-prompt"
+PROMPT_MODEL_CACHE = {}
+PROMPT_MODEL_CACHE_SIZE = 64
+
+
+def prompt_model_id(prompt_arn):
+    if SUMMARY_MODEL_ID:
+        return SUMMARY_MODEL_ID
+    if prompt_arn in PROMPT_MODEL_CACHE:
+        return PROMPT_MODEL_CACHE[prompt_arn]
+    model_id = SUMMARY_UNKNOWN_MODEL
+    if bedrock_agent:
+        # arn:aws:bedrock:<region>:<account>:prompt/<id>[:<version>]
+        prompt_id, _, version = prompt_arn.rsplit("prompt/", 1)[-1].partition(":")
+        try:
+            response = bedrock_agent.get_prompt(
+                promptIdentifier=prompt_id, **({"promptVersion": version} if version else {})
+            )
+            model_id = response["variants"][0]["modelId"]
+        except Exception as e:
+            logger.warning(f"Could not resolve model for prompt {prompt_arn}: {str(e)}")
+    PROMPT_MODEL_CACHE[prompt_arn] = model_id
+    while len(PROMPT_MODEL_CACHE) > PROMPT_MODEL_CACHE_SIZE:
+        PROMPT_MODEL_CACHE.pop(next(iter(PROMPT_MODEL_CACHE)))
+    return model_id
+
+
+def summarize_text_with_bedrock_promptmgmt(text, prompt_arn, user_id=ANONYMOUS_USER):
     try:
         response = bedrock_runtime.converse(
             modelId=prompt_arn,
@@ -133,6 +575,7 @@ def summarize_text_with_bedrock_promptmgmt(text, prompt_arn):
                 }
             }
         )
+        record_bedrock_usage(prompt_model_id(prompt_arn), response, user_id)
         # 안전하게 중첩된 값을 추출
         summary = None
         try:
@@ -160,6 +603,7 @@ def update_dynamodb_with_summary(job_id, summary):
                 "DynamoDB client not initialized. Cannot update with summary."
             )
             return None
+        wait_for_table()
         table = dynamodb.Table(DYNAMODB_TABLE)
         response = table.update_item(
             Key={"id": job_id},
@@ -168,17 +612,71 @@ def update_dynamodb_with_summary(job_id, summary):
             ReturnValues="UPDATED_NEW",
         )
         logger.info(f"Summary updated in DynamoDB for job: {job_id}")
+        update_search_index(job_id, summary=summary)
         return response
     except Exception as e:
         logger.error(f"Error updating DynamoDB with summary: {str(e)}")
         return None
 
+# lifespan에서 띄운 백그라운드 작업 (완료 전 GC 방지)
+background_tasks = set()
+
+
+def start_background(func):
+    task = asyncio.create_task(asyncio.to_thread(func))
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+# 운영 진단 (/admin, ADMIN_TOKEN이 없으면 비활성)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(LOCAL_STORAGE_DIR, "profiles"))
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "300"))
+profiler = Profiler(PROFILE_DIR, max_seconds=PROFILE_MAX_SECONDS)
+allocation_tracker = AllocationTracker(PROFILE_DIR)
+loop_lag = LoopLagMonitor()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    if dynamodb:
-        create_dynamodb_table()
-    logger.info("Application startup: DynamoDB table check completed")
+    startup_report.mark("app_setup")
+    # backfill --indexes 등 다른 프로세스가 색인을 쓰는 중이면 시작하지 않음 (IndexLockBusy)
+    index_locks = lock_index_dirs([SEARCH_INDEX_DIR, VECTOR_INDEX_DIR])
+    await asyncio.to_thread(search_index.get)
+    await asyncio.to_thread(vector_index.get)
+    startup_report.mark("indexes")
+    if not dynamodb or DYNAMODB_TABLE_CHECK == "off":
+        pass
+    elif DYNAMODB_TABLE_CHECK == "blocking":
+        await asyncio.to_thread(check_dynamodb_table)
+        logger.info("Application startup: DynamoDB table check completed")
+    else:
+        table_checked.clear()
+        start_background(check_dynamodb_table)
+    if AWS_CONFIGURED and AWS_CLIENT_PREWARM:
+        start_background(prewarm_aws_clients)
+    await pipeline.start()
+    loop_lag_task = asyncio.create_task(loop_lag.run())
+    # DynamoDB가 없으면 사용량은 메모리에만 유지 (/usage 조회는 가능)
+    if dynamodb and USAGE_TABLE:
+        usage_tracker.write = write_usage
+    usage_task = asyncio.create_task(usage_tracker.run())
+    startup_report.mark("lifespan")
+    startup_report.ready()
+    logger.info(f"Application startup: {startup_report.summary()}")
+    if startup_report.over_target:
+        logger.warning(
+            f"Cold start {startup_report.ready_seconds:.2f}s exceeds target {startup_report.target_seconds}s"
+        )
     yield
+    loop_lag_task.cancel()
+    usage_task.cancel()
+    profiler.stop()
+    await pipeline.stop()
+    await asyncio.to_thread(usage_tracker.flush)
+    search_index.flush()
+    vector_index.flush()
+    for lock in index_locks:
+        lock.release()
     logger.info("Application shutdown")
 
 app = FastAPI(lifespan=lifespan)
@@ -190,55 +688,364 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TracingMiddleware, tracer=tracer)
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+
+# 동일 키(operation, job_id)에 대한 동시 요청 병합 (single-flight)
+class SingleFlight:
+    def __init__(self):
+        self._inflight = {}
+        self.coalesced = 0
+
+    async def do(self, key, func, *args):
+        task = self._inflight.get(key)
+        if task is None:
+            # 블로킹 boto3 호출은 스레드풀에서 한 번만 실행
+            task = asyncio.ensure_future(asyncio.to_thread(func, *args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+            logger.info(f"Coalesced concurrent request: {key}")
+        # 한 호출자가 끊겨도 공유 작업은 취소되지 않도록 shield
+        return await asyncio.shield(task)
+
+
+single_flight = SingleFlight()
+
+
+# 무음 제거 전처리 (에너지 기반 VAD)
+VAD_MIN_SILENCE_SECONDS = float(os.getenv("VAD_MIN_SILENCE_SECONDS", "2.0"))
+VAD_KEEP_SILENCE_SECONDS = float(os.getenv("VAD_KEEP_SILENCE_SECONDS", "0.5"))
+OFFSET_MAP_CACHE = {}
+OFFSET_MAP_CACHE_SIZE = 1024
+
+
+# 긴 무음을 압축한 파일 생성, (새 파일 경로, 확장자, offset map) 반환
+def trim_audio_file(path, file_ext):
+    out_ext = ".wav" if file_ext == ".wav" else ".flac"
+    out_path = f"{os.path.splitext(path)[0]}_trimmed{out_ext}"
+    try:
+        offset_map, original_seconds, trimmed_seconds = trim_silence_file(
+            path, out_path, VAD_MIN_SILENCE_SECONDS, VAD_KEEP_SILENCE_SECONDS
+        )
+    except Exception:
+        if os.path.exists(out_path):
+            os.unlink(out_path)
+        raise
+    logger.info(f"Trimmed silence: {original_seconds:.1f}s -> {trimmed_seconds:.1f}s")
+    return out_path, out_ext, offset_map
+
+
+def save_offset_map(job_id, offset_map):
+    OFFSET_MAP_CACHE[job_id] = offset_map
+    storage.put_bytes(f"audio_offsets/{job_id}.json", json.dumps(offset_map))
+
+
+# 무음 제거 없이 업로드된 작업은 None (offset map은 작업 시작 전에 저장되므로 None도 캐시)
+def load_offset_map(job_id):
+    if job_id in OFFSET_MAP_CACHE:
+        return OFFSET_MAP_CACHE[job_id]
+    offset_map = None
+    try:
+        offset_map = json.loads(storage.get_bytes(f"audio_offsets/{job_id}.json"))
+    except StorageNotFound:
+        pass
+    OFFSET_MAP_CACHE[job_id] = offset_map
+    while len(OFFSET_MAP_CACHE) > OFFSET_MAP_CACHE_SIZE:
+        OFFSET_MAP_CACHE.pop(next(iter(OFFSET_MAP_CACHE)))
+    return offset_map
+
+
+# 긴 녹음 분할 전사 설정
+SPLIT_JOB_PREFIX = "split-job-"
+SPLIT_MIN_SECONDS = float(os.getenv("SPLIT_MIN_SECONDS", "1800"))
+SPLIT_CHUNK_SECONDS = float(os.getenv("SPLIT_CHUNK_SECONDS", "600"))
+SPLIT_OVERLAP_SECONDS = float(os.getenv("SPLIT_OVERLAP_SECONDS", "5"))
+SPLIT_MAX_WORKERS = int(os.getenv("SPLIT_MAX_WORKERS", "8"))
+
+
+# 무음 경계로 분할한 청크를 동시에 업로드하고 청크별 Transcribe 작업 시작
+def maybe_start_split_transcription(
+    file_path,
+    timestamp,
+    language_code,
+    enable_speaker_diarization,
+    max_speaker_count,
+    force=False,
+    duration=None,
+):
+    # 헤더 프로브로 길이를 알면 ffprobe 생략
+    if duration is None:
+        try:
+            duration = probe_duration(file_path)
+        except Exception as e:
+            logger.warning(f"Could not probe audio duration, skipping split: {str(e)}")
+            return None
+    if not force and duration < SPLIT_MIN_SECONDS:
+        return None
+
+    job_name = f"{SPLIT_JOB_PREFIX}{timestamp}-{uuid.uuid4()}"
+    chunks = plan_chunks(
+        duration,
+        detect_silences(file_path),
+        SPLIT_CHUNK_SECONDS,
+        SPLIT_OVERLAP_SECONDS,
+    )
+    transcription_settings = {}
+    if enable_speaker_diarization.lower() == "true":
+        transcription_settings = {
+            "ShowSpeakerLabels": True,
+            "MaxSpeakerLabels": int(max_speaker_count),
+        }
+    transcribe_client = get_transcribe_client()
+
+    def start_chunk(chunk):
+        chunk_job = f"{job_name}-part{chunk['index']:03d}"
+        chunk_path = f"{file_path}.part{chunk['index']:03d}.flac"
+        s3_key = f"audio/{job_name}/part{chunk['index']:03d}.flac"
+        try:
+            extract_chunk(file_path, chunk["offset"], chunk["end"], chunk_path)
+            chunk_uri = storage.put_file(chunk_path, s3_key, move=True)
+        finally:
+            if os.path.exists(chunk_path):
+                os.unlink(chunk_path)
+        transcribe_client.start_transcription_job(
+            TranscriptionJobName=chunk_job,
+            Media={"MediaFileUri": chunk_uri},
+            MediaFormat="flac",
+            LanguageCode=language_code,
+            OutputBucketName=S3_BUCKET,
+            OutputKey=f"transcribe_results/{chunk_job}.json",
+            Settings=transcription_settings,
+        )
+        return dict(chunk, job_name=chunk_job)
+
+    with ThreadPoolExecutor(max_workers=min(SPLIT_MAX_WORKERS, len(chunks))) as pool:
+        chunks = list(pool.map(start_chunk, chunks))
+
+    storage.put_bytes(
+        f"split_jobs/{job_name}.json",
+        json.dumps({"job_name": job_name, "duration": duration, "chunks": chunks}),
+    )
+    logger.info(f"Started split transcription job: {job_name} ({len(chunks)} chunks)")
+    return {
+        "success": True,
+        "job_id": job_name,
+        "chunks": len(chunks),
+        "message": "File uploaded and split transcription jobs started",
+    }
+
+
+def result_exists(job_name):
+    return storage.exists(f"transcribe_results/{job_name}.json")
+
+
+# 분할 작업 진행 상황 확인, 모든 청크가 끝나면 병합 결과를 transcribe_results/{job_id}.json에 저장
+def advance_split_job(job_id):
+    if result_exists(job_id):
+        return "COMPLETED", None
+    chunks = json.loads(storage.get_bytes(f"split_jobs/{job_id}.json"))["chunks"]
+    transcribe_client = get_transcribe_client()
+
+    def chunk_status(chunk):
+        if result_exists(chunk["job_name"]):
+            return "COMPLETED", None
+        job = transcribe_client.get_transcription_job(
+            TranscriptionJobName=chunk["job_name"]
+        )["TranscriptionJob"]
+        return job["TranscriptionJobStatus"], job.get("FailureReason")
+
+    def load_chunk(chunk):
+        data = storage.get_bytes(f"transcribe_results/{chunk['job_name']}.json")
+        return chunk, json.loads(data)
+
+    with ThreadPoolExecutor(max_workers=min(SPLIT_MAX_WORKERS, len(chunks))) as pool:
+        statuses = list(pool.map(chunk_status, chunks))
+        for status, reason in statuses:
+            if status == "FAILED":
+                return "FAILED", reason or "Unknown error"
+        if any(status != "COMPLETED" for status, _ in statuses):
+            return "IN_PROGRESS", None
+        chunk_results = list(pool.map(load_chunk, chunks))
+
+    stitched = stitch_results(job_id, chunk_results)
+    storage.put_bytes(
+        f"transcribe_results/{job_id}.json",
+        json.dumps(stitched, ensure_ascii=False).encode("utf-8"),
+    )
+    logger.info(f"Stitched split transcription job: {job_id} ({len(chunks)} chunks)")
+    return "COMPLETED", None
 
 
 # 음성 파일 업로드 엔드포인트
+# 업로드 수신 / ffmpeg 작업 동시 실행 제한
+UPLOAD_MAX_CONCURRENT = int(os.getenv("UPLOAD_MAX_CONCURRENT", "8"))
+UPLOAD_MAX_INFLIGHT_BYTES = int(
+    os.getenv("UPLOAD_MAX_INFLIGHT_BYTES", str(1024 * 1024 * 1024))
+)
+# 업로드 본문 하나의 최대 크기 (Transcribe 입력 한도 2GB)
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+# Content-Length가 없는(chunked) 본문의 입장 시 예약 크기, 이후 받은 만큼 늘려서 계산
+UPLOAD_UNKNOWN_SIZE_BYTES = int(os.getenv("UPLOAD_UNKNOWN_SIZE_BYTES", str(8 * 1024 * 1024)))
+UPLOAD_QUEUE_SIZE = int(os.getenv("UPLOAD_QUEUE_SIZE", "32"))
+UPLOAD_QUEUE_TIMEOUT = float(os.getenv("UPLOAD_QUEUE_TIMEOUT", "30"))
+TRANSCODE_MAX_CONCURRENT = int(
+    os.getenv("TRANSCODE_MAX_CONCURRENT", str(os.cpu_count() or 2))
+)
+TRANSCODE_QUEUE_SIZE = int(os.getenv("TRANSCODE_QUEUE_SIZE", "32"))
+TRANSCODE_QUEUE_TIMEOUT = float(os.getenv("TRANSCODE_QUEUE_TIMEOUT", "120"))
+
+upload_admission = AdmissionController(
+    "upload",
+    UPLOAD_MAX_CONCURRENT,
+    max_bytes=UPLOAD_MAX_INFLIGHT_BYTES,
+    max_queue=UPLOAD_QUEUE_SIZE,
+    queue_timeout=UPLOAD_QUEUE_TIMEOUT,
+)
+# 트랜스코딩 자리가 없으면 429 대신 해당 단계를 건너뜀 (무음 제거/MP3 변환/분할 생략)
+transcode_admission = AdmissionController(
+    "transcode",
+    TRANSCODE_MAX_CONCURRENT,
+    max_queue=TRANSCODE_QUEUE_SIZE,
+    queue_timeout=TRANSCODE_QUEUE_TIMEOUT,
+)
+
+
+def admission_rejected_response(e):
+    logger.warning(f"Rejected request: {str(e)}")
+    return JSONResponse(
+        status_code=429,
+        content={"error": f"Server is busy, retry after {e.retry_after} seconds"},
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+SUPPORTED_AUDIO_EXTENSIONS = [".mp3", ".wav", ".flac", ".ogg"]
+
+
+# Transcribe에 보내는 오디오 길이 (헤더 프로브 값, 무음 제거 후처럼 모르면 ffprobe)
+# path: 로컬 파일 또는 presigned URL (ffprobe는 HTTP Range로 필요한 부분만 읽음)
+def media_seconds(probe, path=None):
+    duration = (probe or {}).get("duration")
+    if duration is None and path and (path.startswith("https://") or os.path.exists(path)):
+        try:
+            duration = probe_duration(path)
+        except Exception as e:
+            logger.warning(f"Could not probe audio duration for usage: {str(e)}")
+    return duration
+
+
+# 확장자와 헤더(매직 바이트)로 업로드 검증, 실패하면 나머지 본문을 받기 전에 거절
+def validate_audio_upload(filename, probe):
+    file_ext = os.path.splitext(filename or "")[1].lower()
+    if file_ext not in SUPPORTED_AUDIO_EXTENSIONS:
+        raise UploadRejected(
+            415, "Unsupported file format. Supported formats: MP3, WAV, FLAC, OGG"
+        )
+    if probe["format"] is None:
+        raise UploadRejected(415, "Unrecognized or corrupt audio data")
+
+
+# 폼 필드: audio_file, language_code, enable_speaker_diarization, max_speaker_count,
+# convert_to_mp3, split_mode(auto/true/false), trim_silence
 @app.post("/upload-audio")
-async def upload_audio(
-    audio_file: UploadFile = File(...),
-    language_code: str = Form("ko-KR"),
-    enable_speaker_diarization: str = Form("true"),
-    max_speaker_count: str = Form("10"),  # <- 추가
-    convert_to_mp3: str = Form("false"),
-):
+async def upload_audio(request: Request):
+    # 본문을 받기 전에 Content-Length 기준으로 입장
+    # - Content-Length가 없으면(chunked) UPLOAD_UNKNOWN_SIZE_BYTES만 예약하고 받은 만큼 늘림
+    # - 받은 바이트가 Content-Length(없으면 UPLOAD_MAX_BYTES)를 넘으면 413
+    declared = int(request.headers.get("content-length") or 0)
+    if declared > UPLOAD_MAX_BYTES:
+        return JSONResponse(
+            status_code=413,
+            content={"error": f"Request body exceeds {UPLOAD_MAX_BYTES} bytes"},
+        )
     try:
-        with tempfile.NamedTemporaryFile(
-            delete=False, suffix=os.path.splitext(audio_file.filename)[1]
-        ) as temp_file:
-            shutil.copyfileobj(audio_file.file, temp_file)
-            temp_file_path = temp_file.name
+        async with upload_admission.slot(declared or UPLOAD_UNKNOWN_SIZE_BYTES) as reservation:
+            return await handle_audio_upload(request, declared or UPLOAD_MAX_BYTES, reservation)
+    except AdmissionRejected as e:
+        return admission_rejected_response(e)
 
-        file_size = os.path.getsize(temp_file_path)
+
+async def handle_audio_upload(request, max_bytes, reservation):
+    try:
+        try:
+            with stage("upload_receive"):
+                upload = await receive_upload(
+                    request,
+                    "audio_file",
+                    validate_audio_upload,
+                    storage.tmp_dir,
+                    max_bytes,
+                    reservation.charge,
+                )
+            UPLOAD_BYTES.inc(upload.size, source="upload")
+        except UploadRejected as e:
+            logger.warning(f"Rejected audio upload: {e.message}")
+            return JSONResponse(status_code=e.status_code, content={"error": e.message})
+
+        form = upload.fields
+        user_id = request_user(request, form)
+        language_code = form.get("language_code", "ko-KR")
+        enable_speaker_diarization = form.get("enable_speaker_diarization", "true")
+        max_speaker_count = form.get("max_speaker_count", "10")
+        convert_to_mp3 = form.get("convert_to_mp3", "false")
+        split_mode = form.get("split_mode", "auto")
+        trim_silence = form.get("trim_silence", "false")
+
+        temp_file_path = upload.temp_path
+        probe = upload.probe
         logger.info(
-            f"Received audio file: {audio_file.filename}, size: {file_size} bytes"
+            f"Received audio file: {upload.filename}, size: {upload.size} bytes, probe: {probe}"
         )
 
-        file_ext = os.path.splitext(audio_file.filename)[1].lower()
-        if file_ext not in [".mp3", ".wav", ".flac", ".ogg"]:
-            os.unlink(temp_file_path)
-            return {
-                "error": "Unsupported file format. Supported formats: MP3, WAV, FLAC, OGG"
-            }
+        # 확장자가 아니라 헤더로 판별한 실제 형식 사용
+        file_ext = f".{probe['format']}"
+        route = choose_pipeline(
+            probe,
+            convert_to_mp3.lower() == "true",
+            SPLIT_MIN_SECONDS if split_mode.lower() == "auto" else None,
+        )
+
+        # 긴 무음 제거 (offset map은 작업 ID가 정해진 뒤 저장)
+        offset_map = None
+        if trim_silence.lower() == "true":
+            try:
+                async with transcode_admission.slot():
+                    with stage("trim_silence"):
+                        trimmed_path, file_ext, offset_map = await asyncio.to_thread(
+                            trim_audio_file, temp_file_path, file_ext
+                        )
+                os.unlink(temp_file_path)
+                temp_file_path = trimmed_path
+                # 길이가 바뀌었으므로 분할 여부는 다시 판단
+                probe = {"format": file_ext[1:]}
+            except Exception as e:
+                logger.warning(f"Failed to trim silence: {str(e)}. Using original file.")
 
         final_file_path = temp_file_path
-        if convert_to_mp3.lower() == "true" and file_ext != ".mp3":
+        if (route == "transcode" or convert_to_mp3.lower() == "true") and file_ext != ".mp3":
             try:
                 import subprocess
 
-                mp3_file_path = temp_file_path.replace(file_ext, ".mp3")
-                subprocess.run(
-                    [
-                        "ffmpeg",
-                        "-i",
-                        temp_file_path,
-                        "-acodec",
-                        "libmp3lame",
-                        "-ab",
-                        "128k",
-                        mp3_file_path,
-                    ],
-                    check=True,
-                )
+                mp3_file_path = os.path.splitext(temp_file_path)[0] + ".mp3"
+                async with transcode_admission.slot():
+                    with stage("transcode"):
+                        await asyncio.to_thread(
+                            subprocess.run,
+                            [
+                                "ffmpeg",
+                                "-i",
+                                temp_file_path,
+                                "-acodec",
+                                "libmp3lame",
+                                "-ab",
+                                "128k",
+                                mp3_file_path,
+                            ],
+                            check=True,
+                        )
                 os.unlink(temp_file_path)
                 final_file_path = mp3_file_path
                 file_ext = ".mp3"
@@ -250,35 +1057,53 @@ async def upload_audio(
 
         # 파일명 그대로 사용 (중복 방지를 위해 타임스탬프 추가)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename_base = os.path.splitext(os.path.basename(audio_file.filename))[0]
+        filename_base = os.path.splitext(os.path.basename(upload.filename))[0]
         s3_key = f"audio/{filename_base}_{timestamp}{file_ext}"
         
-        # S3에 업로드
-        if s3_client and S3_BUCKET:
-            with open(final_file_path, "rb") as file_data:
-                s3_client.upload_fileobj(file_data, S3_BUCKET, s3_key)
-            logger.info(f"File uploaded to S3: {s3_key}")
-            s3_uri = f"s3://{S3_BUCKET}/{s3_key}"
-        else:
-            local_path = os.path.join(
-                LOCAL_STORAGE_DIR, f"{filename_base}_{timestamp}{file_ext}"
-            )
-            shutil.copy(final_file_path, local_path)
-            logger.info(f"File saved locally: {local_path}")
-            s3_uri = f"file://{local_path}"
+        # 저장소에 저장 (로컬은 하드 링크라 복사 없음, 임시 파일은 분할 후 삭제)
+        s3_uri = await asyncio.to_thread(storage.put_file, final_file_path, s3_key)
+        logger.info(f"File stored: {s3_uri}")
+
+        # 긴 녹음은 청크로 나눠 병렬 전사
+        split_result = None
+        if split_mode.lower() != "false":
+            try:
+                async with transcode_admission.slot():
+                    with stage("split"):
+                        split_result = await asyncio.to_thread(
+                            maybe_start_split_transcription,
+                            final_file_path,
+                            timestamp,
+                            language_code,
+                            enable_speaker_diarization,
+                            max_speaker_count,
+                            force=split_mode.lower() == "true",
+                            duration=probe.get("duration"),
+                        )
+            except AdmissionRejected as e:
+                logger.warning(f"Skipping split transcription: {str(e)}")
+            except Exception as e:
+                # 원본은 이미 저장되어 있으므로 단일 Transcribe 작업으로 진행
+                logger.error(f"Split transcription failed, falling back to a single job: {str(e)}")
+        audio_seconds = await asyncio.to_thread(media_seconds, probe, final_file_path)
         
         # 임시 파일 삭제
         if os.path.exists(final_file_path):
             os.unlink(final_file_path)
+
+        if split_result:
+            if offset_map:
+                save_offset_map(split_result["job_id"], offset_map)
+            await asyncio.to_thread(
+                enqueue_transcription, split_result["job_id"], user_id, audio_seconds
+            )
+            return split_result
         
         # Transcribe 작업 시작
-        transcribe_client = boto3.client(
-            "transcribe",
-            region_name=AWS_REGION,
-            aws_access_key_id=AWS_ACCESS_KEY,
-            aws_secret_access_key=AWS_SECRET_KEY,
-        )
+        transcribe_client = get_transcribe_client()
         job_name = f"transcribe-job-{timestamp}-{uuid.uuid4()}"
+        if offset_map:
+            save_offset_map(job_name, offset_map)
         transcription_settings = {}
         if enable_speaker_diarization.lower() == "true":
             transcription_settings = {
@@ -294,18 +1119,41 @@ async def upload_audio(
             OutputKey=f"transcribe_results/{job_name}.json",
             Settings=transcription_settings,
         )
-        return {"success": True, "job_id": job_name, "message": "File uploaded and transcription job started"}
+        await asyncio.to_thread(enqueue_transcription, job_name, user_id, audio_seconds)
+        return {
+            "success": True,
+            "job_id": job_name,
+            "s3_key": s3_key,
+            "message": "File uploaded and transcription job started",
+        }
     except Exception as e:
         logger.error(f"Error processing uploaded file: {str(e)}")
         return {"error": f"Failed to process uploaded file: {str(e)}"}
 
 # 음성 녹음 데이터 처리 엔드포인트
+# JSON 본문: audio_data(base64), language_code, enable_speaker_diarization,
+# max_speaker_count, trim_silence (Form 파라미터와 JSON 본문은 함께 받을 수 없음)
 @app.post("/record-audio")
-async def record_audio(
-    audio_data: dict = Body(...),
-    language_code: str = Form("ko-KR"),
-    enable_speaker_diarization: str = Form("true"),
-    max_speaker_count: str = Form("10"),
+async def record_audio(request: Request, audio_data: dict = Body(...)):
+    language_code = str(audio_data.get("language_code", "ko-KR"))
+    enable_speaker_diarization = str(audio_data.get("enable_speaker_diarization", "true"))
+    max_speaker_count = str(audio_data.get("max_speaker_count", "10"))
+    nbytes = len(audio_data.get("audio_data") or "") * 3 // 4
+    try:
+        async with upload_admission.slot(nbytes):
+            return await handle_recorded_audio(
+                audio_data,
+                language_code,
+                enable_speaker_diarization,
+                max_speaker_count,
+                request_user(request, audio_data),
+            )
+    except AdmissionRejected as e:
+        return admission_rejected_response(e)
+
+
+async def handle_recorded_audio(
+    audio_data, language_code, enable_speaker_diarization, max_speaker_count, user_id=ANONYMOUS_USER
 ):
     try:
         # Base64 인코딩된 오디오 데이터 추출
@@ -313,52 +1161,65 @@ async def record_audio(
         if not audio_base64:
             return {"error": "No audio data provided"}
         
-        # 파일 형식 확인 (기본값 WAV)
-        file_format = audio_data.get("file_format", "wav").lower()
-        file_ext = f".{file_format}"
+        audio_base64 = audio_base64.split(",")[1] if "," in audio_base64 else audio_base64
+
+        # 전체 디코딩 전에 앞부분만 디코딩해 형식 확인
+        head_chars = PROBE_BYTES * 4 // 3 // 4 * 4
+        probe = probe_header(
+            base64.b64decode(audio_base64[:head_chars]), len(audio_base64) * 3 // 4
+        )
+        if probe["format"] is None:
+            return JSONResponse(
+                status_code=415, content={"error": "Unrecognized or corrupt audio data"}
+            )
+        file_ext = f".{probe['format']}"
         
         # 임시 파일로 저장
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as temp_file:
+        with stage("record_decode"), tempfile.NamedTemporaryFile(
+            delete=False, suffix=file_ext, dir=storage.tmp_dir
+        ) as temp_file:
             # Base64 디코딩 후 파일로 저장
-            audio_bytes = base64.b64decode(audio_base64.split(",")[1] if "," in audio_base64 else audio_base64)
+            audio_bytes = base64.b64decode(audio_base64)
             temp_file.write(audio_bytes)
             temp_file_path = temp_file.name
+        UPLOAD_BYTES.inc(len(audio_bytes), source="record")
         
         file_size = os.path.getsize(temp_file_path)
         logger.info(f"Received recorded audio, size: {file_size} bytes")
+
+        # 긴 무음 제거
+        offset_map = None
+        if str(audio_data.get("trim_silence", "false")).lower() == "true":
+            try:
+                async with transcode_admission.slot():
+                    with stage("trim_silence"):
+                        trimmed_path, file_ext, offset_map = await asyncio.to_thread(
+                            trim_audio_file, temp_file_path, file_ext
+                        )
+                os.unlink(temp_file_path)
+                temp_file_path = trimmed_path
+                probe = {"format": file_ext[1:]}
+            except Exception as e:
+                logger.warning(f"Failed to trim silence: {str(e)}. Using original file.")
+        audio_seconds = await asyncio.to_thread(media_seconds, probe, temp_file_path)
         
         # 녹음 파일명 생성 (타임스탬프 포함)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename_base = f"recording_{timestamp}"
         s3_key = f"audio/{filename_base}{file_ext}"
         
-        # S3에 업로드
-        if s3_client and S3_BUCKET:
-            with open(temp_file_path, "rb") as file_data:
-                s3_client.upload_fileobj(file_data, S3_BUCKET, s3_key)
-            logger.info(f"File uploaded to S3: {s3_key}")
-            s3_uri = f"s3://{S3_BUCKET}/{s3_key}"
-        else:
-            local_path = os.path.join(
-                LOCAL_STORAGE_DIR, f"{filename_base}{file_ext}"
-            )
-            shutil.copy(temp_file_path, local_path)
-            logger.info(f"File saved locally: {local_path}")
-            s3_uri = f"file://{local_path}"
-        
-        # 임시 파일 삭제
-        if os.path.exists(temp_file_path):
-            os.unlink(temp_file_path)
+        # 저장소로 이동 (로컬은 rename, S3는 업로드 후 임시 파일 삭제)
+        s3_uri = await asyncio.to_thread(
+            storage.put_file, temp_file_path, s3_key, move=True
+        )
+        logger.info(f"File stored: {s3_uri}")
         
         # Transcribe 작업 시작
-        transcribe_client = boto3.client(
-            "transcribe",
-            region_name=AWS_REGION,
-            aws_access_key_id=AWS_ACCESS_KEY,
-            aws_secret_access_key=AWS_SECRET_KEY,
-        )
+        transcribe_client = get_transcribe_client()
 
         job_name = f"transcribe-job-{timestamp}-{uuid.uuid4()}"
+        if offset_map:
+            save_offset_map(job_name, offset_map)
 
         # 화자 구분 설정
         transcription_settings = {}
@@ -380,6 +1241,7 @@ async def record_audio(
         )
 
         logger.info(f"Started transcription job: {job_name}")
+        await asyncio.to_thread(enqueue_transcription, job_name, user_id, audio_seconds)
         
         return {
             "success": True,
@@ -393,188 +1255,648 @@ async def record_audio(
         return {"error": f"Failed to process recorded audio: {str(e)}"}
 
 
-# 작업 상태 확인 엔드포인트
-@app.get("/job-status/{job_id}")
-async def get_job_status(job_id: str):
+# 클라이언트가 S3로 직접 업로드 (API 서버는 오디오 바이트를 중계하지 않음)
+# - 작은 파일: 단일 PUT presigned URL
+# - 큰 파일: multipart 업로드 + 파트별 presigned URL, 클라이언트가 파트를 병렬 업로드
+# - 업로드 완료 호출 시 헤더만 Range로 읽어 형식 확인 후 Transcribe 작업 시작
+PRESIGN_EXPIRES_SECONDS = int(os.getenv("PRESIGN_EXPIRES_SECONDS", "900"))
+PRESIGN_MULTIPART_THRESHOLD = int(
+    os.getenv("PRESIGN_MULTIPART_THRESHOLD", str(64 * 1024 * 1024))
+)
+PRESIGN_PART_SIZE = int(os.getenv("PRESIGN_PART_SIZE", str(16 * 1024 * 1024)))
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+S3_MAX_PARTS = 10000
+# presign 때 발급한 키/upload_id/사용자 서명. 이후 호출(파트 재발급/완료/취소)에서 확인
+# 여러 워커 프로세스로 띄우면 같은 UPLOAD_SIGNING_SECRET을 설정해야 함
+UPLOAD_SIGNING_SECRET = (os.getenv("UPLOAD_SIGNING_SECRET") or "").encode("utf-8") or os.urandom(32)
+UPLOAD_TOKEN_TTL_SECONDS = int(os.getenv("UPLOAD_TOKEN_TTL_SECONDS", str(24 * 3600)))
+
+
+def upload_signature(user_id, s3_key, upload_id, expires_at):
+    message = f"{user_id}\n{s3_key}\n{upload_id or ''}\n{expires_at}".encode("utf-8")
+    return hmac.new(UPLOAD_SIGNING_SECRET, message, hashlib.sha256).hexdigest()
+
+
+def sign_upload(user_id, s3_key, upload_id=None):
+    expires_at = int(time.time()) + UPLOAD_TOKEN_TTL_SECONDS
+    return f"{expires_at}.{upload_signature(user_id, s3_key, upload_id, expires_at)}"
+
+
+def verify_upload(request, body, s3_key, upload_id):
+    expires_at, _, signature = str(body.get("upload_token") or "").partition(".")
+    if not expires_at.isdigit() or int(expires_at) < time.time():
+        raise HTTPException(status_code=403, detail="Invalid or expired upload token")
+    expected = upload_signature(request_user(request, body), s3_key, upload_id, expires_at)
+    if not hmac.compare_digest(signature, expected):
+        raise HTTPException(status_code=403, detail="Invalid or expired upload token")
+
+
+def require_s3():
+    if not (s3_client and S3_BUCKET):
+        raise HTTPException(status_code=503, detail="S3 is not configured")
+
+
+def presign_part_urls(s3_key, upload_id, part_numbers):
+    return [
+        {
+            "part_number": n,
+            "url": s3_client.generate_presigned_url(
+                "upload_part",
+                Params={
+                    "Bucket": S3_BUCKET,
+                    "Key": s3_key,
+                    "UploadId": upload_id,
+                    "PartNumber": n,
+                },
+                ExpiresIn=PRESIGN_EXPIRES_SECONDS,
+            ),
+        }
+        for n in part_numbers
+    ]
+
+
+def start_transcription(job_name, s3_uri, media_format, language_code, enable_speaker_diarization, max_speaker_count):
+    transcription_settings = {}
+    if enable_speaker_diarization.lower() == "true":
+        transcription_settings = {
+            "ShowSpeakerLabels": True,
+            "MaxSpeakerLabels": int(max_speaker_count),
+        }
+    get_transcribe_client().start_transcription_job(
+        TranscriptionJobName=job_name,
+        Media={"MediaFileUri": s3_uri},
+        MediaFormat=media_format,
+        LanguageCode=language_code,
+        OutputBucketName=S3_BUCKET,
+        OutputKey=f"transcribe_results/{job_name}.json",
+        Settings=transcription_settings,
+    )
+
+
+# 요청: {"filename", "content_type", "size"}
+# 응답의 upload_token을 이후 presign-parts/complete/abort 요청에 그대로 전달
+@app.post("/upload/presign")
+async def presign_upload(request: Request, body: dict = Body(...)):
+    require_s3()
+    filename = body.get("filename")
+    if not filename:
+        raise HTTPException(status_code=400, detail="filename is required")
+    file_ext = os.path.splitext(filename)[1].lower()
+    if file_ext not in SUPPORTED_AUDIO_EXTENSIONS:
+        raise HTTPException(
+            status_code=415,
+            detail="Unsupported file format. Supported formats: MP3, WAV, FLAC, OGG",
+        )
+    size = int(body.get("size") or 0)
+    content_type = body.get("content_type") or "application/octet-stream"
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename_base = os.path.splitext(os.path.basename(filename))[0]
+    s3_key = f"audio/{filename_base}_{timestamp}{file_ext}"
+    user_id = request_user(request, body)
+
+    if size <= PRESIGN_MULTIPART_THRESHOLD:
+        url = await asyncio.to_thread(
+            s3_client.generate_presigned_url,
+            "put_object",
+            Params={"Bucket": S3_BUCKET, "Key": s3_key, "ContentType": content_type},
+            ExpiresIn=PRESIGN_EXPIRES_SECONDS,
+        )
+        return {
+            "key": s3_key,
+            "method": "PUT",
+            "url": url,
+            "headers": {"Content-Type": content_type},
+            "upload_token": sign_upload(user_id, s3_key),
+            "expires_in": PRESIGN_EXPIRES_SECONDS,
+        }
+
+    # 파트 수가 S3 한도(10000)를 넘지 않도록 파트 크기 조정
+    part_size = max(PRESIGN_PART_SIZE, S3_MIN_PART_SIZE, -(-size // S3_MAX_PARTS))
+    part_count = -(-size // part_size)
+    response = await asyncio.to_thread(
+        s3_client.create_multipart_upload,
+        Bucket=S3_BUCKET,
+        Key=s3_key,
+        ContentType=content_type,
+    )
+    upload_id = response["UploadId"]
+    parts = await asyncio.to_thread(
+        presign_part_urls, s3_key, upload_id, range(1, part_count + 1)
+    )
+    logger.info(f"Presigned multipart upload {s3_key}: {part_count} parts of {part_size} bytes")
+    return {
+        "key": s3_key,
+        "upload_id": upload_id,
+        "part_size": part_size,
+        "parts": parts,
+        "upload_token": sign_upload(user_id, s3_key, upload_id),
+        "expires_in": PRESIGN_EXPIRES_SECONDS,
+    }
+
+
+# 만료된 파트 URL 재발급. 요청: {"key", "upload_id", "upload_token", "part_numbers"}
+@app.post("/upload/presign-parts")
+async def presign_upload_parts(request: Request, body: dict = Body(...)):
+    require_s3()
+    s3_key = body.get("key")
+    upload_id = body.get("upload_id")
+    part_numbers = [int(n) for n in body.get("part_numbers") or []]
+    if not s3_key or not upload_id or not part_numbers:
+        raise HTTPException(
+            status_code=400, detail="key, upload_id and part_numbers are required"
+        )
+    if any(not 1 <= n <= S3_MAX_PARTS for n in part_numbers):
+        raise HTTPException(status_code=400, detail="Invalid part number")
+    verify_upload(request, body, s3_key, upload_id)
+    parts = await asyncio.to_thread(presign_part_urls, s3_key, upload_id, part_numbers)
+    return {"key": s3_key, "upload_id": upload_id, "parts": parts}
+
+
+def list_uploaded_parts(s3_key, upload_id):
+    parts = []
+    paginator = s3_client.get_paginator("list_parts")
+    for page in paginator.paginate(Bucket=S3_BUCKET, Key=s3_key, UploadId=upload_id):
+        parts.extend(
+            {"PartNumber": p["PartNumber"], "ETag": p["ETag"]} for p in page.get("Parts", [])
+        )
+    return parts
+
+
+def complete_direct_upload(s3_key, upload_id, parts):
+    if upload_id:
+        # 브라우저가 ETag 헤더를 읽지 못하는 경우 S3에서 파트 목록 조회
+        if parts:
+            parts = [
+                {"PartNumber": int(p["part_number"]), "ETag": p["etag"]} for p in parts
+            ]
+        else:
+            parts = list_uploaded_parts(s3_key, upload_id)
+        s3_client.complete_multipart_upload(
+            Bucket=S3_BUCKET,
+            Key=s3_key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": sorted(parts, key=lambda p: p["PartNumber"])},
+        )
+    # 형식 확인은 앞부분만 Range GET
+    response = s3_client.get_object(
+        Bucket=S3_BUCKET, Key=s3_key, Range=f"bytes=0-{PROBE_BYTES - 1}"
+    )
+    header = response["Body"].read()
+    total_size = None
+    content_range = response.get("ContentRange")
+    if content_range and "/" in content_range:
+        total_size = int(content_range.rsplit("/", 1)[1])
+    return probe_header(header, total_size or response.get("ContentLength"))
+
+
+# 요청: {"key", "upload_id"(multipart인 경우), "upload_token", "parts"([{"part_number", "etag"}], 생략 가능),
+#        "language_code", "enable_speaker_diarization", "max_speaker_count"}
+@app.post("/upload/complete")
+async def complete_upload(request: Request, body: dict = Body(...)):
+    require_s3()
+    s3_key = body.get("key") or ""
+    if not s3_key.startswith("audio/"):
+        raise HTTPException(status_code=400, detail="Invalid upload key")
+    upload_id = body.get("upload_id")
+    verify_upload(request, body, s3_key, upload_id)
+    try:
+        probe = await asyncio.to_thread(
+            complete_direct_upload, s3_key, upload_id, body.get("parts")
+        )
+    except ClientError as e:
+        logger.error(f"Failed to complete upload {s3_key}: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Failed to complete upload: {str(e)}")
+    if probe["format"] is None:
+        await asyncio.to_thread(s3_client.delete_object, Bucket=S3_BUCKET, Key=s3_key)
+        raise HTTPException(status_code=415, detail="Unrecognized or corrupt audio data")
+    logger.info(f"Direct upload completed: {s3_key}, probe: {probe}")
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    job_name = f"transcribe-job-{timestamp}-{uuid.uuid4()}"
+    try:
+        await asyncio.to_thread(
+            start_transcription,
+            job_name,
+            f"s3://{S3_BUCKET}/{s3_key}",
+            probe["format"],
+            body.get("language_code", "ko-KR"),
+            str(body.get("enable_speaker_diarization", "true")),
+            body.get("max_speaker_count", 10),
+        )
+    except Exception as e:
+        logger.error(f"Error starting transcription for {s3_key}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to start transcription: {str(e)}")
+    audio_seconds = probe.get("duration")
+    if audio_seconds is None:
+        url = await asyncio.to_thread(storage.presigned_url, s3_key, PRESIGN_EXPIRES_SECONDS)
+        audio_seconds = await asyncio.to_thread(media_seconds, probe, url)
+    await asyncio.to_thread(
+        enqueue_transcription, job_name, request_user(request, body), audio_seconds
+    )
+    return {
+        "success": True,
+        "job_id": job_name,
+        "s3_key": s3_key,
+        "message": "Upload completed and transcription job started",
+    }
+
+
+# 요청: {"key", "upload_id", "upload_token"}
+@app.post("/upload/abort")
+async def abort_upload(request: Request, body: dict = Body(...)):
+    require_s3()
+    s3_key = body.get("key")
+    upload_id = body.get("upload_id")
+    if not s3_key or not upload_id:
+        raise HTTPException(status_code=400, detail="key and upload_id are required")
+    verify_upload(request, body, s3_key, upload_id)
+    try:
+        await asyncio.to_thread(
+            s3_client.abort_multipart_upload,
+            Bucket=S3_BUCKET,
+            Key=s3_key,
+            UploadId=upload_id,
+        )
+    except ClientError as e:
+        raise HTTPException(status_code=400, detail=f"Failed to abort upload: {str(e)}")
+    return {"success": True}
+
+
+# 완료된 작업 상태 캐시 (job_id -> 결과 파일 메타데이터), 최근 조회 순 LRU
+# 조회는 이벤트 루프와 작업 스레드(to_thread) 양쪽에서 하므로 잠금
+JOB_STATUS_CACHE = OrderedDict()
+JOB_STATUS_CACHE_SIZE = 1024
+JOB_STATUS_CACHE_LOCK = threading.Lock()
+
+
+def cached_job_meta(job_id):
+    with JOB_STATUS_CACHE_LOCK:
+        meta = JOB_STATUS_CACHE.get(job_id)
+        if meta is not None:
+            JOB_STATUS_CACHE.move_to_end(job_id)
+        return meta
+
+
+def cache_job_meta(job_id, meta):
+    with JOB_STATUS_CACHE_LOCK:
+        JOB_STATUS_CACHE[job_id] = meta
+        JOB_STATUS_CACHE.move_to_end(job_id)
+        while len(JOB_STATUS_CACHE) > JOB_STATUS_CACHE_SIZE:
+            JOB_STATUS_CACHE.popitem(last=False)
+# 저장/색인까지 끝난 작업 (결과 파일은 한 번만 생성되므로 이후 full 조회는 다시 저장하지 않음)
+PERSISTED_JOBS = {}
+PERSISTED_JOBS_SIZE = 4096
+
+
+def mark_persisted(job_id):
+    PERSISTED_JOBS[job_id] = True
+    while len(PERSISTED_JOBS) > PERSISTED_JOBS_SIZE:
+        PERSISTED_JOBS.pop(next(iter(PERSISTED_JOBS)))
+
+
+def save_formatted_result(result, job_id, transcript_data, file_name):
+    # 무음 제거 후 전사한 경우 원본 녹음 기준 시간으로 복원
+    offset_map = load_offset_map(job_id)
+    if offset_map:
+        remap_transcript(transcript_data, offset_map)
+    with stage("transcript_align"):
+        turns = build_turns(transcript_data)
+    persisted = job_id in PERSISTED_JOBS
+    if persisted:
+        result["dynamodb_saved"] = True
+    else:
+        db_result = save_transcription_to_dynamodb(
+            job_id, transcript_data, file_name, turns
+        )
+        if db_result:
+            logger.info(f"Successfully saved transcription to DynamoDB for job: {job_id}")
+            result["dynamodb_saved"] = True
+        else:
+            logger.warning(f"Failed to save transcription to DynamoDB for job: {job_id}")
+            result["dynamodb_saved"] = False
+    with stage("transcript_render"):
+        result["transcript"] = format_transcript(transcript_data, turns)
+    if persisted:
+        return
+    if job_id not in SEGMENT_INDEX_CACHE:
+        save_segment_index(job_id, transcript_data, turns)
+    if result["dynamodb_saved"]:
+        mark_persisted(job_id)
+
+
+# 발화 구간 오프셋 인덱스 (job_id -> 인덱스), 완료 시점에 생성
+SEGMENT_INDEX_CACHE = {}
+SEGMENT_INDEX_CACHE_SIZE = 256
+
+
+def cache_segment_index(job_id, index):
+    SEGMENT_INDEX_CACHE[job_id] = index
+    while len(SEGMENT_INDEX_CACHE) > SEGMENT_INDEX_CACHE_SIZE:
+        SEGMENT_INDEX_CACHE.pop(next(iter(SEGMENT_INDEX_CACHE)))
+
+
+# 발화 텍스트(transcript_index/{job_id}.txt)와 오프셋 인덱스(.json) 저장
+def save_segment_index(job_id, transcript_data, turns=None):
     try:
-        s3_key = f"transcribe_results/{job_id}.json"
-        result = {"job_id": job_id, "status": "UNKNOWN"}
+        if turns is None:
+            turns = build_turns(transcript_data)
+        with stage("segment_index"):
+            data, index = build_segment_index(turns)
+            index["version"] = content_hash(data, json.dumps(index))
+        storage.put_bytes(f"transcript_index/{job_id}.txt", data)
+        storage.put_bytes(
+            f"transcript_index/{job_id}.json", json.dumps(index).encode("utf-8")
+        )
+        cache_segment_index(job_id, index)
+        logger.info(f"Segment index saved for job: {job_id} ({len(index['offset'])} turns)")
+        return index
+    except Exception as e:
+        logger.error(f"Error saving segment index: {str(e)}")
+        return None
+
 
+def load_segment_index(job_id):
+    index = SEGMENT_INDEX_CACHE.get(job_id)
+    if index:
+        return index
+    try:
+        index = json.loads(storage.get_bytes(f"transcript_index/{job_id}.json"))
+    except StorageNotFound:
+        # 인덱스 도입 이전 작업은 결과 파일로부터 생성
         try:
-            logger.info(f"Retrieving file from S3: {S3_BUCKET}/{s3_key}")
-            response = s3_client.get_object(Bucket=S3_BUCKET, Key=s3_key)
-            file_content = response["Body"].read().decode("utf-8")
-            transcript_data = json.loads(file_content)
-            logger.info(
-                f"Successfully retrieved file from S3, content size: {len(file_content)} bytes"
-            )
-            result["status"] = "COMPLETED"
-            file_name = s3_key.split("/")[-1]
-            simple_transcript = transcript_data["results"]["transcripts"][0][
-                "transcript"
-            ]
+            data = storage.get_bytes(f"transcribe_results/{job_id}.json")
+        except StorageNotFound:
+            return None
+        # 완료 처리(save_formatted_result)와 같이 무음 제거 작업은 원본 시간으로 복원
+        transcript_data = json.loads(data)
+        offset_map = load_offset_map(job_id)
+        if offset_map:
+            remap_transcript(transcript_data, offset_map)
+        return save_segment_index(job_id, transcript_data)
+    cache_segment_index(job_id, index)
+    return index
+
+
+# 발화 인덱스로 전체 발화 목록 복원 (벡터 색인 단계 입력)
+def load_segment_turns(job_id):
+    index = load_segment_index(job_id)
+    if index is None:
+        return None
+    total = len(index["offset"])
+    data = read_segment_bytes(job_id, 0, index["offset"][-1] + index["length"][-1]) if total else b""
+    return slice_turns(index, 0, total, data)
+
+
+# 발화 텍스트 중 필요한 바이트 범위만 읽기
+def read_segment_bytes(job_id, start, end):
+    if end <= start:
+        return b""
+    return storage.get_bytes(f"transcript_index/{job_id}.txt", (start, end))
+
+
+# 실시간 스트리밍 인식기 (transcribe: Amazon Transcribe Streaming, fake: 로컬 테스트용)
+STREAMING_RECOGNIZER = os.getenv(
+    "STREAMING_RECOGNIZER",
+    "transcribe" if AWS_ACCESS_KEY and AWS_SECRET_KEY else "fake",
+)
+
+
+def create_streaming_recognizer(language_code, sample_rate):
+    if STREAMING_RECOGNIZER == "transcribe":
+        return TranscribeStreamingRecognizer(
+            AWS_REGION, language_code, sample_rate, AWS_ACCESS_KEY, AWS_SECRET_KEY
+        )
+    return FakeStreamingRecognizer(sample_rate)
+
+
+# 스트리밍 세션 종료 후 배치 작업과 동일하게 저장/색인
+def persist_stream_result(job_id, turns, user_id=ANONYMOUS_USER):
+    transcript_data = {
+        "results": {"transcripts": [{"transcript": " ".join(t["text"] for t in turns)}]}
+    }
+    save_transcription_to_dynamodb(job_id, transcript_data, f"{job_id}.pcm", turns)
+    save_segment_index(job_id, transcript_data, turns)
+    pipeline.enqueue("embed", job_id, {"user_id": user_id})
+
+
+# 실시간 스트리밍 인식 WebSocket 엔드포인트
+# 바이너리 메시지: PCM16 mono 오디오 프레임, 텍스트 {"type": "end"}: 스트림 종료
+# 서버 -> 클라이언트: partial/final 발화 결과, 마지막에 completed
+# 사용량: 스트리밍 인식은 보낸 오디오만큼 과금되므로 세션이 끝나면(중단 포함) 받은 오디오 길이를 기록
+# 사용자는 user_id 쿼리 파라미터 또는 X-User-Id 헤더
+@app.websocket("/ws")
+async def stream_transcription(
+    websocket: WebSocket, language_code: str = "ko-KR", sample_rate: int = 16000
+):
+    await websocket.accept()
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    job_id = f"stream-job-{timestamp}-{uuid.uuid4()}"
+    user_id = request_user(websocket, websocket.query_params)
+    recognizer = create_streaming_recognizer(language_code, sample_rate)
+    archiver = AudioArchiver(storage, f"audio/{job_id}.pcm")
+    turns = []
+    connected = True
+
+    async def send(message):
+        nonlocal connected
+        if not connected:
+            return
+        try:
+            await websocket.send_json(message)
+        except Exception:
+            connected = False
 
-            # ----------- [변경: 시간순 대화 흐름 트랜스크립트 생성] -----------
-            formatted_transcript = simple_transcript
-            if "speaker_labels" in transcript_data["results"]:
-                segments = transcript_data["results"]["speaker_labels"]["segments"]
-                items = transcript_data["results"]["items"]
-
-                # 각 segment(발화 단위)별로 시간순 정렬
-                formatted_transcript_lines = []
-                for segment in segments:
-                    speaker_label = segment["speaker_label"]
-                    start_time = float(segment["start_time"])
-                    end_time = float(segment["end_time"])
-                    # 해당 segment의 단어 추출
-                    segment_items = [
-                        item for item in items
-                        if "start_time" in item and "end_time" in item
-                        and float(item["start_time"]) >= start_time
-                        and float(item["end_time"]) <= end_time
-                    ]
-                    segment_text = " ".join(
-                        [item["alternatives"][0]["content"] for item in segment_items]
+    async def receive_audio():
+        nonlocal connected
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    connected = False
+                    break
+                if message.get("bytes"):
+                    # 인식기 전달과 원본 보관을 병렬로 처리
+                    await asyncio.gather(
+                        recognizer.feed(message["bytes"]),
+                        archiver.write(message["bytes"]),
                     )
-                    if segment_text.strip():
-                        # 화자 번호 추출
-                        spk_num = 1
-                        if speaker_label.startswith("spk_"):
-                            try:
-                                spk_num = int(speaker_label.split("_")[1]) + 1
-                            except:
-                                pass
-                        # 시간 포맷 (00:00~00:03)
-                        def sec2str(sec):
-                            m, s = divmod(int(sec), 60)
-                            return f"{m:02}:{s:02}"
-                        time_str = f"{sec2str(start_time)}~{sec2str(end_time)}"
-                        formatted_transcript_lines.append(
-                            f"[화자{spk_num}] ({time_str}) {segment_text}"
-                        )
-                formatted_transcript = "\n".join(formatted_transcript_lines)
-            # -------------------------------------------------------------
+                elif message.get("text"):
+                    if json.loads(message["text"]).get("type") == "end":
+                        break
+        finally:
+            await recognizer.end()
 
-            db_result = save_transcription_to_dynamodb(
-                job_id, transcript_data, file_name
+    async def send_results():
+        async for segment in recognizer.results():
+            if segment["type"] == "final":
+                turns.append(segment)
+            await send({**segment, "line": render_turn(segment)})
+
+    try:
+        await recognizer.start()
+        await archiver.open()
+        logger.info(f"Started streaming transcription: {job_id}")
+        await asyncio.gather(receive_audio(), send_results())
+        audio_uri = await archiver.close()
+        await asyncio.to_thread(persist_stream_result, job_id, turns, user_id)
+        await send({
+            "type": "completed",
+            "job_id": job_id,
+            "audio_uri": audio_uri,
+            "transcript": "\n".join(render_turn(turn) for turn in turns),
+        })
+        if connected:
+            await websocket.close()
+    except WebSocketDisconnect:
+        await archiver.abort()
+    except Exception as e:
+        logger.error(f"Error in streaming transcription: {str(e)}")
+        await archiver.abort()
+        await send({"type": "error", "error": f"Streaming transcription failed: {str(e)}"})
+        if connected:
+            await websocket.close()
+    finally:
+        if archiver.size:
+            usage_tracker.add(
+                user_id,
+                TRANSCRIBE_STREAMING_MODEL,
+                jobs=1,
+                audio_seconds=archiver.size / (sample_rate * 2),
             )
-            if db_result:
-                logger.info(
-                    f"Successfully saved transcription to DynamoDB for job: {job_id}"
-                )
-                result["dynamodb_saved"] = True
-            else:
-                logger.warning(
-                    f"Failed to save transcription to DynamoDB for job: {job_id}"
-                )
-                result["dynamodb_saved"] = False
 
-            result["transcript"] = formatted_transcript
 
-        except s3_client.exceptions.NoSuchKey:
-            # ... (생략: Transcribe API로 직접 조회하는 부분 동일하게 위와 같은 방식으로 수정)
-            # 아래도 동일하게 formatted_transcript를 위와 같이 생성
+# 결과 파일을 내려받지 않고 완료 여부만 확인 (head_object / 캐시)
+def probe_job_status(job_id):
+    s3_key = f"transcribe_results/{job_id}.json"
+    result = {"job_id": job_id, "status": "UNKNOWN"}
 
-            transcribe_client = boto3.client(
-                "transcribe",
-                region_name=AWS_REGION,
-                aws_access_key_id=AWS_ACCESS_KEY,
-                aws_secret_access_key=AWS_SECRET_KEY,
-            )
-            response = transcribe_client.get_transcription_job(
-                TranscriptionJobName=job_id
-            )
+    cached = cached_job_meta(job_id)
+    if cached:
+        result["status"] = "COMPLETED"
+        result.update(cached)
+        return result
+
+    if job_id.startswith(SPLIT_JOB_PREFIX):
+        status, error = advance_split_job(job_id)
+        if status != "COMPLETED":
+            result["status"] = status
+            if error:
+                result["error"] = error
+            return result
+
+    try:
+        meta = storage.head(s3_key)
+        cache_job_meta(job_id, meta)
+        result["status"] = "COMPLETED"
+        result.update(meta)
+        return result
+    except StorageNotFound:
+        pass
+
+    # 결과 파일이 아직 없으면 Transcribe 작업 상태만 조회
+    response = get_transcribe_client().get_transcription_job(
+        TranscriptionJobName=job_id
+    )
+    job = response["TranscriptionJob"]
+    result["status"] = job["TranscriptionJobStatus"]
+    if result["status"] == "FAILED":
+        result["error"] = job.get("FailureReason", "Unknown error")
+    return result
 
-            job = response["TranscriptionJob"]
-            status = job["TranscriptionJobStatus"]
 
+# 결과 파일을 내려받아 트랜스크립트 생성 및 DynamoDB 저장
+def fetch_job_status(job_id):
+    s3_key = f"transcribe_results/{job_id}.json"
+    result = {"job_id": job_id, "status": "UNKNOWN"}
+
+    if job_id.startswith(SPLIT_JOB_PREFIX) and job_id not in JOB_STATUS_CACHE:
+        status, error = advance_split_job(job_id)
+        if status != "COMPLETED":
             result["status"] = status
+            if error:
+                result["error"] = error
+            return result
+
+    try:
+        logger.info(f"Retrieving result file: {storage.uri(s3_key)}")
+        body, meta = storage.get(s3_key)
+        file_content = body.decode("utf-8")
+        with stage("transcript_parse"):
+            transcript_data = json.loads(file_content)
+        logger.info(
+            f"Successfully retrieved result file, content size: {len(file_content)} bytes"
+        )
+        result["status"] = "COMPLETED"
+        cache_job_meta(job_id, meta)
+        file_name = s3_key.split("/")[-1]
+        save_formatted_result(result, job_id, transcript_data, file_name)
+
+    except StorageNotFound:
+        # 결과 파일이 없으면 Transcribe API로 직접 조회
+        response = get_transcribe_client().get_transcription_job(
+            TranscriptionJobName=job_id
+        )
+
+        job = response["TranscriptionJob"]
+        status = job["TranscriptionJobStatus"]
+
+        result["status"] = status
+
+        if status == "COMPLETED":
+            transcript_uri = job["Transcript"]["TranscriptFileUri"]
+            transcript_data = None
+            if transcript_uri.startswith("file://"):
+                transcript_data = json.loads(
+                    storage.get_bytes(storage.key_for_uri(transcript_uri))
+                )
+            else:
+                with stage("transcript_download"):
+                    import requests  # 결과 URI 다운로드에만 필요 (콜드 스타트에서 제외)
 
-            if status == "COMPLETED":
-                transcript_uri = job["Transcript"]["TranscriptFileUri"]
                 transcript_response = requests.get(transcript_uri)
                 if transcript_response.status_code == 200:
                     transcript_data = transcript_response.json()
-                    file_name = None
-                    if "OutputKey" in job:
-                        file_name = job["OutputKey"].split("/")[-1]
-                    elif "Media" in job and "MediaFileUri" in job["Media"]:
-                        file_name = job["Media"]["MediaFileUri"].split("/")[-1]
-                    simple_transcript = transcript_data["results"]["transcripts"][0][
-                        "transcript"
-                    ]
-                    formatted_transcript = simple_transcript
-                    if "speaker_labels" in transcript_data["results"]:
-                        segments = transcript_data["results"]["speaker_labels"]["segments"]
-                        items = transcript_data["results"]["items"]
-                        formatted_transcript_lines = []
-                        for segment in segments:
-                            speaker_label = segment["speaker_label"]
-                            start_time = float(segment["start_time"])
-                            end_time = float(segment["end_time"])
-                            segment_items = [
-                                item for item in items
-                                if "start_time" in item and "end_time" in item
-                                and float(item["start_time"]) >= start_time
-                                and float(item["end_time"]) <= end_time
-                            ]
-                            segment_text = " ".join(
-                                [item["alternatives"][0]["content"] for item in segment_items]
-                            )
-                            if segment_text.strip():
-                                spk_num = 1
-                                if speaker_label.startswith("spk_"):
-                                    try:
-                                        spk_num = int(speaker_label.split("_")[1]) + 1
-                                    except:
-                                        pass
-                                def sec2str(sec):
-                                    m, s = divmod(int(sec), 60)
-                                    return f"{m:02}:{s:02}"
-                                time_str = f"{sec2str(start_time)}~{sec2str(end_time)}"
-                                formatted_transcript_lines.append(
-                                    f"[화자{spk_num}] ({time_str}) {segment_text}"
-                                )
-                        formatted_transcript = "\n".join(formatted_transcript_lines)
-
-                    db_result = save_transcription_to_dynamodb(
-                        job_id, transcript_data, file_name
-                    )
-                    if db_result:
-                        logger.info(
-                            f"Successfully saved transcription to DynamoDB for job: {job_id}"
-                        )
-                        result["dynamodb_saved"] = True
-                    else:
-                        logger.warning(
-                            f"Failed to save transcription to DynamoDB for job: {job_id}"
-                        )
-                        result["dynamodb_saved"] = False
+            if transcript_data is not None:
+                file_name = None
+                if "OutputKey" in job:
+                    file_name = job["OutputKey"].split("/")[-1]
+                elif "Media" in job and "MediaFileUri" in job["Media"]:
+                    file_name = job["Media"]["MediaFileUri"].split("/")[-1]
+                save_formatted_result(result, job_id, transcript_data, file_name)
 
-                    result["transcript"] = formatted_transcript
+        elif status == "FAILED":
+            result["error"] = job.get("FailureReason", "Unknown error")
 
-            elif status == "FAILED":
-                result["error"] = job.get("FailureReason", "Unknown error")
+    return result
 
-        return result
 
+# 작업 상태 확인 엔드포인트 (mode=status: 상태/메타데이터만, mode=full: 트랜스크립트 포함)
+# 같은 job_id에 대한 동시 요청은 하나의 조회 결과를 공유
+# 완료된 작업은 결과 파일 ETag 기반 ETag를 붙여, 변경이 없으면 304
+@app.get("/job-status/{job_id}")
+async def get_job_status(job_id: str, request: Request, mode: str = "full"):
+    try:
+        cached = cached_job_meta(job_id)
+        if cached and etag_matches(request, make_etag(cached["etag"], mode)):
+            return not_modified(make_etag(cached["etag"], mode))
+        if mode == "status":
+            result = await single_flight.do(
+                ("job-status-probe", job_id), probe_job_status, job_id
+            )
+        else:
+            result = await single_flight.do(
+                ("job-status", job_id), fetch_job_status, job_id
+            )
+        meta = cached_job_meta(job_id) if result.get("status") == "COMPLETED" else None
+        return json_response(request, result, make_etag(meta["etag"], mode) if meta else None)
     except Exception as e:
         logger.error(f"Error checking job status: {str(e)}")
         return {"error": f"Failed to check job status: {str(e)}"}
 
 
-# 요약 생성 엔드포인트
-@app.post("/summarize-transcript")
-async def summarize_transcript(request: Request):
-    form = await request.form()
-    job_id = form.get("job_id")
-    prompt_arn = form.get("prompt_arn")
-
-    if not job_id:
-        raise HTTPException(status_code=400, detail="job_id is required")
-    if not prompt_arn:
-        raise HTTPException(status_code=400, detail="prompt_arn is required")
-
+# DynamoDB의 트랜스크립트로 요약 생성 후 저장
+def generate_summary(job_id, prompt_arn, user_id=ANONYMOUS_USER):
     table = dynamodb.Table(DYNAMODB_TABLE)
     resp = table.get_item(Key={"id": job_id})
     if "Item" not in resp:
@@ -586,7 +1908,8 @@ async def summarize_transcript(request: Request):
     if not transcript_text:
         raise HTTPException(status_code=400, detail="Transcript is empty")
 
-    summary = summarize_text_with_bedrock_promptmgmt(transcript_text, prompt_arn)
+    with stage("summary"):
+        summary = summarize_text_with_bedrock_promptmgmt(transcript_text, prompt_arn, user_id)
     if not summary:
         raise HTTPException(status_code=500, detail="Bedrock summary failed")
     update_dynamodb_with_summary(job_id, summary)
@@ -597,10 +1920,193 @@ async def summarize_transcript(request: Request):
         "message": "Summary generated and saved successfully",
     }
 
+# 요약 생성 엔드포인트
+@app.post("/summarize-transcript")
+async def summarize_transcript(request: Request):
+    form = await request.form()
+    job_id = form.get("job_id")
+    prompt_arn = form.get("prompt_arn")
+
+    if not job_id:
+        raise HTTPException(status_code=400, detail="job_id is required")
+    if not prompt_arn:
+        raise HTTPException(status_code=400, detail="prompt_arn is required")
+    tracer.bind_job(job_id)
+
+    return await single_flight.do(
+        ("summarize", job_id, prompt_arn),
+        generate_summary,
+        job_id,
+        prompt_arn,
+        request_user(request, form),
+    )
+
+# ---- 파이프라인 단계 핸들러 ----
+# 이후 단계에는 user_id를 payload로 전달, 오디오 길이는 전사가 완료되면 사용량으로 기록
+def enqueue_transcription(job_id, user_id=ANONYMOUS_USER, audio_seconds=None):
+    tracer.bind_job(job_id)
+    pipeline.enqueue(
+        "transcribe", job_id, {"user_id": user_id, "audio_seconds": audio_seconds}
+    )
+
+
+# 파이프라인 작업도 해당 job trace의 루트 span으로 기록
+def traced_task(stage_name, handler):
+    if asyncio.iscoroutinefunction(handler):
+        async def run(job_id, payload):
+            with tracer.request(f"pipeline.{stage_name}", job_id=job_id, ignore=(RetryLater,)):
+                return await handler(job_id, payload)
+    else:
+        def run(job_id, payload):
+            with tracer.request(f"pipeline.{stage_name}", job_id=job_id, ignore=(RetryLater,)):
+                return handler(job_id, payload)
+    return run
+
+
+# Transcribe(또는 분할 작업) 완료 대기, 완료된 작업만 Transcribe 사용량으로 기록
+def pipeline_wait_transcription(job_id, payload):
+    status = probe_job_status(job_id)
+    if status["status"] == "FAILED":
+        raise PermanentError(status.get("error", "Transcription failed"))
+    if status["status"] != "COMPLETED":
+        raise RetryLater(PIPELINE_POLL_SECONDS, status["status"])
+    pipeline.enqueue("persist", job_id, {"user_id": payload.get("user_id")})
+    usage_tracker.add(
+        payload.get("user_id"),
+        TRANSCRIBE_MODEL,
+        jobs=1,
+        audio_seconds=payload.get("audio_seconds") or 0,
+    )
+
+
+# 결과 파일로 트랜스크립트/인덱스 저장 (클라이언트 조회와 같은 single-flight 키 사용)
+async def pipeline_persist(job_id, payload):
+    result = await single_flight.do(("job-status", job_id), fetch_job_status, job_id)
+    if result["status"] != "COMPLETED":
+        raise RetryLater(PIPELINE_POLL_SECONDS, result["status"])
+    await asyncio.to_thread(
+        pipeline.enqueue, "embed", job_id, {"user_id": payload.get("user_id")}
+    )
+    if PIPELINE_SUMMARY_PROMPT_ARN and result.get("dynamodb_saved"):
+        await asyncio.to_thread(
+            pipeline.enqueue,
+            "summarize",
+            job_id,
+            {"prompt_arn": PIPELINE_SUMMARY_PROMPT_ARN, "user_id": payload.get("user_id")},
+        )
+
+
+# 챗봇 검색용 임베딩 (Bedrock 임베딩은 청크마다 호출하므로 상태 조회 요청과 분리)
+def pipeline_embed(job_id, payload):
+    turns = load_segment_turns(job_id)
+    if turns is None:
+        raise PermanentError("Segment index not found")
+    with stage("vector_index"), usage_user(payload.get("user_id")):
+        vector_index.index_transcript(job_id, turns)
+
+
+async def pipeline_summarize(job_id, payload):
+    prompt_arn = payload["prompt_arn"]
+    try:
+        await single_flight.do(
+            ("summarize", job_id, prompt_arn),
+            generate_summary,
+            job_id,
+            prompt_arn,
+            payload.get("user_id") or ANONYMOUS_USER,
+        )
+    except HTTPException as e:
+        if e.status_code < 500:
+            raise PermanentError(e.detail)
+        raise
+
+
+pipeline.register("transcribe", traced_task("transcribe", pipeline_wait_transcription))
+pipeline.register("persist", traced_task("persist", pipeline_persist))
+pipeline.register("embed", traced_task("embed", pipeline_embed))
+pipeline.register("summarize", traced_task("summarize", pipeline_summarize))
+
+
+@app.get("/pipeline/stats")
+async def pipeline_stats():
+    return await asyncio.to_thread(pipeline.stats)
+
+
+@app.get("/pipeline/{job_id}")
+async def pipeline_job(job_id: str):
+    return {"job_id": job_id, "tasks": await asyncio.to_thread(pipeline.tasks_for_job, job_id)}
+
+
+def get_transcript_slice(
+    job_id, start_ms, end_ms, turn_start, turn_end, last, limit, cursor
+):
+    index = load_segment_index(job_id)
+    if index is None:
+        raise HTTPException(
+            status_code=404, detail=f"Transcript not found for job: {job_id}"
+        )
+    limit = max(1, min(limit, 500))
+    window_first, window_stop = select_turn_range(
+        index, start_ms, end_ms, turn_start, turn_end, last
+    )
+    first = window_first
+    if cursor:
+        try:
+            first = max(window_first, int(cursor))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    stop = min(first + limit, window_stop)
+
+    data = b""
+    if first < stop:
+        byte_start = index["offset"][first]
+        byte_end = index["offset"][stop - 1] + index["length"][stop - 1]
+        data = read_segment_bytes(job_id, byte_start, byte_end)
+    turns = slice_turns(index, first, stop, data)
+
+    return {
+        "job_id": job_id,
+        "total_turns": len(index["offset"]),
+        "turns": turns,
+        "transcript": "\n".join(render_turn(turn) for turn in turns),
+        "next_cursor": str(stop) if stop < window_stop else None,
+        "prev_cursor": (
+            str(max(first - limit, window_first)) if first > window_first else None
+        ),
+    }
+
+
 # 트랜스크립션 및 요약 조회 엔드포인트
+# 시간 범위(start_ms~end_ms), 발화 번호(turn_start~turn_end) 또는 마지막 N개(last) 조회 시
+# 오프셋 인덱스로 해당 구간만 읽어 페이지 단위로 반환
 @app.get("/get-transcript/{job_id}")
-async def get_transcript(job_id: str):
+async def get_transcript(
+    job_id: str,
+    request: Request,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None,
+    turn_start: Optional[int] = None,
+    turn_end: Optional[int] = None,
+    last: Optional[int] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+):
     try:
+        if any(
+            v is not None
+            for v in (start_ms, end_ms, turn_start, turn_end, last, cursor)
+        ):
+            # 구간 조회는 발화 인덱스 버전으로 ETag 비교 (일치하면 본문을 읽지 않음)
+            index = await asyncio.to_thread(load_segment_index, job_id)
+            etag = make_etag(index["version"]) if index and index.get("version") else None
+            if etag and etag_matches(request, etag):
+                return not_modified(etag)
+            result = await asyncio.to_thread(
+                get_transcript_slice,
+                job_id, start_ms, end_ms, turn_start, turn_end, last, limit, cursor,
+            )
+            return json_response(request, result, etag)
+
         if not dynamodb:
             logger.error("DynamoDB client not initialized. Cannot retrieve transcript.")
             raise HTTPException(
@@ -627,7 +2133,9 @@ async def get_transcript(job_id: str):
         if "summary" in item:
             result["summary"] = item["summary"]
 
-        return result
+        # 내용이 같으면 같은 ETag (같은 결과를 다시 저장해도 바뀌지 않음)
+        version = content_hash(result["transcript"], result.get("summary", ""))
+        return json_response(request, result, make_etag(version))
 
     except HTTPException:
         raise
@@ -637,6 +2145,270 @@ async def get_transcript(job_id: str):
             status_code=500, detail=f"Failed to retrieve transcript: {str(e)}"
         )
 
+# 트랜스크립트/요약 검색 엔드포인트 (일치한 발화의 시작/종료 ms 포함)
+@app.get("/search")
+async def search_transcripts(q: str, limit: int = 20):
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="q is required")
+    results = await asyncio.to_thread(search_index.search, q, max(1, min(limit, 100)))
+    return {"query": q, "results": results}
+
+# 질의별 관련 트랜스크립트 청크 top-k 검색 (여러 질의를 한 번에 처리)
+@app.post("/retrieve")
+async def retrieve_chunks(request: Request, body: dict = Body(...)):
+    queries = body.get("queries") or ([body["query"]] if body.get("query") else [])
+    if not queries:
+        raise HTTPException(status_code=400, detail="queries is required")
+    k = max(1, min(int(body.get("k", 5)), 50))
+    with usage_user(request_user(request, body)):
+        results = await asyncio.to_thread(
+            vector_index.search, queries, k, body.get("job_ids")
+        )
+    return {"results": [{"query": q, "chunks": r} for q, r in zip(queries, results)]}
+
+
+# 관련 청크만 Bedrock에 전달해 회의 내용 질의응답
+def answer_question(question, chunks, user_id=ANONYMOUS_USER):
+    context = "\n\n".join(
+        f"[{chunk['job_id']} {sec2str(chunk['start_ms'] / 1000)}~{sec2str(chunk['end_ms'] / 1000)}]\n{chunk['text']}"
+        for chunk in chunks
+    )
+    response = bedrock_runtime.converse(
+        modelId=CHATBOT_MODEL_ID,
+        system=[{"text": "주어진 회의 기록만 근거로 질문에 답하세요. 근거가 없으면 모른다고 답하세요."}],
+        messages=[{
+            "role": "user",
+            "content": [{"text": f"회의 기록:\n{context}\n\n질문: {question}"}],
+        }],
+    )
+    record_bedrock_usage(CHATBOT_MODEL_ID, response, user_id)
+    return (
+        response.get("output", {})
+                .get("message", {})
+                .get("content", [{}])[0]
+                .get("text", "")
+    )
+
+
+@app.post("/chatbot/ask")
+async def chatbot_ask(request: Request, body: dict = Body(...)):
+    question = body.get("question", "")
+    if not question.strip():
+        raise HTTPException(status_code=400, detail="question is required")
+    if not bedrock_runtime:
+        raise HTTPException(status_code=400, detail="Bedrock client not initialized")
+    k = max(1, min(int(body.get("k", 5)), 20))
+    user_id = request_user(request, body)
+    with usage_user(user_id):
+        chunks = (await asyncio.to_thread(
+            vector_index.search, [question], k, body.get("job_ids")
+        ))[0]
+    try:
+        answer = await asyncio.to_thread(answer_question, question, chunks, user_id)
+    except Exception as e:
+        logger.error(f"Error in chatbot answer: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Bedrock chatbot failed: {str(e)}")
+    return {
+        "question": question,
+        "answer": answer,
+        "sources": [
+            {key: chunk[key] for key in ("job_id", "start_ms", "end_ms", "score")}
+            for chunk in chunks
+        ],
+    }
+
+# 월별 사용량: GET /usage?user_id=...&month=YYYY-MM (user_id 생략 시 X-User-Id 헤더)
+# 아직 DynamoDB에 기록되지 않은 값도 포함, USAGE_PRICES가 있으면 예상 비용 포함
+@app.get("/usage")
+async def get_usage(request: Request, user_id: Optional[str] = None, month: Optional[str] = None):
+    user_id = user_id or request_user(request)
+    month = month or usage_day()[:7]
+    if not re.fullmatch(r"\d{4}-\d{2}", month):
+        raise HTTPException(status_code=400, detail="month must be YYYY-MM")
+    items = []
+    if usage_tracker.write:
+        try:
+            items = await asyncio.to_thread(query_usage_items, user_id, month)
+        except Exception as e:
+            logger.error(f"Error reading usage: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Failed to read usage: {str(e)}")
+    result = summarize_usage(items, usage_tracker.pending_for(user_id, month), USAGE_PRICES)
+    return dict(user_id=user_id, month=month, **result)
+
+
+# 업로드된 오디오 재생 (Range 요청 지원)
+# 로컬 저장소는 파일을 직접 응답 (ASGI 서버가 pathsend를 지원하면 sendfile로 전송),
+# S3는 presigned URL로 리다이렉트해 API 서버가 오디오 바이트를 중계하지 않음
+@app.get("/audio/{name:path}")
+async def get_audio(name: str):
+    key = f"audio/{name}"
+    if storage.kind == "local":
+        try:
+            path = storage.path(key)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid audio key")
+        if not os.path.isfile(path):
+            raise HTTPException(status_code=404, detail="Audio not found")
+        return FileResponse(path)
+    try:
+        await asyncio.to_thread(storage.head, key)
+    except StorageNotFound:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    url = await asyncio.to_thread(storage.presigned_url, key, PRESIGN_EXPIRES_SECONDS)
+    return RedirectResponse(url, status_code=307)
+
+
+@app.get("/admission-stats")
+async def admission_stats():
+    return {
+        "upload": upload_admission.stats(),
+        "transcode": transcode_admission.stats(),
+    }
+
+
+# /metrics 요청마다 스레드에서 조회한 파이프라인 큐 상태 (수집기는 이벤트 루프에서 실행되므로
+# SQLite를 직접 조회하지 않음)
+pipeline_stats_snapshot = {}
+
+
+# 입장 제어 / 파이프라인 큐 상태를 게이지로 노출
+def collect_runtime_gauges():
+    controllers = {"upload": upload_admission.stats(), "transcode": transcode_admission.stats()}
+    gauges = [
+        (f"globanote_admission_{key}", f"Admission controller {key}", ["controller"],
+         [((name,), stats[key]) for name, stats in controllers.items()])
+        for key in ("active", "inflight_bytes", "queue_depth", "admitted", "queued", "wait_seconds")
+    ]
+    gauges.append((
+        "globanote_admission_rejected", "Admission rejections by reason", ["controller", "reason"],
+        [((name, reason), count) for name, stats in controllers.items() for reason, count in stats["rejected"].items()],
+    ))
+    gauges.append((
+        "globanote_pipeline_tasks", "Pipeline tasks by stage and status", ["stage", "status"],
+        [((stage_name, status), count) for stage_name, statuses in pipeline_stats_snapshot.items() for status, count in statuses.items()],
+    ))
+    lag = loop_lag.stats()
+    gauges.append((
+        "globanote_event_loop_lag_max_seconds", "Max event loop lag over the recent window", [],
+        [((), lag["max_ms"] / 1000)] if lag["samples"] else [],
+    ))
+    return gauges
+
+
+metrics.add_collector(collect_runtime_gauges)
+
+
+@app.get("/metrics")
+async def get_metrics():
+    pipeline_stats_snapshot.clear()
+    pipeline_stats_snapshot.update(await asyncio.to_thread(pipeline.stats))
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+# ---- 운영 진단 (X-Admin-Token 헤더 필요) ----
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+admin = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+# CPU 프로파일 시작: {"mode": "sample"|"cprofile", "seconds": 30, "requests": 100, "interval_ms": 5, "include_idle": false}
+# seconds와 requests 중 먼저 도달하는 쪽에서 종료 (seconds는 PROFILE_MAX_SECONDS 이하)
+@admin.post("/profile")
+async def start_profile(body: dict = Body(default={})):
+    try:
+        session = profiler.start(
+            mode=body.get("mode", "sample"),
+            seconds=float(body["seconds"]) if body.get("seconds") else None,
+            max_requests=int(body["requests"]) if body.get("requests") else None,
+            interval=float(body.get("interval_ms", 5)) / 1000,
+            include_idle=bool(body.get("include_idle", False)),
+        )
+    except ProfileBusy as e:
+        raise HTTPException(status_code=409, detail=f"Profile already running: {e}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return session.info()
+
+
+@admin.post("/profile/stop")
+async def stop_profile():
+    session = profiler.stop()
+    if session is None:
+        raise HTTPException(status_code=404, detail="No profile running")
+    return session.info()
+
+
+@admin.get("/profile")
+async def list_profiles():
+    return {
+        "active": profiler.active.id if profiler.active else None,
+        "sessions": [s.info() for s in reversed(profiler.sessions.values())],
+    }
+
+
+@admin.get("/profile/{session_id}")
+async def get_profile(session_id: str):
+    session = profiler.sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return session.info()
+
+
+# .prof / .folded / .snapshot 파일 다운로드
+@admin.get("/files/{name}")
+async def download_profile_file(name: str):
+    path = os.path.join(PROFILE_DIR, os.path.basename(name))
+    if os.path.basename(name) != name or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="File not found")
+    return FileResponse(path, filename=name, media_type="application/octet-stream")
+
+
+@admin.post("/tracemalloc/start")
+async def start_tracemalloc(body: dict = Body(default={})):
+    return allocation_tracker.start(int(body.get("frames", 10)))
+
+
+@admin.post("/tracemalloc/stop")
+async def stop_tracemalloc():
+    return allocation_tracker.stop()
+
+
+@admin.get("/tracemalloc/snapshot")
+async def tracemalloc_snapshot(limit: int = 20, group_by: str = "lineno"):
+    if group_by not in ("lineno", "filename", "traceback"):
+        raise HTTPException(status_code=400, detail="group_by must be lineno, filename or traceback")
+    try:
+        return await asyncio.to_thread(allocation_tracker.snapshot, max(1, min(limit, 200)), group_by)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+# 이벤트 루프 지연, 기본 스레드풀 대기열, 입장 제어/파이프라인 상태
+@admin.get("/runtime")
+async def get_runtime():
+    return dict(
+        runtime_stats(loop_lag),
+        admission={"upload": upload_admission.stats(), "transcode": transcode_admission.stats()},
+        pipeline=await asyncio.to_thread(pipeline.stats),
+        tracemalloc=allocation_tracker.status(),
+        usage=usage_tracker.stats(),
+    )
+
+
+# 콜드 스타트 구간별 시간 (import, 모듈 초기화, lifespan, 클라이언트 첫 생성, 테이블 확인)
+@admin.get("/startup")
+async def get_startup_report():
+    return startup_report.report()
+
+
+app.include_router(admin)
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
@@ -652,6 +2424,9 @@ async def get_features():
         "bedrock_enabled": bedrock_runtime is not None,
         "recording_enabled": True,
         "file_upload_enabled": True,
+        "direct_upload_enabled": s3_client is not None,
+        "storage": storage.kind,
+        "transcribe_backend": TRANSCRIBE_BACKEND,
     }
     return features
 
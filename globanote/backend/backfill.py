@@ -0,0 +1,264 @@
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from backend import (
+    s3_client,
+    dynamodb,
+    S3_BUCKET,
+    DYNAMODB_TABLE,
+    LOCAL_STORAGE_DIR,
+    load_offset_map,
+    remap_transcript,
+    build_turns,
+    build_transcript_item,
+    update_transcript_item,
+    save_segment_index,
+    update_search_index,
+    update_vector_index,
+    search_index,
+    vector_index,
+    SEARCH_INDEX_DIR,
+    VECTOR_INDEX_DIR,
+)
+from index_lock import IndexLockBusy, lock_index_dirs
+
+# transcribe_results/ 의 기존 결과를 DynamoDB에 백필
+# - 목록은 페이지 단위로 조회, 페이지 안에서는 다운로드/포맷을 병렬 처리
+# - 쓰기는 batch_writer로 묶고 WCU 기준 토큰 버킷으로 속도 제한
+#   (--overwrite는 서버 저장과 같이 update_item으로 트랜스크립트 속성만 갱신해 summary 유지)
+# - 페이지가 끝날 때마다 체크포인트 저장 (중단 후 다시 실행하면 이어서 진행)
+# - 검색/발화/벡터 색인은 --indexes일 때만 갱신 (서버와 같은 색인 디렉터리를 쓰므로
+#   서버가 실행 중이면 잠금을 얻지 못해 바로 종료, 서버를 멈춘 뒤 실행)
+#   색인은 backend에서 처음 사용할 때 로드되므로 --indexes 없이는 색인 파일을 열지 않음
+#
+# 사용 예: python backfill.py --workers 16 --wcu 50
+
+# 분할 전사의 청크별 결과는 병합 결과와 중복이므로 제외
+CHUNK_KEY_RE = re.compile(r"-part\d{3}\.json$")
+
+
+class TokenBucket:
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def take(self, amount):
+        if not self.rate:
+            return
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # 한 번에 rate보다 큰 항목도 통과하도록 음수 잔고 허용
+            if self.tokens >= min(amount, self.rate):
+                self.tokens -= amount
+                return
+            time.sleep((min(amount, self.rate) - self.tokens) / self.rate)
+
+
+class Progress:
+    def __init__(self, report_seconds):
+        self.report_seconds = report_seconds
+        self.started = time.monotonic()
+        self.last_report = self.started
+        self.counts = {"written": 0, "existing": 0, "failed": 0, "bytes": 0}
+
+    def add(self, name, amount=1):
+        self.counts[name] += amount
+        now = time.monotonic()
+        if now - self.last_report >= self.report_seconds:
+            self.last_report = now
+            self.report()
+
+    def report(self, final=False):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        done = self.counts["written"] + self.counts["existing"] + self.counts["failed"]
+        print(
+            f"{'done' if final else 'progress'}: {done} objects in {elapsed:.1f}s"
+            f" ({done / elapsed:.1f} objects/s, {self.counts['written'] / elapsed:.1f} writes/s,"
+            f" {self.counts['bytes'] / elapsed / 1024 / 1024:.2f} MB/s)"
+            f" written={self.counts['written']} existing={self.counts['existing']}"
+            f" failed={self.counts['failed']}",
+            flush=True,
+        )
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return {"start_after": "", "failed": []}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, checkpoint):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def job_id_for(key, prefix):
+    return key[len(prefix):-len(".json")]
+
+
+# DynamoDB에 이미 있는 job_id (batch_get_item은 100개 단위)
+def existing_job_ids(job_ids):
+    found = set()
+    for i in range(0, len(job_ids), 100):
+        request = {
+            DYNAMODB_TABLE: {
+                "Keys": [{"id": job_id} for job_id in job_ids[i:i + 100]],
+                "ProjectionExpression": "#id",
+                "ExpressionAttributeNames": {"#id": "id"},
+            }
+        }
+        while request:
+            response = dynamodb.batch_get_item(RequestItems=request)
+            found.update(item["id"] for item in response["Responses"].get(DYNAMODB_TABLE, []))
+            request = response.get("UnprocessedKeys")
+    return found
+
+
+# get_job_status 완료 처리와 같은 변환 (offset map 복원 -> 발화 구성 -> 항목/인덱스)
+def prepare_item(key, prefix, with_indexes):
+    job_id = job_id_for(key, prefix)
+    body = s3_client.get_object(Bucket=S3_BUCKET, Key=key)["Body"].read()
+    transcript_data = json.loads(body.decode("utf-8"))
+    offset_map = load_offset_map(job_id)
+    if offset_map:
+        remap_transcript(transcript_data, offset_map)
+    turns = build_turns(transcript_data)
+    item = build_transcript_item(job_id, transcript_data, key.split("/")[-1])
+    if with_indexes:
+        update_search_index(job_id, turns=turns)
+        save_segment_index(job_id, transcript_data, turns)
+        update_vector_index(job_id, turns)
+    return item, len(body)
+
+
+def write_units(item):
+    size = len(json.dumps(item, ensure_ascii=False).encode("utf-8"))
+    return max(1, math.ceil(size / 1024))
+
+
+def process_keys(keys, args, table, pool, bucket, progress):
+    failed = []
+    if not args.overwrite:
+        existing = existing_job_ids([job_id_for(k, args.prefix) for k in keys])
+        progress.add("existing", len(existing))
+        keys = [k for k in keys if job_id_for(k, args.prefix) not in existing]
+    futures = {
+        pool.submit(prepare_item, key, args.prefix, args.indexes): key
+        for key in keys
+    }
+    # batch_writer는 스레드 안전하지 않으므로 쓰기는 이 스레드에서만
+    with table.batch_writer(overwrite_by_pkeys=["id"]) as writer:
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                item, size = future.result()
+            except Exception as e:
+                print(f"failed: {key}: {str(e)}", file=sys.stderr, flush=True)
+                failed.append(key)
+                progress.add("failed")
+                continue
+            bucket.take(write_units(item))
+            if args.overwrite:
+                try:
+                    update_transcript_item(table, item)
+                except Exception as e:
+                    print(f"failed: {key}: {str(e)}", file=sys.stderr, flush=True)
+                    failed.append(key)
+                    progress.add("failed")
+                    continue
+            else:
+                writer.put_item(Item=item)
+            progress.counts["bytes"] += size
+            progress.add("written")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill transcribe_results/ into DynamoDB")
+    parser.add_argument("--prefix", default="transcribe_results/")
+    parser.add_argument("--workers", type=int, default=16, help="parallel downloads")
+    parser.add_argument("--wcu", type=float, default=25.0, help="write capacity units per second (0: unlimited)")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=0, help="stop after this many objects (0: all)")
+    parser.add_argument("--checkpoint", default=os.path.join(LOCAL_STORAGE_DIR, "backfill_checkpoint.json"))
+    parser.add_argument("--overwrite", action="store_true", help="rewrite items that already exist")
+    parser.add_argument(
+        "--indexes", action="store_true",
+        help="also update segment/search/vector indexes (the server must be stopped)",
+    )
+    parser.add_argument("--report-seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    if not (s3_client and S3_BUCKET and dynamodb and DYNAMODB_TABLE):
+        parser.error("S3 and DynamoDB must be configured (see .env)")
+    if args.indexes:
+        try:
+            index_locks = lock_index_dirs([SEARCH_INDEX_DIR, VECTOR_INDEX_DIR], exclusive=True)
+        except IndexLockBusy as e:
+            sys.exit(f"Cannot update indexes: {str(e)}. Stop the server or run without --indexes.")
+
+    table = dynamodb.Table(DYNAMODB_TABLE)
+    checkpoint = load_checkpoint(args.checkpoint)
+    bucket = TokenBucket(args.wcu)
+    progress = Progress(args.report_seconds)
+    print(f"Resuming after '{checkpoint['start_after']}'" if checkpoint["start_after"] else "Starting from the beginning", flush=True)
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        # 이전 실행에서 실패한 객체부터 재시도
+        if checkpoint["failed"]:
+            checkpoint["failed"] = process_keys(checkpoint["failed"], args, table, pool, bucket, progress)
+            save_checkpoint(args.checkpoint, checkpoint)
+
+        paginator = s3_client.get_paginator("list_objects_v2")
+        pages = paginator.paginate(
+            Bucket=S3_BUCKET,
+            Prefix=args.prefix,
+            StartAfter=checkpoint["start_after"],
+            PaginationConfig={"PageSize": args.page_size},
+        )
+        processed = 0
+        for page in pages:
+            contents = page.get("Contents", [])
+            if not contents:
+                continue
+            keys = [
+                obj["Key"]
+                for obj in contents
+                if obj["Key"].endswith(".json") and not CHUNK_KEY_RE.search(obj["Key"])
+            ]
+            last_key = contents[-1]["Key"]
+            if args.limit:
+                if processed + len(keys) >= args.limit:
+                    keys = keys[:args.limit - processed]
+                    last_key = keys[-1] if keys else checkpoint["start_after"]
+            checkpoint["failed"] += process_keys(keys, args, table, pool, bucket, progress)
+            checkpoint["start_after"] = last_key
+            save_checkpoint(args.checkpoint, checkpoint)
+            processed += len(keys)
+            if args.limit and processed >= args.limit:
+                break
+
+    if args.indexes:
+        search_index.flush()
+        vector_index.flush()
+        for lock in index_locks:
+            lock.release()
+    progress.report(final=True)
+    if checkpoint["failed"]:
+        print(f"{len(checkpoint['failed'])} objects failed; run again to retry them", flush=True)
+
+
+if __name__ == "__main__":
+    main()
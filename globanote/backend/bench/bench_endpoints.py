@@ -0,0 +1,312 @@
+import argparse
+import asyncio
+import base64
+import json
+import os
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from common import (
+    BASELINE_DIR,
+    compare,
+    load_baseline,
+    machine_info,
+    make_wav,
+    percentile,
+    report_regressions,
+    response_failed,
+    save_results,
+)
+from fakes import setup_backend
+
+# backend.py 엔드포인트 벤치마크 (프로세스 안에서 ASGI로 직접 호출)
+# - S3: LocalStorage, Transcribe: LocalTranscribeClient, DynamoDB/Bedrock: fakes.py
+#   모두 호출마다 지정한 지연(ms)을 추가해 네트워크 왕복을 흉내냄
+# - 오디오 길이/트랜스크립트 길이별로 p50/p90/p99, 처리량(req/s), 구간 중 최대 RSS 기록
+# - --save로 baselines/endpoints.json 갱신, 아니면 기준값과 비교해 회귀 표시
+#
+# 사용 예 (backend 디렉터리에서):
+#   python bench/bench_endpoints.py --quick
+#   python bench/bench_endpoints.py --save
+
+BASELINE_PATH = os.path.join(BASELINE_DIR, "endpoints.json")
+PROMPT_ARN = "arn:aws:bedrock:local:000000000000:prompt/bench"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark backend endpoints against local AWS stand-ins")
+    parser.add_argument("--quick", action="store_true", help="fewer requests and smaller inputs (smoke run)")
+    parser.add_argument("--only", default="", help="run scenarios whose name contains this text")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=0, help="requests per scenario (0: per-scenario default)")
+    parser.add_argument("--s3-latency-ms", type=float, default=15.0)
+    parser.add_argument("--dynamodb-latency-ms", type=float, default=5.0)
+    parser.add_argument("--transcribe-latency-ms", type=float, default=40.0)
+    parser.add_argument("--bedrock-latency-ms", type=float, default=500.0)
+    parser.add_argument("--save", action="store_true", help=f"write results to {os.path.relpath(BASELINE_PATH)}")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative change reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    return parser.parse_args()
+
+
+# /proc/self/statm으로 구간 중 최대 RSS 측정 (없으면 프로세스 전체 최대값)
+class RssSampler:
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @staticmethod
+    def current():
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.peak = max(self.peak, self.current())
+
+    def __enter__(self):
+        self.peak = self.current()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop_event.set()
+        self.thread.join()
+        self.peak = max(self.peak, self.current())
+
+
+async def run_scenario(client, scenario, requests, concurrency):
+    for i in range(scenario.get("warmup", 1)):
+        await scenario["request"](client, i)
+
+    latencies = []
+    errors = 0
+    pending = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in pending:
+            started = time.perf_counter()
+            response = await scenario["request"](client, i)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response_failed(response):
+                errors += 1
+
+    with RssSampler() as rss:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50), 1),
+        "p90_ms": round(percentile(latencies, 0.90), 1),
+        "p99_ms": round(percentile(latencies, 0.99), 1),
+        "max_ms": round(latencies[-1], 1),
+        "mean_ms": round(statistics.fmean(latencies), 1),
+        "throughput_rps": round(requests / elapsed, 1),
+        "peak_rss_mb": round(rss.peak / 1024 / 1024, 1),
+    }
+
+
+# 트랜스크립트를 Transcribe 결과 위치에 직접 써두고 job-status로 한 번 저장(DynamoDB/인덱스)
+# 반환값: {job_id: job-status(full) ETag}
+async def prepare_jobs(client, local, minutes, count, speakers=2):
+    from local_transcribe import synthesize_transcript
+
+    etags = {}
+    for n in range(count):
+        job_id = f"bench-{minutes}min-{n}"
+        data = synthesize_transcript(job_id, minutes * 60, speakers)
+        local.put_bytes(f"transcribe_results/{job_id}.json", json.dumps(data, ensure_ascii=False))
+        response = await client.get(f"/job-status/{job_id}")
+        if response_failed(response):
+            raise RuntimeError(f"Failed to prepare {job_id}: {response.text}")
+        etags[job_id] = response.headers["etag"]
+    return etags
+
+
+def build_scenarios(jobs_by_minutes, audio_seconds, record_seconds, args):
+    scenarios = []
+
+    for seconds in audio_seconds:
+        wav = make_wav(seconds)
+
+        async def upload(client, i, wav=wav, seconds=seconds):
+            return await client.post(
+                "/upload-audio",
+                files={"audio_file": (f"bench_{seconds}s.wav", wav, "audio/wav")},
+                data={"split_mode": "false", "max_speaker_count": "2"},
+            )
+
+        scenarios.append({"name": f"upload-audio/{seconds}s", "request": upload, "requests": 20})
+
+    for seconds in record_seconds:
+        body = {
+            "audio_data": "data:audio/wav;base64," + base64.b64encode(make_wav(seconds)).decode("ascii"),
+            "max_speaker_count": 2,
+        }
+
+        async def record(client, i, body=body):
+            return await client.post("/record-audio", json=body)
+
+        scenarios.append({"name": f"record-audio/{seconds}s", "request": record, "requests": 20})
+
+    # 같은 job_id의 동시 요청은 single_flight로 합쳐지므로 요청마다 다른 작업을 돌아가며 조회
+    for minutes, etags in jobs_by_minutes.items():
+        job_ids = list(etags)
+
+        def pick(i, job_ids=job_ids):
+            return job_ids[i % len(job_ids)]
+
+        async def status_full(client, i, pick=pick):
+            return await client.get(f"/job-status/{pick(i)}", headers={"Accept-Encoding": "gzip"})
+
+        async def status_probe(client, i, pick=pick):
+            return await client.get(f"/job-status/{pick(i)}", params={"mode": "status"})
+
+        async def status_revalidate(client, i, pick=pick, etags=etags):
+            job_id = pick(i)
+            return await client.get(
+                f"/job-status/{job_id}", headers={"If-None-Match": etags[job_id], "Accept-Encoding": "gzip"}
+            )
+
+        async def transcript_full(client, i, pick=pick):
+            return await client.get(f"/get-transcript/{pick(i)}", headers={"Accept-Encoding": "gzip"})
+
+        async def transcript_slice(client, i, pick=pick):
+            return await client.get(
+                f"/get-transcript/{pick(i)}", params={"last": 50}, headers={"Accept-Encoding": "gzip"}
+            )
+
+        async def summarize(client, i, pick=pick):
+            return await client.post(
+                "/summarize-transcript", data={"job_id": pick(i), "prompt_arn": PROMPT_ARN}
+            )
+
+        scenarios += [
+            {"name": f"job-status/full/{minutes}min", "request": status_full, "requests": 40},
+            {"name": f"job-status/status/{minutes}min", "request": status_probe, "requests": 200},
+            {"name": f"job-status/304/{minutes}min", "request": status_revalidate, "requests": 200},
+            {"name": f"get-transcript/full/{minutes}min", "request": transcript_full, "requests": 200},
+            {"name": f"get-transcript/slice/{minutes}min", "request": transcript_slice, "requests": 200},
+            {"name": f"summarize-transcript/{minutes}min", "request": summarize, "requests": 16},
+        ]
+
+    for scenario in scenarios:
+        if args.requests:
+            scenario["requests"] = args.requests
+        elif args.quick:
+            scenario["requests"] = max(4, scenario["requests"] // 5)
+    return [s for s in scenarios if args.only in s["name"]]
+
+
+def print_table(results, baseline):
+    header = f"{'scenario':36} {'p50':>8} {'p90':>8} {'p99':>8} {'req/s':>8} {'rss MB':>8} {'err':>4} {'p50 vs base':>12}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results["scenarios"].items():
+        delta = ""
+        previous = (baseline or {}).get("scenarios", {}).get(name)
+        if previous and previous["p50_ms"]:
+            delta = f"{(r['p50_ms'] - previous['p50_ms']) / previous['p50_ms']:+.0%}"
+        print(
+            f"{name:36} {r['p50_ms']:8.1f} {r['p90_ms']:8.1f} {r['p99_ms']:8.1f}"
+            f" {r['throughput_rps']:8.1f} {r['peak_rss_mb']:8.1f} {r['errors']:4d} {delta:>12}"
+        )
+
+
+async def run(args, work_dir):
+    import httpx
+
+    backend, local = setup_backend(
+        work_dir,
+        s3_latency_ms=args.s3_latency_ms,
+        dynamodb_latency_ms=args.dynamodb_latency_ms,
+        transcribe_latency_ms=args.transcribe_latency_ms,
+        bedrock_latency_ms=args.bedrock_latency_ms,
+    )
+
+    if args.quick:
+        audio_seconds, record_seconds, transcript_minutes = [10, 60], [10], [5, 30]
+    else:
+        audio_seconds, record_seconds, transcript_minutes = [10, 60, 600], [10, 60], [5, 30, 120]
+
+    transport = httpx.ASGITransport(app=backend.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        jobs_by_minutes = {
+            minutes: await prepare_jobs(client, local, minutes, args.concurrency)
+            for minutes in transcript_minutes
+        }
+        scenarios = build_scenarios(jobs_by_minutes, audio_seconds, record_seconds, args)
+        results = {}
+        for scenario in scenarios:
+            print(f"running {scenario['name']} ({scenario['requests']} requests)...", flush=True)
+            results[scenario["name"]] = await run_scenario(
+                client, scenario, scenario["requests"], args.concurrency
+            )
+    return results
+
+
+def main():
+    args = parse_args()
+    work_dir = tempfile.mkdtemp(prefix="globanote-bench-")
+    try:
+        scenario_results = asyncio.run(run(args, work_dir))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        "settings": {
+            "quick": args.quick,
+            "concurrency": args.concurrency,
+            "s3_latency_ms": args.s3_latency_ms,
+            "dynamodb_latency_ms": args.dynamodb_latency_ms,
+            "transcribe_latency_ms": args.transcribe_latency_ms,
+            "bedrock_latency_ms": args.bedrock_latency_ms,
+        },
+        "machine": machine_info(),
+        "scenarios": scenario_results,
+    }
+    baseline = None if args.save else load_baseline(args.baseline)
+    print()
+    print_table(results, baseline)
+
+    # 실패한 요청이 섞인 지연 시간은 기준선과 비교하거나 기준선으로 저장하지 않음
+    failed = {name: r["errors"] for name, r in scenario_results.items() if r["errors"]}
+    if failed:
+        print(f"\n{len(failed)} scenario(s) had failed requests:")
+        for name, count in failed.items():
+            print(f"  {name}: {count} of {scenario_results[name]['requests']}")
+        sys.exit(1)
+
+    if args.json_path:
+        save_results(args.json_path, results)
+    if args.save:
+        save_results(args.baseline, results)
+        print(f"\nbaseline saved to {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.threshold, ("p50_ms", "p90_ms", "peak_rss_mb"))
+    report_regressions(regressions, args.threshold, args.fail_on_regression)
+
+
+if __name__ == "__main__":
+    main()
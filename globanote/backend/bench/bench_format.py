@@ -0,0 +1,186 @@
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from common import BASELINE_DIR, BENCH_DIR, compare, load_baseline, machine_info, report_regressions, save_results
+from transcript_gen import generate_transcript
+from transcript_format import build_segment_index, build_turns, format_transcript
+
+# 트랜스크립트 포맷 마이크로벤치마크 (get_job_status / show_transcript_formatted 경로)
+# - 입력: transcript_gen의 시드 고정 합성 결과 (1분 ~ 6시간)
+# - 단계: JSON 파싱, 화자 segment-단어 정렬(build_turns), 렌더링, 발화 인덱스, 화면용 markdown 변환
+# - 시간은 tracemalloc 없이 여러 번 실행한 중앙값, 메모리는 tracemalloc 한 번 실행한 최대 할당량
+# - 오디오 1시간당 값으로도 환산해 길이에 따라 선형인지 바로 보이도록
+#
+# 사용 예 (backend 디렉터리에서):
+#   python bench/bench_format.py --quick
+#   python bench/bench_format.py --save
+
+BASELINE_PATH = os.path.join(BASELINE_DIR, "format.json")
+FULL_MINUTES = [1, 10, 60, 180, 360]
+QUICK_MINUTES = [1, 10, 60]
+
+
+def load_frontend_view():
+    sys.path.insert(0, os.path.join(BENCH_DIR, "..", "..", "frontend"))
+    from transcript_view import transcript_markdown_lines
+
+    return transcript_markdown_lines
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for transcript parsing, alignment and rendering")
+    parser.add_argument("--quick", action="store_true", help=f"only {QUICK_MINUTES} minutes")
+    parser.add_argument("--minutes", type=float, nargs="+", help="audio durations to generate")
+    parser.add_argument("--speakers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", default="", help="run stages whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.5, help="repeat each stage for at least this many seconds")
+    parser.add_argument("--max-repeats", type=int, default=20)
+    parser.add_argument(
+        "--max-seconds", type=float, default=30.0,
+        help="skip longer inputs for a stage once one run is expected to exceed this",
+    )
+    parser.add_argument("--save", action="store_true", help=f"write results to {os.path.relpath(BASELINE_PATH)}")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative change reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    return parser.parse_args()
+
+
+# 단계별 (이름, 입력 준비 함수, 측정 함수)
+def build_stages(markdown_lines):
+    return [
+        ("parse", lambda c: c["raw"], json.loads),
+        ("align", lambda c: c["data"], build_turns),
+        ("align-no-speakers", lambda c: c["plain"], build_turns),
+        ("render", lambda c: (c["data"], c["turns"]), lambda a: format_transcript(*a)),
+        ("segment-index", lambda c: c["turns"], build_segment_index),
+        ("frontend-markdown", lambda c: c["text"], markdown_lines),
+    ]
+
+
+def prepare_case(minutes, speakers, seed):
+    data = generate_transcript(minutes * 60, speakers, seed)
+    plain = generate_transcript(minutes * 60, 0, seed)
+    turns = build_turns(data)
+    return {
+        "data": data,
+        "plain": plain,
+        "raw": json.dumps(data, ensure_ascii=False),
+        "turns": turns,
+        "text": format_transcript(data, turns),
+        "words": sum(1 for item in data["results"]["items"] if item["type"] == "pronunciation"),
+    }
+
+
+def time_stage(func, arg, min_time, max_repeats):
+    times = []
+    started = time.perf_counter()
+    while len(times) < max_repeats and (not times or time.perf_counter() - started < min_time):
+        gc.collect()
+        t = time.perf_counter()
+        func(arg)
+        times.append(time.perf_counter() - t)
+    return times
+
+
+def measure_allocations(func, arg):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func(arg)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return current, peak
+
+
+def run(args):
+    minutes_list = args.minutes or (QUICK_MINUTES if args.quick else FULL_MINUTES)
+    stages = [s for s in build_stages(load_frontend_view()) if args.only in s[0]]
+    last_seconds = {}
+    results = {}
+    previous_minutes = None
+    for minutes in minutes_list:
+        print(f"generating {minutes:g} min transcript ({args.speakers} speakers)...", flush=True)
+        case = prepare_case(minutes, args.speakers, args.seed)
+        hours = minutes / 60
+        for name, prepare, func in stages:
+            key = f"{name}/{minutes:g}min"
+            # 이전 길이에서의 시간을 길이에 비례해 늘렸을 때 예산을 넘으면 생략
+            if name in last_seconds and last_seconds[name] * minutes / previous_minutes > args.max_seconds:
+                print(f"skipping {key}: expected to exceed {args.max_seconds:g}s", flush=True)
+                results[key] = {"skipped": f"expected to exceed {args.max_seconds:g}s"}
+                continue
+            arg = prepare(case)
+            times = time_stage(func, arg, args.min_time, args.max_repeats)
+            retained, peak = measure_allocations(func, arg)
+            median = statistics.median(times)
+            last_seconds[name] = median
+            results[key] = {
+                "minutes": minutes,
+                "words": case["words"],
+                "repeats": len(times),
+                "median_ms": round(median * 1000, 2),
+                "min_ms": round(min(times) * 1000, 2),
+                "ms_per_audio_hour": round(median * 1000 / hours, 2),
+                "peak_alloc_mb": round(peak / 1024 / 1024, 2),
+                "peak_alloc_mb_per_audio_hour": round(peak / 1024 / 1024 / hours, 2),
+                "retained_mb": round(retained / 1024 / 1024, 2),
+            }
+        previous_minutes = minutes
+        del case
+    return results
+
+
+def print_table(results, baseline):
+    header = f"{'stage':28} {'words':>8} {'median ms':>10} {'ms/audio h':>11} {'peak MB':>9} {'MB/audio h':>11} {'vs base':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results["scenarios"].items():
+        if "skipped" in r:
+            print(f"{name:28} skipped ({r['skipped']})")
+            continue
+        delta = ""
+        previous = (baseline or {}).get("scenarios", {}).get(name)
+        if previous and previous.get("median_ms"):
+            delta = f"{(r['median_ms'] - previous['median_ms']) / previous['median_ms']:+.0%}"
+        print(
+            f"{name:28} {r['words']:8d} {r['median_ms']:10.2f} {r['ms_per_audio_hour']:11.2f}"
+            f" {r['peak_alloc_mb']:9.2f} {r['peak_alloc_mb_per_audio_hour']:11.2f} {delta:>8}"
+        )
+
+
+def main():
+    args = parse_args()
+    results = {
+        "settings": {
+            "minutes": args.minutes or (QUICK_MINUTES if args.quick else FULL_MINUTES),
+            "speakers": args.speakers,
+            "seed": args.seed,
+        },
+        "machine": machine_info(),
+        "scenarios": run(args),
+    }
+    baseline = None if args.save else load_baseline(args.baseline)
+    print()
+    print_table(results, baseline)
+
+    if args.save:
+        save_results(args.baseline, results)
+        print(f"\nbaseline saved to {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.threshold, ("median_ms", "peak_alloc_mb"))
+    report_regressions(regressions, args.threshold, args.fail_on_regression)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from common import BASELINE_DIR, BENCH_DIR, compare, load_baseline, machine_info, report_regressions, save_results
+
+# 콜드 스타트 측정: 새 프로세스에서 backend import -> lifespan 시작(요청 받을 준비)까지
+# - AWS 자격 증명은 가짜 값으로 설정 (클라이언트가 지연 생성되는지 확인, 네트워크 호출 없음)
+#   테이블 확인과 클라이언트 미리 생성은 끔
+# - 구간별 시간은 backend.startup_report (import/초기화/lifespan)
+# - --importtime: python -X importtime으로 오래 걸리는 import 상위 항목 출력
+# - --target-seconds: 준비 시간 중앙값이 목표를 넘으면 실패 (CI용)
+#
+# 사용 예 (backend 디렉터리에서):
+#   python bench/bench_startup.py --importtime
+#   python bench/bench_startup.py --target-seconds 2 --save
+
+BASELINE_PATH = os.path.join(BASELINE_DIR, "startup.json")
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+
+CHILD = """
+import asyncio, json, time
+started = time.perf_counter()
+import backend
+imported = time.perf_counter()
+
+async def main():
+    async with backend.app.router.lifespan_context(backend.app):
+        ready = time.perf_counter()
+    return ready
+
+ready = asyncio.run(main())
+print(json.dumps({
+    "import_seconds": imported - started,
+    "ready_seconds": ready - started,
+    "report": backend.startup_report.report(),
+}))
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for the backend app")
+    parser.add_argument("--quick", action="store_true", help="3 runs instead of --runs")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--importtime", action="store_true", help="list the slowest imports")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--target-seconds", type=float, help="fail if median time to ready exceeds this")
+    parser.add_argument("--save", action="store_true", help=f"write results to {os.path.relpath(BASELINE_PATH)}")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative change reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    return parser.parse_args()
+
+
+def child_env(work_dir):
+    env = dict(os.environ)
+    env.update({
+        "AWS_ACCESS_KEY": "bench",
+        "AWS_SECRET_KEY": "bench",
+        "AWS_REGION": "us-east-1",
+        "S3_BUCKET": "bench-bucket",
+        "DYNAMODB_TABLE": "bench-transcripts",
+        "DYNAMODB_TABLE_CHECK": "off",
+        "AWS_CLIENT_PREWARM": "false",
+        "SEARCH_INDEX_DIR": os.path.join(work_dir, "search_index"),
+        "VECTOR_INDEX_DIR": os.path.join(work_dir, "vector_index"),
+        "PIPELINE_DB_PATH": os.path.join(work_dir, "pipeline.db"),
+        "EMBEDDING_PROVIDER": "hashing",
+    })
+    return env
+
+
+def run_child(env, extra_args=()):
+    proc = subprocess.run(
+        [sys.executable, *extra_args, "-c", CHILD],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.exit(f"startup run failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+
+def summarize(values):
+    ms = sorted(v * 1000 for v in values)
+    return {
+        "median_ms": round(statistics.median(ms), 1),
+        "min_ms": round(ms[0], 1),
+        "max_ms": round(ms[-1], 1),
+    }
+
+
+# -X importtime 출력에서 backend가 직접 import한 모듈(들여쓰기 한 단계)의 누적 시간
+def slowest_imports(stderr, top):
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if len(name) - len(name.lstrip()) != 3:
+            continue
+        rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    args = parse_args()
+    runs = 3 if args.quick else args.runs
+    work_dir = tempfile.mkdtemp(prefix="globanote-startup-")
+    try:
+        env = child_env(work_dir)
+        run_child(env)  # 인덱스/DB 파일 생성, 바이트코드 캐시 (측정 제외)
+        samples = []
+        for i in range(runs):
+            print(f"run {i + 1}/{runs}...", flush=True)
+            samples.append(run_child(env)[0])
+        imports = slowest_imports(run_child(env, ("-X", "importtime"))[1], args.top) if args.importtime else []
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        shutil.rmtree(os.path.join(BACKEND_DIR, "test", ".tmp"), ignore_errors=True)
+
+    scenarios = {
+        "import": summarize([s["import_seconds"] for s in samples]),
+        "ready": summarize([s["ready_seconds"] for s in samples]),
+    }
+    for phase in samples[0]["report"]["phases"]:
+        name = phase["name"]
+        values = [p["seconds"] for s in samples for p in s["report"]["phases"] if p["name"] == name]
+        scenarios[f"phase/{name}"] = summarize(values)
+    results = {"settings": {"runs": runs}, "machine": machine_info(), "scenarios": scenarios}
+
+    baseline = None if args.save else load_baseline(args.baseline)
+    print()
+    header = f"{'step':32} {'median ms':>10} {'min ms':>8} {'max ms':>8} {'vs base':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, r in scenarios.items():
+        delta = ""
+        previous = (baseline or {}).get("scenarios", {}).get(name)
+        if previous and previous.get("median_ms"):
+            delta = f"{(r['median_ms'] - previous['median_ms']) / previous['median_ms']:+.0%}"
+        print(f"{name:32} {r['median_ms']:10.1f} {r['min_ms']:8.1f} {r['max_ms']:8.1f} {delta:>8}")
+
+    if imports:
+        print("\nslowest imports made by backend.py (cumulative):")
+        for ms, name in imports:
+            print(f"  {ms:8.1f}ms  {name}")
+
+    if args.save:
+        save_results(args.baseline, results)
+        print(f"\nbaseline saved to {args.baseline}")
+    else:
+        regressions = compare(results, baseline, args.threshold, ("median_ms",), min_delta=5.0)
+        report_regressions(regressions, args.threshold, args.fail_on_regression)
+
+    ready_ms = scenarios["ready"]["median_ms"]
+    if args.target_seconds and ready_ms > args.target_seconds * 1000:
+        sys.exit(f"\ncold start {ready_ms / 1000:.2f}s exceeds target {args.target_seconds:g}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import io
+import json
+import os
+import platform
+import sys
+import wave
+
+# 벤치마크 공통: 실행 환경 정보, 기준값(baselines/*.json) 저장/비교
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+
+# backend 모듈을 이름으로 import할 수 있도록
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+
+def machine_info():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(terse=True),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+# 무음 PCM WAV (헤더의 길이로 전사 길이가 정해지므로 내용은 상관없음)
+def make_wav(seconds, sample_rate=16000, sample_width=2):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(sample_width)
+        w.setframerate(sample_rate)
+        w.writeframes(b"\0" * sample_width * int(seconds * sample_rate))
+    return buffer.getvalue()
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+# 200이어도 {"error": ...}로 실패를 알리는 엔드포인트가 있으므로 본문도 확인
+def response_failed(response):
+    if response.status_code >= 400:
+        return True
+    if response.status_code == 200 and response.headers.get("content-type", "").startswith("application/json"):
+        body = response.json()
+        return isinstance(body, dict) and "error" in body
+    return False
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# 키 정렬 + 들여쓰기로 저장해 기준값 변경이 diff에서 바로 보이도록
+def save_results(path, results):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+# metrics 값이 threshold 이상 늘어난 항목 (값이 클수록 나쁜 지표만)
+# 차이가 min_delta(지표 단위) 미만이면 측정 잡음으로 보고 무시
+def compare(results, baseline, threshold, metrics, min_delta=1.0):
+    regressions = []
+    if not baseline:
+        return regressions
+    if baseline.get("settings") != results["settings"]:
+        print("note: baseline was recorded with different settings; comparison is approximate")
+    for name, current in results["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if not previous:
+            continue
+        for metric in metrics:
+            before, after = previous.get(metric), current.get(metric)
+            if before and after is not None and after - before >= min_delta and (after - before) / before > threshold:
+                regressions.append(f"{name}: {metric} {before} -> {after} (+{(after - before) / before:.0%})")
+    return regressions
+
+
+def report_regressions(regressions, threshold, fail):
+    if not regressions:
+        return
+    print(f"\n{len(regressions)} regression(s) over {threshold:.0%}:")
+    for line in regressions:
+        print(f"  {line}")
+    if fail:
+        sys.exit(1)
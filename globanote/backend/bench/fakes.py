@@ -0,0 +1,230 @@
+import copy
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from botocore.exceptions import ClientError
+
+# 벤치마크용 AWS 대용 (S3는 LocalStorage, Transcribe는 LocalTranscribeClient 사용)
+# - 모든 호출에 latency_ms만큼 지연 (boto3처럼 호출 스레드를 블로킹)
+# - throttle_rate 비율만큼 AWS와 같은 형태의 쓰로틀링 오류(ClientError) 발생
+# - backend.py가 실제로 호출하는 메서드만 구현
+
+
+def sleep_ms(latency_ms):
+    if latency_ms:
+        time.sleep(latency_ms / 1000)
+
+
+def maybe_throttle(rate, code, operation):
+    if rate and random.random() < rate:
+        raise ClientError({"Error": {"Code": code, "Message": "Rate exceeded"}}, operation)
+
+
+# 객체의 메서드 호출마다 지연을 추가 (속성 접근은 그대로)
+class LatencyProxy:
+    def __init__(self, target, latency_ms):
+        self._target = target
+        self._latency_ms = latency_ms
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if not callable(value) or not self._latency_ms:
+            return value
+
+        def call(*args, **kwargs):
+            sleep_ms(self._latency_ms)
+            return value(*args, **kwargs)
+
+        return call
+
+
+class FakeBatchWriter:
+    def __init__(self, table):
+        self.table = table
+        self.buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def put_item(self, Item):
+        self.buffer.append(Item)
+        if len(self.buffer) >= 25:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            sleep_ms(self.table.latency_ms)
+            with self.table.lock:
+                for item in self.buffer:
+                    self.table.items[item["id"]] = copy.deepcopy(item)
+            self.buffer = []
+
+
+UPDATE_CLAUSE_RE = re.compile(r"\b(SET|ADD)\b", re.IGNORECASE)
+UPDATE_SET_RE = re.compile(r"([#\w]+)\s*=\s*(if_not_exists\(\s*[#\w]+\s*,\s*)?(:\w+)")
+UPDATE_ADD_RE = re.compile(r"([#\w]+)\s+(:\w+)")
+
+
+def key_matches(condition, item):
+    expression = condition.get_expression()
+    operator, values = expression["operator"], expression["values"]
+    if operator == "AND":
+        return all(key_matches(c, item) for c in values)
+    value = item.get(values[0].name)
+    if operator == "=":
+        return value == values[1]
+    if operator == "begins_with":
+        return isinstance(value, str) and value.startswith(values[1])
+    raise NotImplementedError(operator)
+
+
+class FakeTable:
+    def __init__(self, name, latency_ms=0, throttle_rate=0.0):
+        self.name = name
+        self.latency_ms = latency_ms
+        self.throttle_rate = throttle_rate
+        self.items = {}
+        self.lock = threading.Lock()
+
+    def _call(self, operation):
+        sleep_ms(self.latency_ms)
+        maybe_throttle(self.throttle_rate, "ProvisionedThroughputExceededException", operation)
+
+    def put_item(self, Item):
+        self._call("PutItem")
+        with self.lock:
+            self.items[Item["id"]] = copy.deepcopy(Item)
+        return {"ResponseMetadata": {"HTTPStatusCode": 200}}
+
+    def get_item(self, Key):
+        self._call("GetItem")
+        with self.lock:
+            item = self.items.get(Key["id"])
+            return {"Item": copy.deepcopy(item)} if item else {}
+
+    # "SET a = :x, b = if_not_exists(b, :y)" / "ADD #n :v" 형태만 지원 (사용량 테이블은 복합 키)
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeValues,
+                    ExpressionAttributeNames=None, **kwargs):
+        self._call("UpdateItem")
+        names = ExpressionAttributeNames or {}
+        parts = UPDATE_CLAUSE_RE.split(UpdateExpression)
+        with self.lock:
+            key = Key["id"] if "id" in Key else tuple(sorted(Key.items()))
+            item = self.items.setdefault(key, dict(Key))
+            updated = {}
+            for action, clause in zip(parts[1::2], parts[2::2]):
+                if action.upper() == "SET":
+                    matches = UPDATE_SET_RE.findall(clause)
+                else:
+                    matches = [(name, "", placeholder) for name, placeholder in UPDATE_ADD_RE.findall(clause)]
+                for name, if_not_exists, placeholder in matches:
+                    name = names.get(name, name)
+                    if if_not_exists and name in item:
+                        continue
+                    value = ExpressionAttributeValues[placeholder]
+                    if action.upper() == "ADD":
+                        value = item.get(name, 0) + value
+                    item[name] = value
+                    updated[name] = value
+        return {"Attributes": updated}
+
+    # boto3 Key 조건 중 eq / begins_with / & 만 지원, 한 페이지로 반환
+    def query(self, KeyConditionExpression, **kwargs):
+        self._call("Query")
+        with self.lock:
+            items = [copy.deepcopy(i) for i in self.items.values() if key_matches(KeyConditionExpression, i)]
+        return {"Items": items, "Count": len(items)}
+
+    def batch_writer(self, overwrite_by_pkeys=None):
+        return FakeBatchWriter(self)
+
+
+class FakeDynamoDB:
+    def __init__(self, latency_ms=0, throttle_rate=0.0):
+        self.latency_ms = latency_ms
+        self.throttle_rate = throttle_rate
+        self.tables = {}
+        # dynamodb.meta.client.list_tables() (시작 시 테이블 확인)
+        self.meta = SimpleNamespace(client=self)
+
+    def Table(self, name):
+        if name not in self.tables:
+            self.tables[name] = FakeTable(name, self.latency_ms, self.throttle_rate)
+        return self.tables[name]
+
+    def list_tables(self):
+        sleep_ms(self.latency_ms)
+        return {"TableNames": sorted(self.tables)}
+
+
+# converse만 구현: 입력 길이에 비례한 토큰 수, 고정 길이 요약
+class FakeBedrock:
+    def __init__(self, latency_ms=0, ms_per_output_token=0.0, output_tokens=200, throttle_rate=0.0):
+        self.latency_ms = latency_ms
+        self.throttle_rate = throttle_rate
+        self.ms_per_output_token = ms_per_output_token
+        self.output_tokens = output_tokens
+        self.calls = 0
+
+    def converse(self, modelId, messages=None, promptVariables=None, **kwargs):
+        maybe_throttle(self.throttle_rate, "ThrottlingException", "Converse")
+        sleep_ms(self.latency_ms + self.ms_per_output_token * self.output_tokens)
+        self.calls += 1
+        if promptVariables:
+            text = "".join(v.get("text", "") for v in promptVariables.values())
+        else:
+            text = "".join(c.get("text", "") for m in messages or [] for c in m["content"])
+        return {
+            "output": {"message": {"role": "assistant", "content": [{"text": "요약 " * self.output_tokens}]}},
+            "usage": {
+                "inputTokens": len(text) // 2,
+                "outputTokens": self.output_tokens,
+                "totalTokens": len(text) // 2 + self.output_tokens,
+            },
+            "stopReason": "end_turn",
+        }
+
+
+# backend를 로컬 대용으로 구성해 import
+# backend는 import 시점에 환경 변수로 클라이언트를 만들므로 import 전에 AWS 설정을 비움
+def setup_backend(work_dir, s3_latency_ms=0, dynamodb_latency_ms=0, transcribe_latency_ms=0,
+                  bedrock_latency_ms=0, throttle_rate=0.0, transcribe_delay=0.0, pipeline_workers=0):
+    os.environ.update({
+        "AWS_ACCESS_KEY": "",
+        "AWS_SECRET_KEY": "",
+        "S3_BUCKET": "",
+        "DYNAMODB_TABLE": "bench-transcripts",
+        "TRANSCRIBE_BACKEND": "local",
+        "LOCAL_TRANSCRIBE_DELAY": "0",
+        "EMBEDDING_PROVIDER": "hashing",
+        "SEARCH_INDEX_DIR": os.path.join(work_dir, "search_index"),
+        "VECTOR_INDEX_DIR": os.path.join(work_dir, "vector_index"),
+        "PIPELINE_DB_PATH": os.path.join(work_dir, "pipeline.db"),
+        "PIPELINE_WORKERS": str(pipeline_workers),
+    })
+    import logging
+
+    import backend
+    from local_transcribe import LocalTranscribeClient
+    from storage import LocalStorage
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    local = LocalStorage(os.path.join(work_dir, "storage"))
+    backend.storage = backend.instrumented_storage(LatencyProxy(local, s3_latency_ms))
+    # Transcribe 대용은 지연 없는 저장소를 직접 사용 (전사 자체는 측정 대상이 아님)
+    backend.local_transcribe_client = LatencyProxy(
+        LocalTranscribeClient(local, delay=transcribe_delay), transcribe_latency_ms
+    )
+    backend.dynamodb = FakeDynamoDB(dynamodb_latency_ms, throttle_rate)
+    backend.dynamodb.Table(backend.DYNAMODB_TABLE)
+    backend.dynamodb.Table(backend.USAGE_TABLE)
+    backend.bedrock_runtime = FakeBedrock(bedrock_latency_ms, throttle_rate=throttle_rate)
+    return backend, local
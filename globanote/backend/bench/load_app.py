@@ -0,0 +1,26 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+# 부하 테스트용 uvicorn 진입점: 로컬 대용을 연결한 backend.app
+# 지연/쓰로틀링은 환경 변수로 지정 (load_test.py가 설정해서 실행)
+#   cd backend/bench && uvicorn load_app:app --port 8765 --workers 1
+
+import common  # noqa: F401  (backend 경로 추가)
+from fakes import setup_backend
+
+work_dir = tempfile.mkdtemp(prefix="globanote-load-")
+atexit.register(shutil.rmtree, work_dir, ignore_errors=True)
+
+backend, _ = setup_backend(
+    work_dir,
+    s3_latency_ms=float(os.getenv("BENCH_S3_LATENCY_MS", "15")),
+    dynamodb_latency_ms=float(os.getenv("BENCH_DYNAMODB_LATENCY_MS", "5")),
+    transcribe_latency_ms=float(os.getenv("BENCH_TRANSCRIBE_LATENCY_MS", "40")),
+    bedrock_latency_ms=float(os.getenv("BENCH_BEDROCK_LATENCY_MS", "500")),
+    throttle_rate=float(os.getenv("BENCH_THROTTLE_RATE", "0")),
+    transcribe_delay=float(os.getenv("BENCH_TRANSCRIBE_SECONDS", "10")),
+    pipeline_workers=int(os.getenv("BENCH_PIPELINE_WORKERS", "4")),
+)
+app = backend.app
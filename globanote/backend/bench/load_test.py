@@ -0,0 +1,385 @@
+import argparse
+import asyncio
+import base64
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from common import BENCH_DIR, machine_info, make_wav, percentile, response_failed, save_results
+
+# 동시 사용자 부하 테스트 + SLO 리포트
+# - 가상 사용자 한 명 = 회의 한 건: 업로드(또는 녹음 전송) -> frontend.py처럼 상태 폴링
+#   (streamlit 재실행마다 /health, /features 호출 후 /job-status) -> 요약 -> 트랜스크립트 조회
+# - 사용자 수를 단계별로 늘리며(--users 25 50 100 200) 엔드포인트별 p50/p95/p99, 오류율 측정
+# - SLO(p95, 오류율)를 처음 넘는 단계와 처리량이 더 늘지 않는 단계를 포화 지점으로 보고
+# - 서버: 기본은 uvicorn 워커 1개(load_app.py)를 띄워 사용, --url로 기존 서버, --in-process로 ASGI 직접 호출
+#
+# 사용 예 (backend 디렉터리에서):
+#   python bench/load_test.py --users 25 50 100 200 --transcribe-seconds 10
+#   python bench/load_test.py --in-process --users 10 --audio-seconds 30 60
+
+PROMPT_ARN = "arn:aws:bedrock:local:000000000000:prompt/bench"
+
+# 엔드포인트별 p95 목표 (ms)
+DEFAULT_SLO_P95_MS = {
+    "GET /health": 200,
+    "GET /features": 200,
+    "POST /upload-audio": 3000,
+    "POST /record-audio": 3000,
+    "GET /job-status": 1000,
+    "POST /summarize-transcript": 5000,
+    "GET /get-transcript": 500,
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load test backend.app with a realistic client mix and report SLOs")
+    parser.add_argument("--users", type=int, nargs="+", default=[25, 50, 100, 200], help="concurrent meetings per step")
+    parser.add_argument("--ramp-seconds", type=float, default=5.0, help="spread session starts over this window")
+    parser.add_argument("--audio-seconds", type=float, nargs=2, default=[60, 600], metavar=("MIN", "MAX"))
+    parser.add_argument("--record-rate", type=float, default=0.2, help="share of sessions using /record-audio")
+    parser.add_argument("--summary-rate", type=float, default=0.7, help="share of sessions requesting a summary")
+    parser.add_argument("--poll-seconds", type=float, default=3.0, help="mean interval between status refreshes")
+    parser.add_argument("--session-timeout", type=float, default=600.0)
+    parser.add_argument("--request-timeout", type=float, default=60.0)
+    parser.add_argument("--transcribe-seconds", type=float, default=10.0, help="time until a local transcription completes")
+    parser.add_argument("--s3-latency-ms", type=float, default=15.0)
+    parser.add_argument("--dynamodb-latency-ms", type=float, default=5.0)
+    parser.add_argument("--transcribe-latency-ms", type=float, default=40.0)
+    parser.add_argument("--bedrock-latency-ms", type=float, default=500.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of DynamoDB/Bedrock calls throttled")
+    parser.add_argument("--pipeline-workers", type=int, default=4)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument(
+        "--slo", action="append", default=[], metavar="ENDPOINT=MS",
+        help='override a p95 target, e.g. --slo "GET /job-status=500"',
+    )
+    parser.add_argument("--url", help="use an already running server instead of starting one")
+    parser.add_argument("--in-process", action="store_true", help="call the ASGI app directly (no uvicorn)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="write the report to this file")
+    return parser.parse_args()
+
+
+class Recorder:
+    def __init__(self):
+        self.requests = {}
+        self.sessions = {"completed": 0, "failed": 0}
+        self.session_seconds = []
+
+    async def call(self, client, endpoint, method, url, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            failed = response_failed(response)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            response, failed, status = None, True, type(e).__name__
+        latency = (time.perf_counter() - started) * 1000
+        self.requests.setdefault(endpoint, []).append((latency, failed, status))
+        return None if failed else response
+
+    def summary(self, elapsed):
+        endpoints = {}
+        for endpoint, samples in sorted(self.requests.items()):
+            latencies = sorted(latency for latency, _, _ in samples)
+            errors = sum(1 for _, failed, _ in samples if failed)
+            # 429는 입장 제어로 거절된 요청 (오류율에 포함, 따로도 표시)
+            rejected = sum(1 for _, _, status in samples if status == "429")
+            statuses = {}
+            for _, _, status in samples:
+                statuses[status] = statuses.get(status, 0) + 1
+            endpoints[endpoint] = {
+                "requests": len(samples),
+                "errors": errors,
+                "error_rate": round(errors / len(samples), 4),
+                "rejected_rate": round(rejected / len(samples), 4),
+                "status_counts": statuses,
+                "p50_ms": round(percentile(latencies, 0.50), 1),
+                "p95_ms": round(percentile(latencies, 0.95), 1),
+                "p99_ms": round(percentile(latencies, 0.99), 1),
+                "max_ms": round(latencies[-1], 1),
+            }
+        total = sum(len(samples) for samples in self.requests.values())
+        session_seconds = sorted(self.session_seconds)
+        return {
+            "elapsed_seconds": round(elapsed, 1),
+            "requests": total,
+            "throughput_rps": round(total / elapsed, 1),
+            "sessions": dict(self.sessions),
+            "session_p50_seconds": round(percentile(session_seconds, 0.50), 1),
+            "session_p95_seconds": round(percentile(session_seconds, 0.95), 1),
+            "endpoints": endpoints,
+        }
+
+
+class AudioCache:
+    # 8kHz 8bit WAV = 8KB/s (압축 오디오와 비슷한 업로드 크기), 30초 단위로 재사용
+    def __init__(self):
+        self.files = {}
+
+    def get(self, seconds):
+        seconds = max(30, int(seconds // 30 * 30))
+        if seconds not in self.files:
+            self.files[seconds] = make_wav(seconds, sample_rate=8000, sample_width=1)
+        return seconds, self.files[seconds]
+
+
+# frontend.py 사용 흐름 한 번 (streamlit은 버튼을 누를 때마다 스크립트 전체를 다시 실행)
+async def session(client, recorder, args, rng, audio):
+    async def rerun():
+        await recorder.call(client, "GET /health", "GET", "/health")
+        await recorder.call(client, "GET /features", "GET", "/features")
+
+    started = time.perf_counter()
+    await rerun()
+    seconds, wav = audio.get(rng.uniform(*args.audio_seconds))
+    if rng.random() < args.record_rate:
+        body = {
+            "audio_data": "data:audio/wav;base64," + base64.b64encode(wav).decode("ascii"),
+            "language_code": "ko-KR",
+            "enable_speaker_diarization": "true",
+            "max_speaker_count": 4,
+        }
+        response = await recorder.call(client, "POST /record-audio", "POST", "/record-audio", json=body)
+    else:
+        response = await recorder.call(
+            client, "POST /upload-audio", "POST", "/upload-audio",
+            files={"audio_file": (f"meeting_{seconds}s.wav", wav, "audio/wav")},
+            data={"language_code": "ko-KR", "enable_speaker_diarization": "true", "max_speaker_count": "4"},
+        )
+    job_id = response.json().get("job_id") if response else None
+    if not job_id:
+        recorder.sessions["failed"] += 1
+        return
+
+    # 사용자가 "상태 새로고침"을 누르는 간격으로 폴링 (frontend.py는 mode=full로 조회)
+    deadline = time.monotonic() + args.session_timeout
+    while True:
+        await asyncio.sleep(rng.uniform(0.5, 1.5) * args.poll_seconds)
+        await rerun()
+        response = await recorder.call(client, "GET /job-status", "GET", f"/job-status/{job_id}")
+        status = response.json().get("status") if response else None
+        if status == "COMPLETED":
+            break
+        if status == "FAILED" or time.monotonic() > deadline:
+            recorder.sessions["failed"] += 1
+            return
+
+    if rng.random() < args.summary_rate:
+        await asyncio.sleep(rng.uniform(1, 5))
+        await rerun()
+        await recorder.call(
+            client, "POST /summarize-transcript", "POST", "/summarize-transcript",
+            data={"job_id": job_id, "prompt_arn": PROMPT_ARN},
+        )
+
+    # 트랜스크립트 조회: 전체 1회 + 발화 페이지 몇 개
+    await recorder.call(client, "GET /get-transcript", "GET", f"/get-transcript/{job_id}")
+    params = {"turn_start": 0, "limit": 50}
+    for _ in range(rng.randint(0, 3)):
+        response = await recorder.call(
+            client, "GET /get-transcript", "GET", f"/get-transcript/{job_id}", params=params
+        )
+        cursor = response.json().get("next_cursor") if response else None
+        if not cursor:
+            break
+        params["cursor"] = cursor
+
+    recorder.sessions["completed"] += 1
+    recorder.session_seconds.append(time.perf_counter() - started)
+
+
+async def run_step(client, users, args, audio, step_seed):
+    recorder = Recorder()
+
+    async def user(i):
+        rng = random.Random(step_seed * 1_000_003 + i)
+        await asyncio.sleep(rng.uniform(0, args.ramp_seconds))
+        await session(client, recorder, args, rng, audio)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(users)))
+    return recorder.summary(time.perf_counter() - started)
+
+
+def slo_targets(args):
+    targets = dict(DEFAULT_SLO_P95_MS)
+    for override in args.slo:
+        endpoint, _, value = override.rpartition("=")
+        targets[endpoint.strip()] = float(value)
+    return targets
+
+
+def check_slos(step, targets, max_error_rate):
+    violations = []
+    for endpoint, r in step["endpoints"].items():
+        target = targets.get(endpoint)
+        if target is not None and r["p95_ms"] > target:
+            violations.append(f"{endpoint} p95 {r['p95_ms']:.0f}ms > {target:.0f}ms")
+        if r["error_rate"] > max_error_rate:
+            violations.append(f"{endpoint} errors {r['error_rate']:.1%} > {max_error_rate:.1%}")
+    return violations
+
+
+# SLO를 처음 어긴 단계, 사용자를 늘려도 처리량이 10% 미만으로 느는 단계
+def find_saturation(steps):
+    result = {"max_users_within_slo": None, "first_violation": None, "throughput_plateau_users": None}
+    previous = None
+    for step in steps:
+        if step["violations"] and result["first_violation"] is None:
+            result["first_violation"] = {"users": step["users"], "violations": step["violations"]}
+        if result["first_violation"] is None:
+            result["max_users_within_slo"] = step["users"]
+        if previous and result["throughput_plateau_users"] is None:
+            if step["throughput_rps"] < previous["throughput_rps"] * 1.1:
+                result["throughput_plateau_users"] = previous["users"]
+        previous = step
+    return result
+
+
+def print_step(step, targets):
+    s = step["sessions"]
+    print(
+        f"\n== {step['users']} users: {step['elapsed_seconds']}s, {step['requests']} requests"
+        f" ({step['throughput_rps']} req/s), sessions completed={s['completed']} failed={s['failed']},"
+        f" session p50={step['session_p50_seconds']}s p95={step['session_p95_seconds']}s"
+    )
+    header = f"{'endpoint':28} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'err%':>6} {'429%':>6} {'SLO p95':>8}"
+    print(header)
+    print("-" * len(header))
+    for endpoint, r in step["endpoints"].items():
+        target = targets.get(endpoint)
+        mark = "" if target is None else ("ok" if r["p95_ms"] <= target else "FAIL")
+        print(
+            f"{endpoint:28} {r['requests']:6d} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} {r['p99_ms']:8.1f}"
+            f" {r['max_ms']:8.1f} {r['error_rate'] * 100:6.2f} {r['rejected_rate'] * 100:6.2f} {mark:>8}"
+        )
+
+
+def start_server(args):
+    env = dict(os.environ)
+    env.update({
+        "BENCH_S3_LATENCY_MS": str(args.s3_latency_ms),
+        "BENCH_DYNAMODB_LATENCY_MS": str(args.dynamodb_latency_ms),
+        "BENCH_TRANSCRIBE_LATENCY_MS": str(args.transcribe_latency_ms),
+        "BENCH_BEDROCK_LATENCY_MS": str(args.bedrock_latency_ms),
+        "BENCH_THROTTLE_RATE": str(args.throttle_rate),
+        "BENCH_TRANSCRIBE_SECONDS": str(args.transcribe_seconds),
+        "BENCH_PIPELINE_WORKERS": str(args.pipeline_workers),
+    })
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "load_app:app", "--port", str(args.port),
+         "--workers", "1", "--log-level", "warning"],
+        cwd=BENCH_DIR, env=env,
+    )
+    url = f"http://127.0.0.1:{args.port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"uvicorn exited with code {process.returncode} (is uvicorn installed?)")
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("uvicorn did not become ready within 60s")
+
+
+async def run_steps(client, args):
+    targets = slo_targets(args)
+    audio = AudioCache()
+    steps = []
+    for n, users in enumerate(args.users):
+        print(f"running {users} concurrent sessions...", flush=True)
+        step = {"users": users, **await run_step(client, users, args, audio, args.seed + n)}
+        step["violations"] = check_slos(step, targets, args.max_error_rate)
+        print_step(step, targets)
+        steps.append(step)
+    return steps
+
+
+async def run_in_process(args):
+    from fakes import setup_backend
+
+    work_dir = tempfile.mkdtemp(prefix="globanote-load-")
+    try:
+        backend, _ = setup_backend(
+            work_dir,
+            s3_latency_ms=args.s3_latency_ms,
+            dynamodb_latency_ms=args.dynamodb_latency_ms,
+            transcribe_latency_ms=args.transcribe_latency_ms,
+            bedrock_latency_ms=args.bedrock_latency_ms,
+            throttle_rate=args.throttle_rate,
+            transcribe_delay=args.transcribe_seconds,
+            pipeline_workers=args.pipeline_workers,
+        )
+        # ASGITransport는 lifespan을 실행하지 않으므로 직접 실행 (파이프라인 워커 시작)
+        async with backend.app.router.lifespan_context(backend.app):
+            # 처리되지 않은 예외는 uvicorn처럼 500 응답으로
+            transport = httpx.ASGITransport(app=backend.app, raise_app_exceptions=False)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://load", timeout=args.request_timeout
+            ) as client:
+                return await run_steps(client, args)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+async def run_http(args, url):
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=url, timeout=args.request_timeout, limits=limits) as client:
+        return await run_steps(client, args)
+
+
+def main():
+    args = parse_args()
+    mode = "in-process" if args.in_process else (args.url or "uvicorn")
+    if args.in_process:
+        steps = asyncio.run(run_in_process(args))
+    elif args.url:
+        steps = asyncio.run(run_http(args, args.url))
+    else:
+        process, url = start_server(args)
+        try:
+            steps = asyncio.run(run_http(args, url))
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    saturation = find_saturation(steps)
+    print("\n== SLO summary")
+    print(f"max users within SLO: {saturation['max_users_within_slo'] or 'none'}")
+    violation = saturation["first_violation"]
+    if violation:
+        print(f"first violation at {violation['users']} users:")
+        for line in violation["violations"]:
+            print(f"  {line}")
+    else:
+        print(f"no SLO violations up to {args.users[-1]} users")
+    if saturation["throughput_plateau_users"]:
+        print(f"throughput stops growing after {saturation['throughput_plateau_users']} users")
+
+    if args.json_path:
+        save_results(args.json_path, {
+            "settings": {k: v for k, v in vars(args).items() if k != "json_path"},
+            "mode": mode,
+            "machine": machine_info(),
+            "slo_p95_ms": slo_targets(args),
+            "steps": steps,
+            "saturation": saturation,
+        })
+        print(f"\nreport saved to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import argparse
+import bisect
+import itertools
+import json
+import random
+import sys
+
+# 시드 고정 합성 Transcribe 결과 JSON (실제 회의 데이터 없이 포맷/인덱스 성능 측정용)
+# - items: 단어(pronunciation, 시간 있음) + 문장부호(punctuation, 시간 없음)
+# - speakers > 0이면 items에 speaker_label, results.speaker_labels.segments 포함
+# - 발화 길이/단어 길이/쉼은 분포에서 뽑고, 어휘는 Zipf 분포로 반복되게 선택
+# - 같은 인자와 seed면 항상 같은 결과
+#
+# 사용 예: python bench/transcript_gen.py --minutes 60 --speakers 4 --seed 1 -o meeting.json
+
+KO_SYLLABLES = (
+    "가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추"
+    "기니디리미비시이지치키티피히그느드르므브스으즈츠크트프흐개내대래매배새애재채"
+    "회의안건결정진행확인검토일정예산팀장님네그럼저희이번다음주까지"
+)
+KO_PARTICLES = ("은", "는", "이", "가", "을", "를", "에", "에서", "으로", "도", "만", "요", "고")
+EN_SYLLABLES = (
+    "ba", "be", "co", "da", "de", "ex", "fo", "ge", "in", "ka", "la", "le", "ma", "me", "ne",
+    "no", "pa", "pro", "re", "ro", "sa", "se", "ta", "te", "ti", "to", "un", "ve", "wa", "zo",
+)
+
+
+def build_vocabulary(rng, language, size):
+    words = set()
+    while len(words) < size:
+        if language.startswith("ko"):
+            word = "".join(rng.choice(KO_SYLLABLES) for _ in range(rng.choice((1, 2, 2, 2, 3, 3, 4))))
+            if rng.random() < 0.4:
+                word += rng.choice(KO_PARTICLES)
+        else:
+            word = "".join(rng.choice(EN_SYLLABLES) for _ in range(rng.choice((1, 1, 2, 2, 3))))
+        words.add(word)
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+
+class TranscriptGenerator:
+    def __init__(self, seed=0, language="ko-KR", vocabulary_size=3000, zipf=1.1):
+        self.rng = random.Random(seed)
+        self.language = language
+        self.vocabulary = build_vocabulary(self.rng, language, vocabulary_size)
+        self.cum_weights = list(itertools.accumulate(
+            1.0 / (rank + 1) ** zipf for rank in range(vocabulary_size)
+        ))
+
+    def word(self):
+        x = self.rng.random() * self.cum_weights[-1]
+        return self.vocabulary[bisect.bisect_left(self.cum_weights, x)]
+
+    # 화자별 발언 비중을 다르게 두고, 다음 화자는 현재 화자를 제외하고 비중대로 선택
+    def next_speaker(self, current, weights):
+        if len(weights) == 1:
+            return 0
+        candidates = [s for s in range(len(weights)) if s != current]
+        return self.rng.choices(candidates, [weights[s] for s in candidates])[0]
+
+    def generate(self, duration, speakers=2, words_per_second=2.6, job_name="synthetic-job"):
+        rng = self.rng
+        word_seconds = 1.0 / words_per_second
+        weights = [rng.uniform(0.5, 2.0) for _ in range(max(speakers, 1))]
+        speaker = rng.choices(range(len(weights)), weights)[0]
+
+        items = []
+        segments = []
+        sentences = []
+        t = rng.uniform(0.2, 1.5)
+        item_id = 0
+
+        def add(item):
+            nonlocal item_id
+            item["id"] = item_id
+            item_id += 1
+            items.append(item)
+
+        def punctuation(content):
+            item = {"type": "punctuation", "alternatives": [{"confidence": "0.0", "content": content}]}
+            if speakers:
+                item["speaker_label"] = f"spk_{speaker}"
+            add(item)
+
+        while t < duration:
+            label = f"spk_{speaker}"
+            segment = {"start_time": f"{t:.3f}", "speaker_label": label, "items": []}
+            # 발화: 문장 1~여러 개 (짧은 맞장구부터 긴 설명까지)
+            for _ in range(1 + int(rng.expovariate(0.7))):
+                words = []
+                n_words = max(1, int(rng.gammavariate(2.0, 4.5)))
+                for n in range(n_words):
+                    length = max(0.08, rng.gauss(word_seconds * 0.8, word_seconds * 0.25))
+                    if t + length > duration:
+                        break
+                    content = self.word()
+                    item = {
+                        "type": "pronunciation",
+                        "alternatives": [{"confidence": f"{rng.uniform(0.55, 1.0):.4f}", "content": content}],
+                        "start_time": f"{t:.3f}",
+                        "end_time": f"{t + length:.3f}",
+                    }
+                    if speakers:
+                        item["speaker_label"] = label
+                        segment["items"].append(
+                            {"start_time": item["start_time"], "end_time": item["end_time"], "speaker_label": label}
+                        )
+                    add(item)
+                    words.append(content)
+                    t += length + rng.expovariate(1.0 / (word_seconds * 0.2))
+                    if n < n_words - 1 and rng.random() < 0.06:
+                        punctuation(",")
+                        words[-1] += ","
+                if not words:
+                    break
+                mark = "?" if rng.random() < 0.12 else "."
+                punctuation(mark)
+                words[-1] += mark
+                sentences.append(" ".join(words))
+                t += rng.uniform(0.15, 0.6)
+            if speakers and segment["items"]:
+                segment["end_time"] = segment["items"][-1]["end_time"]
+                segments.append(segment)
+            # 화자 교대 사이 쉼 (가끔 긴 침묵)
+            t += rng.expovariate(1 / 0.6) + (rng.uniform(2, 8) if rng.random() < 0.03 else 0)
+            if speakers:
+                speaker = self.next_speaker(speaker, weights)
+
+        results = {"transcripts": [{"transcript": " ".join(sentences)}], "items": items}
+        if speakers:
+            results["speaker_labels"] = {"speakers": speakers, "segments": segments}
+        return {
+            "jobName": job_name,
+            "accountId": "000000000000",
+            "status": "COMPLETED",
+            "results": results,
+        }
+
+
+def generate_transcript(duration, speakers=2, seed=0, language="ko-KR", words_per_second=2.6, job_name="synthetic-job"):
+    return TranscriptGenerator(seed, language).generate(duration, speakers, words_per_second, job_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Amazon Transcribe result JSON")
+    parser.add_argument("--minutes", type=float, default=60.0)
+    parser.add_argument("--speakers", type=int, default=2, help="0: no speaker labels")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--language", default="ko-KR")
+    parser.add_argument("--words-per-second", type=float, default=2.6)
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    args = parser.parse_args()
+
+    data = generate_transcript(
+        args.minutes * 60, args.speakers, args.seed, args.language, args.words_per_second
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+    else:
+        json.dump(data, sys.stdout, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import gzip
+import hashlib
+import json
+
+from fastapi import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 조건부 GET(ETag / If-None-Match)과 응답 압축(br, gzip)
+# - ETag는 압축 여부와 무관하게 같은 값을 쓰므로 약한 ETag(W/"...")로 표시
+# - Cache-Control: no-cache로 매번 재검증하게 해서 변경이 없으면 304(본문 없음)
+# - brotli 패키지가 없으면 gzip만 사용
+
+COMPRESS_MIN_BYTES = 1024
+
+
+def make_etag(*parts):
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def content_hash(*values):
+    digest = hashlib.sha1()
+    for value in values:
+        digest.update(str(value).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+# If-None-Match 비교 (약한 비교: W/ 접두사 무시)
+def etag_matches(request, etag):
+    header = request.headers.get("if-none-match")
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+
+def not_modified(etag):
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+# Accept-Encoding에서 q값이 가장 높은 지원 인코딩 (같으면 br 우선)
+def choose_encoding(accept_encoding):
+    supported = ["br", "gzip"] if brotli else ["gzip"]
+    best, best_q = None, 0.0
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name == "*":
+            name = supported[0]
+        if name in supported and q > 0 and (
+            q > best_q or (q == best_q and supported.index(name) < supported.index(best))
+        ):
+            best, best_q = name, q
+    return best
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+# payload를 JSON으로 직렬화해 응답 (ETag가 일치하면 304, 크면 압축)
+def json_response(request, payload, etag=None, min_size=COMPRESS_MIN_BYTES):
+    if etag and etag_matches(request, etag):
+        return not_modified(etag)
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    headers = {"Vary": "Accept-Encoding"}
+    if etag:
+        headers["ETag"] = etag
+        headers["Cache-Control"] = "no-cache"
+    if len(body) >= min_size:
+        encoding = choose_encoding(request.headers.get("accept-encoding"))
+        if encoding:
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,63 @@
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# 색인 디렉터리 잠금 (디렉터리의 .lock 파일)
+# - 서버는 실행 중 공유 잠금, 다른 프로세스에서 색인을 쓰는 작업(backfill --indexes)은 단독 잠금
+# - 같은 디렉터리에 두 프로세스가 따로 세그먼트/manifest를 쓰면 서로 덮어써 색인이 유실되므로
+#   잠금을 얻지 못하면 IndexLockBusy로 바로 실패
+# - Windows(msvcrt)는 공유 잠금이 없어 항상 단독 잠금
+
+
+class IndexLockBusy(Exception):
+    pass
+
+
+class IndexLock:
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, ".lock")
+        self.file = None
+
+    def acquire(self, exclusive=False):
+        os.makedirs(self.directory, exist_ok=True)
+        f = open(self.path, "a+")
+        try:
+            if fcntl:
+                fcntl.flock(f, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            f.close()
+            raise IndexLockBusy(f"{self.directory} is in use by another process")
+        self.file = f
+        return self
+
+    def release(self):
+        if self.file is None:
+            return
+        if fcntl:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+        else:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.file.close()
+        self.file = None
+
+
+# 여러 디렉터리를 한 번에 잠금 (하나라도 실패하면 얻은 잠금을 모두 풀고 IndexLockBusy)
+def lock_index_dirs(directories, exclusive=False):
+    locks = []
+    try:
+        for directory in dict.fromkeys(directories):
+            locks.append(IndexLock(directory).acquire(exclusive))
+    except IndexLockBusy:
+        for lock in locks:
+            lock.release()
+        raise
+    return locks
@@ -0,0 +1,137 @@
+import json
+import logging
+import threading
+import time
+
+from audio_probe import PROBE_BYTES, probe_header
+from storage import StorageNotFound
+
+# 로컬 Transcribe 대용 (S3/AWS 없이 한 대에서 전체 파이프라인 실행/벤치마크용)
+# - boto3 transcribe 클라이언트의 start_transcription_job / get_transcription_job과 같은 형태
+# - 오디오 헤더로 길이를 구해 결정적인 단어/화자 결과를 만들고 storage의 OutputKey에 저장
+# - delay초 뒤 완료 (0이면 start 호출 안에서 바로 완료)
+
+logger = logging.getLogger(__name__)
+
+
+# Transcribe 결과 JSON과 같은 형태의 합성 트랜스크립트
+def synthesize_transcript(job_name, duration, speakers=0, words_per_second=2.5, words_per_turn=12):
+    items = []
+    segments = []
+    transcript_words = []
+    step = 1.0 / words_per_second
+    n_words = max(1, int(duration * words_per_second))
+    segment = None
+    for i in range(n_words):
+        start = i * step
+        end = start + step * 0.8
+        turn = i // words_per_turn
+        item = {
+            "start_time": f"{start:.3f}",
+            "end_time": f"{end:.3f}",
+            "alternatives": [{"confidence": "0.99", "content": f"단어{i + 1}"}],
+            "type": "pronunciation",
+        }
+        if speakers:
+            label = f"spk_{turn % speakers}"
+            item["speaker_label"] = label
+            if segment is None or segment["speaker_label"] != label or i % words_per_turn == 0:
+                segment = {"start_time": item["start_time"], "speaker_label": label, "items": []}
+                segments.append(segment)
+            segment["end_time"] = item["end_time"]
+            segment["items"].append(
+                {"start_time": item["start_time"], "end_time": item["end_time"], "speaker_label": label}
+            )
+        items.append(item)
+        transcript_words.append(f"단어{i + 1}")
+        if (i + 1) % words_per_turn == 0 or i == n_words - 1:
+            items.append({"alternatives": [{"confidence": "0.0", "content": "."}], "type": "punctuation"})
+            transcript_words[-1] += "."
+    data = {
+        "jobName": job_name,
+        "status": "COMPLETED",
+        "results": {"transcripts": [{"transcript": " ".join(transcript_words)}], "items": items},
+    }
+    if speakers:
+        data["results"]["speaker_labels"] = {"speakers": speakers, "segments": segments}
+    return data
+
+
+class LocalTranscribeClient:
+    def __init__(self, storage, delay=0.0, words_per_second=2.5):
+        self.storage = storage
+        self.delay = delay
+        self.words_per_second = words_per_second
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def _media_duration(self, key):
+        try:
+            size = self.storage.head(key)["size"]
+            header = self.storage.get_bytes(key, (0, min(size, PROBE_BYTES)))
+        except StorageNotFound:
+            raise ValueError(f"Media not found: {key}")
+        probe = probe_header(header, size)
+        # 길이를 알 수 없는 형식(Opus 등)은 16kbps로 추정
+        return probe.get("duration") or size * 8 / 16000
+
+    def start_transcription_job(self, TranscriptionJobName, Media, MediaFormat, LanguageCode,
+                                OutputBucketName=None, OutputKey=None, Settings=None, **kwargs):
+        settings = Settings or {}
+        output_key = OutputKey or f"transcribe_results/{TranscriptionJobName}.json"
+        duration = self._media_duration(self.storage.key_for_uri(Media["MediaFileUri"]))
+        speakers = settings.get("MaxSpeakerLabels", 2) if settings.get("ShowSpeakerLabels") else 0
+        job = {
+            "TranscriptionJobName": TranscriptionJobName,
+            "TranscriptionJobStatus": "IN_PROGRESS",
+            "LanguageCode": LanguageCode,
+            "MediaFormat": MediaFormat,
+            "Media": Media,
+            "OutputKey": output_key,
+            "CreationTime": time.time(),
+        }
+        with self.lock:
+            self.jobs[TranscriptionJobName] = job
+        args = (job, duration, speakers)
+        if self.delay:
+            timer = threading.Timer(self.delay, self._complete, args)
+            timer.daemon = True
+            timer.start()
+        else:
+            self._complete(*args)
+        return {"TranscriptionJob": dict(job)}
+
+    def _complete(self, job, duration, speakers):
+        try:
+            data = synthesize_transcript(
+                job["TranscriptionJobName"], duration, speakers, self.words_per_second
+            )
+            self.storage.put_bytes(job["OutputKey"], json.dumps(data, ensure_ascii=False))
+            status = "COMPLETED"
+        except Exception as e:
+            logger.error(f"Local transcription failed for {job['TranscriptionJobName']}: {str(e)}")
+            job["FailureReason"] = str(e)
+            status = "FAILED"
+        with self.lock:
+            job["TranscriptionJobStatus"] = status
+            # 완료된 작업은 결과 파일로 상태를 알 수 있으므로 메모리에서 제거
+            if status == "COMPLETED":
+                self.jobs.pop(job["TranscriptionJobName"], None)
+
+    def get_transcription_job(self, TranscriptionJobName):
+        with self.lock:
+            job = self.jobs.get(TranscriptionJobName)
+            job = dict(job) if job else None
+        if job is None:
+            # 재시작 이후에는 결과 파일 유무로 판단
+            output_key = f"transcribe_results/{TranscriptionJobName}.json"
+            if not self.storage.exists(output_key):
+                raise ValueError(f"The requested job couldn't be found: {TranscriptionJobName}")
+            job = {
+                "TranscriptionJobName": TranscriptionJobName,
+                "TranscriptionJobStatus": "COMPLETED",
+                "OutputKey": output_key,
+            }
+        if job["TranscriptionJobStatus"] == "COMPLETED":
+            job["Transcript"] = {"TranscriptFileUri": self.storage.uri(job["OutputKey"])}
+        return {"TranscriptionJob": job}
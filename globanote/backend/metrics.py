@@ -0,0 +1,243 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# 프로세스 내 메트릭 (Prometheus 텍스트 형식으로 노출)
+# - Counter / Histogram: 라벨 값 조합마다 자식 객체를 한 번 만들고 이후에는 잠금 + 덧셈만 수행
+# - 히스토그램은 버킷별 개수만 저장하고 누적값은 노출할 때 계산
+# - collector: 노출 시점에 다른 모듈의 상태(입장 제어, 작업 큐 등)를 게이지로 읽어옴
+# - 라벨 값 종류가 한정된 것(stage, 서비스, 작업 이름)만 라벨로 사용 (job_id 등은 금지)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 초 단위 지연 버킷 (1ms ~ 5분)
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names, values, extra=None):
+    pairs = [f'{n}="{escape_label(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.children = {}
+        self.lock = threading.Lock()
+
+    def labels(self, **labels):
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        child = self.children.get(key)
+        if child is None:
+            with self.lock:
+                child = self.children.setdefault(key, self.new_child())
+        return child
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self.lock:
+            self.value += amount
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def new_child(self):
+        return CounterChild()
+
+    def inc(self, amount=1.0, **labels):
+        self.labels(**labels).inc(amount)
+
+    def render(self):
+        lines = self.header()
+        for key, child in sorted(self.children.items()):
+            lines.append(f"{self.name}{format_labels(self.labelnames, key)} {format_value(child.value)}")
+        return lines
+
+
+class HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def new_child(self):
+        return HistogramChild(self.buckets)
+
+    def observe(self, value, **labels):
+        self.labels(**labels).observe(value)
+
+    def time(self, **labels):
+        return self.labels(**labels).time()
+
+    def render(self):
+        lines = self.header()
+        for key, child in sorted(self.children.items()):
+            with child.lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def counter(self, name, help_text, labelnames=()):
+        metric = Counter(name, help_text, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    # collector() -> [(name, help, labelnames, [(label_values, value), ...])] (게이지로 노출)
+    def add_collector(self, collector):
+        self.collectors.append(collector)
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            for name, help_text, labelnames, samples in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} gauge")
+                for values, value in samples:
+                    if value is not None:
+                        lines.append(f"{name}{format_labels(labelnames, values)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# with 블록 실행 시간 기록, 예외가 나면 errors도 증가
+@contextmanager
+def timed(histogram, errors, **labels):
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        errors.inc(**labels)
+        raise
+    finally:
+        histogram.observe(time.perf_counter() - started, **labels)
+
+
+# 객체의 메서드 호출 시간을 operation 라벨로 기록 (저장소, Transcribe 클라이언트 등)
+# ignore: 정상 흐름에서 쓰는 예외(예: 없는 키)는 오류로 세지 않음
+class InstrumentedProxy:
+    def __init__(self, target, histogram, errors, ignore=(), **labels):
+        self._target = target
+        self._histogram = histogram
+        self._errors = errors
+        self._ignore = ignore
+        self._labels = labels
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if not callable(value) or name.startswith("_"):
+            return value
+        child = self._histogram.labels(operation=name, **self._labels)
+
+        def call(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return value(*args, **kwargs)
+            except self._ignore:
+                raise
+            except Exception:
+                self._errors.inc(operation=name, **self._labels)
+                raise
+            finally:
+                child.observe(time.perf_counter() - started)
+
+        return call
+
+
+# boto3 클라이언트의 모든 API 호출 시간 기록 (botocore 이벤트 훅, 재시도 포함 호출 단위)
+def instrument_boto_client(client, histogram, errors):
+    service = client.meta.service_model.service_name
+
+    def before_call(model, context, **kwargs):
+        context["metrics_call"] = (model.name, time.perf_counter())
+
+    def after_call(model, context, http_response=None, **kwargs):
+        call = context.pop("metrics_call", None)
+        if call:
+            histogram.observe(time.perf_counter() - call[1], service=service, operation=call[0])
+        if http_response is not None and http_response.status_code >= 300:
+            errors.inc(service=service, operation=model.name)
+
+    # 네트워크 오류 등으로 응답을 받지 못한 경우
+    def after_call_error(context, **kwargs):
+        call = context.pop("metrics_call", None)
+        if call:
+            histogram.observe(time.perf_counter() - call[1], service=service, operation=call[0])
+            errors.inc(service=service, operation=call[0])
+
+    client.meta.events.register("before-call", before_call)
+    client.meta.events.register("after-call", after_call)
+    client.meta.events.register("after-call-error", after_call_error)
+    return client
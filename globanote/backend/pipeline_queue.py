@@ -0,0 +1,259 @@
+import asyncio
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+
+# SQLite 기반 내구성 작업 큐 (전사 대기 -> 결과 저장 -> 요약)
+# - 단계(stage)별 핸들러를 등록하면 워커 풀이 정해진 동시성으로 처리
+# - 실패하면 지수 백오프(+지터)로 재시도, max_attempts를 넘으면 failed
+# - idempotency key가 같은 작업은 대기/실행 중이면 한 번만 등록되고, 이미 끝난(done/failed) 작업은
+#   다시 등록하면 새 payload로 처음부터 다시 실행 (바뀐 트랜스크립트 재저장/재임베딩, 실패 단계 재시도)
+# - 작업 선점은 status 조건을 건 UPDATE로 원자적으로 처리 (같은 DB를 쓰는 여러 워커 프로세스 대비)
+# - 실행 중인 작업은 lease_seconds 안에서 주기적으로 updated_at을 갱신하고,
+#   갱신이 lease_seconds 넘게 끊긴 running 작업(죽은 프로세스)만 다른 워커가 다시 가져감
+# - 정상 종료 시 실행 중이던 작업은 시도 횟수를 되돌려 pending으로 반환
+# 핸들러: handler(job_id, payload) (일반 함수는 스레드에서, 코루틴 함수는 이벤트 루프에서 실행)
+# - DB 연결은 처음 사용할 때 열음 (backend를 import만 하는 도구가 큐 DB를 만들거나 쓰지 않도록)
+# - SQLite 쓰기는 잠금 대기(busy timeout)로 막힐 수 있으므로 워커는 스레드에서 호출하고,
+#   이벤트 루프에서 enqueue할 때도 asyncio.to_thread로 호출
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    stage TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    payload TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_run_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (status, next_run_at);
+CREATE INDEX IF NOT EXISTS tasks_job ON tasks (job_id);
+"""
+
+
+# 아직 처리할 수 없음 (예: 전사 진행 중): 시도 횟수를 늘리지 않고 delay초 뒤 다시 실행
+class RetryLater(Exception):
+    def __init__(self, delay, message=""):
+        super().__init__(message)
+        self.delay = delay
+
+
+# 재시도해도 소용없는 실패: 바로 failed 처리
+class PermanentError(Exception):
+    pass
+
+
+class PipelineQueue:
+    def __init__(self, path, workers=4, poll_interval=1.0, max_attempts=5, base_backoff=2.0, max_backoff=300.0,
+                 lease_seconds=300.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.handlers = {}
+        self.lock = threading.Lock()
+        self._connect_lock = threading.Lock()
+        self._conn = None
+        self.loop = None
+        self.wakeup = None
+        self.worker_tasks = []
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            with self._connect_lock:
+                if self._conn is None:
+                    conn = sqlite3.connect(
+                        self.path, timeout=30.0, check_same_thread=False, isolation_level=None
+                    )
+                    conn.row_factory = sqlite3.Row
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(SCHEMA)
+                    self._conn = conn
+        return self._conn
+
+    def register(self, stage, handler):
+        self.handlers[stage] = handler
+
+    # 새로 등록(또는 끝난 작업을 다시 등록)되면 True, 같은 key가 대기/실행 중이면 False
+    def enqueue(self, stage, job_id, payload=None, key=None, delay=0.0):
+        key = key or f"{stage}:{job_id}"
+        now = time.time()
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT INTO tasks"
+                " (idempotency_key, stage, job_id, payload, next_run_at, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (idempotency_key) DO UPDATE SET"
+                " payload = excluded.payload, status = 'pending', attempts = 0, last_error = NULL,"
+                " next_run_at = excluded.next_run_at, updated_at = excluded.updated_at"
+                " WHERE status IN ('done', 'failed')",
+                (key, stage, job_id, json.dumps(payload or {}), now + delay, now, now),
+            )
+        added = cursor.rowcount == 1
+        if added and self.loop is not None:
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+        return added
+
+    # 실행 가능한 작업: 대기 시간이 지난 pending, 또는 lease가 끊긴 running
+    CLAIMABLE = (
+        "((status = 'pending' AND next_run_at <= ?) OR (status = 'running' AND updated_at < ?))"
+    )
+
+    def _claim(self):
+        stages = list(self.handlers)
+        with self.lock:
+            # 다른 프로세스가 먼저 가져가면 rowcount가 0이므로 다음 후보로
+            for _ in range(10):
+                now = time.time()
+                row = self.conn.execute(
+                    f"SELECT * FROM tasks WHERE {self.CLAIMABLE}"
+                    f" AND stage IN ({','.join('?' * len(stages))})"
+                    " ORDER BY next_run_at, id LIMIT 1",
+                    (now, now - self.lease_seconds, *stages),
+                ).fetchone()
+                if row is None:
+                    return None
+                # 시도 횟수는 시작할 때 올림 (실행 중 프로세스가 죽어도 무한 재시도되지 않도록)
+                claimed = self.conn.execute(
+                    "UPDATE tasks SET status = 'running', attempts = attempts + 1, updated_at = ?"
+                    f" WHERE id = ? AND status = ? AND updated_at = ? AND {self.CLAIMABLE}",
+                    (now, row["id"], row["status"], row["updated_at"], now, now - self.lease_seconds),
+                ).rowcount
+                if claimed:
+                    break
+            else:
+                return None
+        if row["status"] == "running":
+            logger.warning(f"Reclaiming stale pipeline task {row['stage']}:{row['job_id']}")
+        task = dict(row)
+        task["attempts"] += 1
+        task["updated_at"] = now
+        task["payload"] = json.loads(task["payload"])
+        return task
+
+    # 실행 중 lease 갱신 (이 작업을 아직 가진 경우만)
+    def _renew(self, task):
+        now = time.time()
+        with self.lock:
+            renewed = self.conn.execute(
+                "UPDATE tasks SET updated_at = ? WHERE id = ? AND status = 'running' AND updated_at = ?",
+                (now, task["id"], task["updated_at"]),
+            ).rowcount
+        if renewed:
+            task["updated_at"] = now
+        return renewed
+
+    async def _heartbeat(self, task):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await asyncio.to_thread(self._renew, task):
+                logger.warning(f"Lost lease on pipeline task {task['stage']}:{task['job_id']}")
+                return
+
+    # 이 워커가 아직 lease를 가진 경우에만 결과 기록 (다른 워커가 다시 가져간 작업은 건드리지 않음)
+    def _update(self, task, status, error=None, delay=0.0, refund_attempt=False):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "UPDATE tasks SET status = ?, last_error = ?, next_run_at = ?, updated_at = ?,"
+                " attempts = attempts - ? WHERE id = ? AND status = 'running' AND updated_at = ?",
+                (status, error, now + delay, now, 1 if refund_attempt else 0, task["id"], task["updated_at"]),
+            )
+
+    def backoff(self, attempts):
+        delay = min(self.max_backoff, self.base_backoff * 2 ** (attempts - 1))
+        return delay * (0.5 + random.random() / 2)
+
+    async def _run(self, task):
+        handler = self.handlers[task["stage"]]
+        label = f"{task['stage']}:{task['job_id']}"
+        heartbeat = asyncio.create_task(self._heartbeat(task))
+        try:
+            if asyncio.iscoroutinefunction(handler):
+                await handler(task["job_id"], task["payload"])
+            else:
+                await asyncio.to_thread(handler, task["job_id"], task["payload"])
+        except asyncio.CancelledError:
+            # 종료 중: 다음 실행에서 이어서 처리 (기록은 취소되지 않도록 shield)
+            await asyncio.shield(
+                asyncio.to_thread(self._update, task, "pending", refund_attempt=True)
+            )
+            raise
+        except RetryLater as e:
+            await asyncio.to_thread(
+                self._update, task, "pending", str(e) or None, e.delay, refund_attempt=True
+            )
+        except PermanentError as e:
+            logger.error(f"Pipeline task {label} failed: {str(e)}")
+            await asyncio.to_thread(self._update, task, "failed", str(e))
+        except Exception as e:
+            if task["attempts"] >= self.max_attempts:
+                logger.error(f"Pipeline task {label} gave up after {task['attempts']} attempts: {str(e)}")
+                await asyncio.to_thread(self._update, task, "failed", str(e))
+            else:
+                delay = self.backoff(task["attempts"])
+                logger.warning(f"Pipeline task {label} failed, retrying in {delay:.1f}s: {str(e)}")
+                await asyncio.to_thread(self._update, task, "pending", str(e), delay)
+        else:
+            await asyncio.to_thread(self._update, task, "done")
+        finally:
+            heartbeat.cancel()
+
+    async def _worker(self):
+        while True:
+            task = await asyncio.to_thread(self._claim)
+            if task is None:
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(task)
+
+    async def start(self):
+        await asyncio.to_thread(lambda: self.conn)
+        self.loop = asyncio.get_running_loop()
+        self.wakeup = asyncio.Event()
+        self.worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    # 실행 중이던 작업은 pending으로 반환됨 (프로세스가 죽은 경우는 lease 만료 후 다시 실행)
+    async def stop(self):
+        for task in self.worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self.worker_tasks, return_exceptions=True)
+        self.worker_tasks = []
+        self.loop = None
+
+    def tasks_for_job(self, job_id):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT stage, status, attempts, last_error, next_run_at, updated_at"
+                " FROM tasks WHERE job_id = ? ORDER BY id",
+                (job_id,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT stage, status, COUNT(*) AS count FROM tasks GROUP BY stage, status"
+            ).fetchall()
+        stats = {}
+        for row in rows:
+            stats.setdefault(row["stage"], {})[row["status"]] = row["count"]
+        return stats
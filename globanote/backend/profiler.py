@@ -0,0 +1,350 @@
+import asyncio
+import cProfile
+import collections
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+
+# 운영 중인 워커 진단 (재배포 없이 /admin 엔드포인트로 켜고 끔)
+# - CPU 프로파일: 다음 N개 요청 또는 지정 시간 동안
+#   sample  : 모든 스레드의 스택을 주기적으로 수집 (스레드풀에서 도는 포맷/디코딩까지 보임, 오버헤드 낮음)
+#   cprofile: 이벤트 루프 스레드의 결정적 프로파일 (함수 호출 수까지 정확하지만 느려짐)
+#   결과는 pstats 형식(.prof, python -m pstats / snakeviz) + sample은 folded stack(.folded, flamegraph.pl)
+# - tracemalloc 스냅샷: 상위 할당 위치와 이전 스냅샷 대비 증가분
+# - 이벤트 루프 지연 / 스레드풀 대기열
+
+PROFILE_SESSIONS_KEPT = 20
+
+
+def code_key(code):
+    return (code.co_filename, code.co_firstlineno, code.co_name)
+
+
+# 대기 중인 스레드의 맨 위 프레임 (유휴 스레드풀 워커, select에서 쉬는 이벤트 루프 등은 샘플에서 제외)
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+def is_idle(code):
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+
+def key_label(key):
+    filename, line, name = key
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+# 모든 스레드 스택 샘플링 (sys._current_frames)
+class StackSampler:
+    def __init__(self, interval, include_idle=False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (not self.include_idle and is_idle(frame.f_code)):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(code_key(frame.f_code))
+                    frame = frame.f_back
+                # 스레드풀 워커는 이름 뒤 번호를 떼서 하나로 모음
+                thread_name = names.get(ident, str(ident)).rsplit("_", 1)[0]
+                self.stacks[(thread_name, tuple(reversed(stack)))] += 1
+            self.samples += 1
+
+    # pstats가 읽는 형식: {func: (cc, nc, tt, ct, {caller: (cc, nc, tt, ct)})}
+    # 호출 수 대신 샘플 수, 시간은 샘플 수 * 간격
+    def pstats_dict(self):
+        own = collections.Counter()
+        total = collections.Counter()
+        edges = collections.defaultdict(collections.Counter)
+        for (_, stack), count in self.stacks.items():
+            own[stack[-1]] += count
+            for key in set(stack):
+                total[key] += count
+            for caller, callee in set(zip(stack, stack[1:])):
+                edges[callee][caller] += count
+        stats = {}
+        for key, count in total.items():
+            callers = {
+                caller: (n, n, 0.0, n * self.interval) for caller, n in edges[key].items()
+            }
+            stats[key] = (count, count, own[key] * self.interval, count * self.interval, callers)
+        return stats
+
+    def folded(self):
+        lines = []
+        for (thread_name, stack), count in sorted(self.stacks.items(), key=lambda kv: -kv[1]):
+            lines.append(";".join([thread_name] + [key_label(k) for k in stack]) + f" {count}")
+        return "\n".join(lines) + "\n"
+
+
+class ProfileSession:
+    def __init__(self, mode, seconds, max_requests, interval):
+        self.id = time.strftime("%Y%m%d_%H%M%S") + "-" + uuid.uuid4().hex[:6]
+        self.mode = mode
+        self.seconds = seconds
+        self.max_requests = max_requests
+        self.interval = interval
+        self.started_at = time.time()
+        self.finished_at = None
+        self.requests = 0
+        self.files = []
+        self.top = []
+        self.status = "running"
+
+    def info(self):
+        return {
+            "id": self.id,
+            "mode": self.mode,
+            "status": self.status,
+            "seconds": self.seconds,
+            "max_requests": self.max_requests,
+            "requests": self.requests,
+            "started_at": self.started_at,
+            "elapsed_seconds": round((self.finished_at or time.time()) - self.started_at, 3),
+            "files": self.files,
+            "top": self.top,
+        }
+
+
+class ProfileBusy(Exception):
+    pass
+
+
+# 한 번에 하나의 CPU 프로파일 세션 (이벤트 루프 스레드에서만 시작/종료)
+class Profiler:
+    def __init__(self, output_dir, max_seconds=300.0):
+        self.output_dir = output_dir
+        self.max_seconds = max_seconds
+        self.sessions = collections.OrderedDict()
+        self.active = None
+        self._collector = None
+        self._timer = None
+
+    def start(self, mode="sample", seconds=None, max_requests=None, interval=0.005, include_idle=False):
+        if self.active:
+            raise ProfileBusy(self.active.id)
+        if mode not in ("sample", "cprofile"):
+            raise ValueError(f"unknown profile mode: {mode}")
+        if not seconds and not max_requests:
+            seconds = 30.0
+        seconds = min(seconds or self.max_seconds, self.max_seconds)
+        session = ProfileSession(mode, seconds, max_requests, interval)
+        if mode == "sample":
+            self._collector = StackSampler(interval, include_idle)
+            self._collector.start()
+        else:
+            self._collector = cProfile.Profile()
+            self._collector.enable()
+        self.active = session
+        self.sessions[session.id] = session
+        while len(self.sessions) > PROFILE_SESSIONS_KEPT:
+            self.sessions.popitem(last=False)
+        self._timer = asyncio.get_running_loop().call_later(seconds, self.stop)
+        return session
+
+    # 미들웨어가 요청이 끝날 때마다 호출
+    def request_done(self):
+        session = self.active
+        if session is None:
+            return
+        session.requests += 1
+        if session.max_requests and session.requests >= session.max_requests:
+            self.stop()
+
+    def stop(self):
+        session, collector = self.active, self._collector
+        if session is None:
+            return None
+        self.active, self._collector = None, None
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"profile-{session.id}")
+        if isinstance(collector, StackSampler):
+            collector.stop()
+            with open(base + ".prof", "wb") as f:
+                marshal.dump(collector.pstats_dict(), f)
+            with open(base + ".folded", "w", encoding="utf-8") as f:
+                f.write(collector.folded())
+            session.files = [os.path.basename(base + ".prof"), os.path.basename(base + ".folded")]
+        else:
+            collector.disable()
+            collector.dump_stats(base + ".prof")
+            session.files = [os.path.basename(base + ".prof")]
+        session.top = top_functions(base + ".prof")
+        session.finished_at = time.time()
+        session.status = "done"
+        return session
+
+
+# 누적 시간 기준 상위 함수
+def top_functions(path, limit=25):
+    stats = pstats.Stats(path)
+    rows = sorted(stats.stats.items(), key=lambda kv: -kv[1][3])[:limit]
+    return [
+        {
+            "function": key_label(key),
+            "calls": nc,
+            "self_seconds": round(tt, 4),
+            "cumulative_seconds": round(ct, 4),
+        }
+        for key, (_, nc, tt, ct, _) in rows
+    ]
+
+
+# 프로파일 중인 요청 수 세기 (/admin 요청은 제외)
+class ProfilingMiddleware:
+    def __init__(self, app, profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.profiler.active is None or scope["path"].startswith("/admin"):
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.request_done()
+
+
+# tracemalloc 스냅샷: 상위 할당 위치 + 이전 스냅샷 대비 증가분
+class AllocationTracker:
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.previous = None
+
+    def start(self, frames=10):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.previous = None
+        return self.status()
+
+    def stop(self):
+        tracemalloc.stop()
+        self.previous = None
+        return self.status()
+
+    def status(self):
+        if not tracemalloc.is_tracing():
+            return {"tracing": False}
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": True,
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_bytes": current,
+            "peak_bytes": peak,
+        }
+
+    def snapshot(self, limit=20, group_by="lineno"):
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+        os.makedirs(self.output_dir, exist_ok=True)
+        name = f"tracemalloc-{time.strftime('%Y%m%d_%H%M%S')}-{uuid.uuid4().hex[:6]}.snapshot"
+        snapshot.dump(os.path.join(self.output_dir, name))
+
+        def describe(stat):
+            frame = stat.traceback[0]
+            row = {
+                "location": f"{frame.filename}:{frame.lineno}",
+                "size_bytes": stat.size,
+                "count": stat.count,
+            }
+            if hasattr(stat, "size_diff"):
+                row["size_diff_bytes"] = stat.size_diff
+                row["count_diff"] = stat.count_diff
+            return row
+
+        result = dict(self.status(), file=name)
+        result["top"] = [describe(s) for s in snapshot.statistics(group_by)[:limit]]
+        if self.previous is not None:
+            diff = snapshot.compare_to(self.previous, group_by)
+            result["growth"] = [describe(s) for s in diff[:limit] if s.size_diff > 0]
+        self.previous = snapshot
+        return result
+
+
+# 이벤트 루프 지연: interval마다 깨어나 예정보다 늦어진 시간 기록
+class LoopLagMonitor:
+    def __init__(self, interval=0.1, window=600):
+        self.interval = interval
+        self.samples = collections.deque(maxlen=window)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - started - self.interval))
+
+    def stats(self):
+        if not self.samples:
+            return {"samples": 0}
+        values = sorted(self.samples)
+        return {
+            "samples": len(values),
+            "window_seconds": round(len(values) * self.interval, 1),
+            "mean_ms": round(sum(values) / len(values) * 1000, 3),
+            "p50_ms": round(values[len(values) // 2] * 1000, 3),
+            "p99_ms": round(values[min(len(values) - 1, int(len(values) * 0.99))] * 1000, 3),
+            "max_ms": round(values[-1] * 1000, 3),
+            "last_ms": round(self.samples[-1] * 1000, 3),
+        }
+
+
+# ThreadPoolExecutor 상태 (asyncio.to_thread가 쓰는 기본 executor 포함, 비공개 속성 사용)
+def executor_stats(executor):
+    if executor is None:
+        return None
+    return {
+        "max_workers": executor._max_workers,
+        "threads": len(executor._threads),
+        "idle_threads": executor._idle_semaphore._value,
+        "queued": executor._work_queue.qsize(),
+    }
+
+
+def runtime_stats(loop_lag):
+    loop = asyncio.get_running_loop()
+    return {
+        "event_loop_lag": loop_lag.stats(),
+        "default_executor": executor_stats(getattr(loop, "_default_executor", None)),
+        "threads": [t.name for t in threading.enumerate()],
+        "asyncio_tasks": len(asyncio.all_tasks(loop)),
+    }
@@ -0,0 +1,294 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import unicodedata
+import logging
+
+# 트랜스크립트/요약 전문 검색용 역색인
+# - 한글/한자/가나는 문자 bigram, 영문/숫자는 단어 단위 토큰
+# - 새 문서는 메모리 버퍼에 쌓았다가 불변 세그먼트 파일로 flush
+# - 세그먼트 = 문서 테이블(JSON) + 정렬된 용어 사전 + delta/varint 인코딩된 posting
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_MAGIC = b"GNIX1\n"
+
+TOKEN_RE = re.compile(
+    r"[0-9A-Za-z]+|[\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u4e00-\u9fff\uac00-\ud7a3]+"
+)
+CJK_RE = re.compile(r"[^0-9A-Za-z]")
+
+
+def tokenize(text):
+    text = unicodedata.normalize("NFC", text or "").lower()
+    tokens = []
+    for run in TOKEN_RE.findall(text):
+        if CJK_RE.match(run):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def encode_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(data, pos):
+    result = shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+
+def encode_postings(doc_ids):
+    out = bytearray()
+    encode_varint(len(doc_ids), out)
+    prev = 0
+    for doc_id in doc_ids:
+        encode_varint(doc_id - prev, out)
+        prev = doc_id
+    return bytes(out)
+
+
+def decode_postings(data, pos=0):
+    count, pos = decode_varint(data, pos)
+    doc_ids = []
+    prev = 0
+    for _ in range(count):
+        delta, pos = decode_varint(data, pos)
+        prev += delta
+        doc_ids.append(prev)
+    return doc_ids
+
+
+class Segment:
+    # docs: [job_id, field, generation, turn, start_ms, end_ms]
+    def __init__(self, name, docs, terms, postings):
+        self.name = name
+        self.docs = docs
+        self.terms = terms  # term -> posting 시작 위치
+        self.postings = postings
+
+    def lookup(self, term):
+        pos = self.terms.get(term)
+        if pos is None:
+            return []
+        return decode_postings(self.postings, pos)
+
+    @classmethod
+    def build(cls, name, docs, inverted):
+        terms = {}
+        postings = bytearray()
+        for term in sorted(inverted):
+            terms[term] = len(postings)
+            postings += encode_postings(sorted(inverted[term]))
+        return cls(name, docs, terms, bytes(postings))
+
+    def write(self, path):
+        header = json.dumps(
+            {"docs": self.docs, "terms": self.terms}, ensure_ascii=False
+        ).encode("utf-8")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(SEGMENT_MAGIC)
+            f.write(len(header).to_bytes(4, "big"))
+            f.write(header)
+            f.write(self.postings)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def read(cls, name, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if not data.startswith(SEGMENT_MAGIC):
+            raise ValueError(f"Invalid search segment: {path}")
+        pos = len(SEGMENT_MAGIC)
+        header_len = int.from_bytes(data[pos:pos + 4], "big")
+        pos += 4
+        header = json.loads(data[pos:pos + header_len])
+        return cls(name, header["docs"], header["terms"], data[pos + header_len:])
+
+
+class SearchIndex:
+    def __init__(self, directory, flush_docs=500, flush_interval=30, max_segments=8):
+        self.directory = directory
+        self.flush_docs = flush_docs
+        self.flush_interval = flush_interval
+        self.max_segments = max_segments
+        self._lock = threading.RLock()
+        self.segments = []
+        # (job_id, field) -> [generation, content hash]
+        self.live = {}
+        self.next_segment = 1
+        self._reset_buffer()
+        os.makedirs(directory, exist_ok=True)
+        self.load()
+
+    def _reset_buffer(self):
+        self.buffer_docs = []
+        self.buffer_inverted = {}
+        self.buffer_since = None
+
+    def _manifest_path(self):
+        return os.path.join(self.directory, "manifest.json")
+
+    def load(self):
+        path = self._manifest_path()
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            manifest = json.load(f)
+        self.next_segment = manifest["next_segment"]
+        self.live = {tuple(k.split("\t", 1)): v for k, v in manifest["live"].items()}
+        self.segments = [
+            Segment.read(name, os.path.join(self.directory, name))
+            for name in manifest["segments"]
+        ]
+        logger.info(
+            f"Search index loaded: {len(self.segments)} segments, {len(self.live)} documents"
+        )
+
+    def _write_manifest(self):
+        manifest = {
+            "next_segment": self.next_segment,
+            "segments": [segment.name for segment in self.segments],
+            "live": {"\t".join(k): v for k, v in self.live.items()},
+        }
+        tmp_path = self._manifest_path() + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, self._manifest_path())
+
+    # 같은 (job_id, field)를 다시 색인하면 이전 세대 문서는 검색에서 제외
+    def _index(self, job_id, field, parts):
+        digest = hashlib.sha1(
+            json.dumps(parts, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        with self._lock:
+            current = self.live.get((job_id, field))
+            if current and current[1] == digest:
+                return False
+            generation = current[0] + 1 if current else 1
+            self.live[(job_id, field)] = [generation, digest]
+            for turn, start_ms, end_ms, text in parts:
+                doc_id = len(self.buffer_docs)
+                self.buffer_docs.append([job_id, field, generation, turn, start_ms, end_ms])
+                for token in set(tokenize(text)):
+                    self.buffer_inverted.setdefault(token, []).append(doc_id)
+            if self.buffer_since is None:
+                self.buffer_since = time.monotonic()
+            self._maybe_flush()
+            return True
+
+    def index_transcript(self, job_id, turns):
+        parts = [
+            [i, int(round(turn["start"] * 1000)), int(round(turn["end"] * 1000)), turn["text"]]
+            for i, turn in enumerate(turns)
+        ]
+        return self._index(job_id, "transcript", parts)
+
+    def index_summary(self, job_id, summary):
+        return self._index(job_id, "summary", [[None, None, None, summary]])
+
+    def _maybe_flush(self):
+        if len(self.buffer_docs) >= self.flush_docs or (
+            self.buffer_since is not None
+            and time.monotonic() - self.buffer_since >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if self.buffer_docs:
+                name = f"seg_{self.next_segment:06d}.gnix"
+                self.next_segment += 1
+                segment = Segment.build(name, self.buffer_docs, self.buffer_inverted)
+                segment.write(os.path.join(self.directory, name))
+                self.segments.append(segment)
+                self._reset_buffer()
+            if len(self.segments) > self.max_segments:
+                self._merge()
+            self._write_manifest()
+
+    def _is_live(self, doc):
+        current = self.live.get((doc[0], doc[1]))
+        return current is not None and current[0] == doc[2]
+
+    # 모든 세그먼트를 하나로 병합하면서 이전 세대 문서 제거
+    def _merge(self):
+        docs = []
+        inverted = {}
+        for segment in self.segments:
+            remap = {}
+            for local_id, doc in enumerate(segment.docs):
+                if self._is_live(doc):
+                    remap[local_id] = len(docs)
+                    docs.append(doc)
+            for term in segment.terms:
+                merged = [remap[d] for d in segment.lookup(term) if d in remap]
+                if merged:
+                    inverted.setdefault(term, []).extend(merged)
+        name = f"seg_{self.next_segment:06d}.gnix"
+        self.next_segment += 1
+        merged_segment = Segment.build(name, docs, inverted)
+        merged_segment.write(os.path.join(self.directory, name))
+        old = self.segments
+        self.segments = [merged_segment]
+        self._write_manifest()
+        for segment in old:
+            try:
+                os.unlink(os.path.join(self.directory, segment.name))
+            except OSError:
+                pass
+        logger.info(f"Search index merged {len(old)} segments into {name}")
+
+    # 질의의 모든 토큰을 포함하는 발화/요약 검색, job_id별로 묶어 반환
+    def search(self, query, limit=20):
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+        with self._lock:
+            sources = [(segment.docs, segment.lookup) for segment in self.segments]
+            sources.append((
+                self.buffer_docs,
+                lambda term: self.buffer_inverted.get(term, []),
+            ))
+            hits = {}
+            for docs, lookup in sources:
+                matched = None
+                # posting이 짧은 토큰부터 교집합
+                for postings in sorted((lookup(t) for t in tokens), key=len):
+                    matched = set(postings) if matched is None else matched & set(postings)
+                    if not matched:
+                        break
+                for doc_id in sorted(matched or ()):
+                    doc = docs[doc_id]
+                    if not self._is_live(doc):
+                        continue
+                    job_id, field, _, turn, start_ms, end_ms = doc
+                    hits.setdefault(job_id, []).append({
+                        "field": field,
+                        "turn": turn,
+                        "start_ms": start_ms,
+                        "end_ms": end_ms,
+                    })
+        results = [
+            {"job_id": job_id, "score": len(matches), "matches": matches}
+            for job_id, matches in hits.items()
+        ]
+        results.sort(key=lambda r: (-r["score"], r["job_id"]))
+        return results[:limit]
@@ -0,0 +1,208 @@
+import re
+import subprocess
+
+# 긴 녹음 분할 전사 / 결과 병합
+# - 무음 구간을 기준으로 겹침(overlap)이 있는 청크로 분할
+# - 청크별 Transcribe 결과를 원본 시간축으로 옮기고, 겹침 구간 중복 제거, 화자 번호를 청크 간에 맞춤
+# - 병합 결과는 Transcribe 결과 JSON과 같은 형태라 기존 format_transcript를 그대로 사용
+
+SILENCE_START_RE = re.compile(r"silence_start: (-?[\d.]+)")
+SILENCE_END_RE = re.compile(r"silence_end: (-?[\d.]+)")
+
+
+def probe_duration(path):
+    output = subprocess.run(
+        [
+            "ffprobe", "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1",
+            path,
+        ],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return float(output.strip())
+
+
+# ffmpeg silencedetect로 무음 구간 [(start, end), ...] 검출
+def detect_silences(path, noise_db=-35, min_silence=0.5):
+    stderr = subprocess.run(
+        [
+            "ffmpeg", "-hide_banner", "-nostats", "-i", path,
+            "-af", f"silencedetect=noise={noise_db}dB:d={min_silence}",
+            "-f", "null", "-",
+        ],
+        check=True, capture_output=True, text=True,
+    ).stderr
+    starts = [float(v) for v in SILENCE_START_RE.findall(stderr)]
+    ends = [float(v) for v in SILENCE_END_RE.findall(stderr)]
+    return list(zip(starts, ends))
+
+
+# 목표 길이마다 가장 가까운 무음 중간 지점에서 자르고 앞뒤로 overlap만큼 겹치게 함
+def plan_chunks(duration, silences, chunk_seconds=600, overlap=5, search_window=60):
+    midpoints = [(start + end) / 2 for start, end in silences]
+    cuts = [0.0]
+    while duration - cuts[-1] > chunk_seconds + search_window:
+        target = cuts[-1] + chunk_seconds
+        candidates = [m for m in midpoints if abs(m - target) <= search_window and m > cuts[-1]]
+        cuts.append(min(candidates, key=lambda m: abs(m - target)) if candidates else target)
+    cuts.append(duration)
+    return [
+        {
+            "index": i,
+            "offset": max(0.0, cuts[i] - overlap),
+            "end": min(duration, cuts[i + 1] + overlap),
+            # 병합 시 이 청크에서 채택하는 구간 [keep_start, keep_end)
+            "keep_start": cuts[i],
+            "keep_end": cuts[i + 1],
+        }
+        for i in range(len(cuts) - 1)
+    ]
+
+
+def extract_chunk(path, start, end, output_path):
+    subprocess.run(
+        [
+            "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+            "-ss", f"{start:.3f}", "-t", f"{end - start:.3f}", "-i", path,
+            "-ac", "1", "-c:a", "flac", output_path,
+        ],
+        check=True,
+    )
+
+
+def _shift(value, offset):
+    return f"{float(value) + offset:.3f}"
+
+
+# 청크 결과 하나를 원본 시간축으로 옮기고 채택 구간만 남김
+def _shifted_items(results, chunk):
+    offset = chunk["offset"]
+    items = []
+    keep = False
+    for item in results.get("items", []):
+        if "start_time" in item:
+            start = float(item["start_time"]) + offset
+            keep = chunk["keep_start"] <= start < chunk["keep_end"]
+            if keep:
+                item = dict(item)
+                item["start_time"] = _shift(item["start_time"], offset)
+                item["end_time"] = _shift(item["end_time"], offset)
+                items.append(item)
+        elif keep:
+            # 문장부호는 앞 단어를 따라감
+            items.append(item)
+    return items
+
+
+# items_end: 채택한 마지막 단어의 종료 시각 (경계에 걸친 단어가 잘리지 않도록)
+def _shifted_segments(results, chunk, items_end):
+    offset = chunk["offset"]
+    keep_end = max(chunk["keep_end"], items_end)
+    segments = []
+    for segment in results.get("speaker_labels", {}).get("segments", []):
+        start = float(segment["start_time"]) + offset
+        end = float(segment["end_time"]) + offset
+        start, end = max(start, chunk["keep_start"]), min(end, keep_end)
+        if end <= start:
+            continue
+        segments.append({
+            "speaker_label": segment["speaker_label"],
+            "start_time": f"{start:.3f}",
+            "end_time": f"{end:.3f}",
+        })
+    return segments
+
+
+# 겹침 구간에서 두 청크의 화자별 발화 시간이 가장 많이 겹치는 쌍끼리 대응
+def _match_speakers(prev_segments, next_segments, window_start, window_end, prev_mapping):
+    overlap = {}
+    for a in prev_segments:
+        for b in next_segments:
+            start = max(float(a["start_time"]), float(b["start_time"]), window_start)
+            end = min(float(a["end_time"]), float(b["end_time"]), window_end)
+            if end > start:
+                key = (a["speaker_label"], b["speaker_label"])
+                overlap[key] = overlap.get(key, 0.0) + end - start
+    mapping = {}
+    used = set()
+    for (a, b), _ in sorted(overlap.items(), key=lambda kv: -kv[1]):
+        if b in mapping or prev_mapping.get(a) in used:
+            continue
+        mapping[b] = prev_mapping[a]
+        used.add(prev_mapping[a])
+    return mapping
+
+
+def _raw_segments(results, offset):
+    return [
+        {
+            "speaker_label": s["speaker_label"],
+            "start_time": float(s["start_time"]) + offset,
+            "end_time": float(s["end_time"]) + offset,
+        }
+        for s in results.get("speaker_labels", {}).get("segments", [])
+    ]
+
+
+# chunk_results: [(chunk, transcript_data), ...] (chunk 순서대로)
+def stitch_results(job_name, chunk_results):
+    items = []
+    segments = []
+    next_speaker = 0
+    prev_raw = None
+    prev_mapping = {}
+    prev_chunk = None
+    has_speakers = False
+
+    for chunk, data in chunk_results:
+        results = data["results"]
+        raw = _raw_segments(results, chunk["offset"])
+        labels = sorted({s["speaker_label"] for s in raw})
+        mapping = {}
+        if raw:
+            has_speakers = True
+            if prev_raw is not None:
+                # 이전 청크와 겹치는 오디오 구간에서 화자 대응
+                mapping = _match_speakers(
+                    prev_raw, raw, chunk["offset"], prev_chunk["end"], prev_mapping
+                )
+            for label in labels:
+                if label not in mapping:
+                    mapping[label] = f"spk_{next_speaker}"
+                    next_speaker += 1
+
+        items_end = 0.0
+        for item in _shifted_items(results, chunk):
+            if "speaker_label" in item:
+                item = dict(item, speaker_label=mapping.get(item["speaker_label"], item["speaker_label"]))
+            if "end_time" in item:
+                items_end = float(item["end_time"])
+            items.append(item)
+        for segment in _shifted_segments(results, chunk, items_end):
+            segment["speaker_label"] = mapping[segment["speaker_label"]]
+            segments.append(segment)
+
+        prev_raw, prev_mapping, prev_chunk = raw, mapping, chunk
+
+    words = []
+    for item in items:
+        content = item["alternatives"][0]["content"]
+        if item.get("type") == "punctuation" and words:
+            words[-1] += content
+        else:
+            words.append(content)
+
+    stitched = {
+        "jobName": job_name,
+        "results": {
+            "transcripts": [{"transcript": " ".join(words)}],
+            "items": items,
+        },
+    }
+    if has_speakers:
+        stitched["results"]["speaker_labels"] = {
+            "speakers": next_speaker,
+            "segments": segments,
+        }
+    return stitched
@@ -0,0 +1,67 @@
+import os
+import threading
+import time
+
+# 콜드 스타트 구간별 소요 시간
+# - mark(name): 직전 mark 이후 경과 시간을 name 구간으로 기록 (모듈 초기화, lifespan 순서대로)
+# - record(name, seconds): 순서와 무관한 구간 (백그라운드 테이블 확인, 클라이언트 첫 생성 등)
+# - 첫 구간은 프로세스 시작 -> 첫 mark (인터프리터 + import), /proc을 못 읽으면 생략
+
+
+# 프로세스 시작 후 경과 시간 (Linux /proc 기준, 그 외 None)
+def process_age():
+    try:
+        with open("/proc/self/stat", "r") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", "r") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StartupReport:
+    def __init__(self, target_seconds=None):
+        self.target_seconds = target_seconds
+        self.age_at_start = process_age()
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.phases = []
+        self.background = []
+        self.ready_seconds = None
+        self.lock = threading.Lock()
+
+    def mark(self, name):
+        now = time.perf_counter()
+        with self.lock:
+            self.phases.append((name, now - self.last))
+            self.last = now
+
+    def record(self, name, seconds):
+        with self.lock:
+            self.background.append((name, seconds))
+
+    # 요청을 받을 준비 완료 (lifespan yield 직전)
+    def ready(self):
+        self.ready_seconds = time.perf_counter() - self.started + (self.age_at_start or 0.0)
+        return self.ready_seconds
+
+    @property
+    def over_target(self):
+        return bool(self.target_seconds and self.ready_seconds and self.ready_seconds > self.target_seconds)
+
+    def report(self):
+        phases = [{"name": name, "seconds": round(s, 4)} for name, s in self.phases]
+        if self.age_at_start is not None:
+            phases.insert(0, {"name": "process_start_to_init", "seconds": round(self.age_at_start, 4)})
+        return {
+            "ready_seconds": round(self.ready_seconds, 4) if self.ready_seconds else None,
+            "target_seconds": self.target_seconds,
+            "over_target": self.over_target,
+            "phases": phases,
+            "background": [{"name": name, "seconds": round(s, 4)} for name, s in self.background],
+        }
+
+    def summary(self):
+        parts = [f"{p['name']}={p['seconds'] * 1000:.0f}ms" for p in self.report()["phases"]]
+        return f"ready in {self.ready_seconds or 0:.2f}s (" + ", ".join(parts) + ")"
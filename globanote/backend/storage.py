@@ -0,0 +1,253 @@
+import errno
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+from botocore.exceptions import ClientError
+
+# 저장소 추상화: S3 / 로컬 파일시스템
+# - 키는 S3 키 형식(audio/..., transcribe_results/...)을 그대로 사용
+# - 로컬 엔진은 복사 대신 os.replace(이동)나 하드 링크로 저장하고, 범위 읽기는 seek로 처리
+# - 로컬 엔진의 임시 파일은 저장소와 같은 파일시스템(tmp_dir)에 만들어야 이동이 rename으로 끝남
+# - multipart 쓰기(start_multipart -> upload_part -> complete_multipart / abort_multipart):
+#   S3는 multipart 업로드, 로컬은 tmp_dir 아래 파트 파일을 모았다가 완료 시 이어 붙임
+
+
+class StorageNotFound(Exception):
+    pass
+
+
+class S3Storage:
+    kind = "s3"
+
+    def __init__(self, client, bucket):
+        self.client = client
+        self.bucket = bucket
+        self.tmp_dir = None
+
+    def uri(self, key):
+        return f"s3://{self.bucket}/{key}"
+
+    def key_for_uri(self, uri):
+        prefix = f"s3://{self.bucket}/"
+        if not uri.startswith(prefix):
+            raise ValueError(f"URI is not in this bucket: {uri}")
+        return uri[len(prefix):]
+
+    # move=True면 업로드 후 원본 임시 파일 삭제
+    def put_file(self, path, key, move=False):
+        self.client.upload_file(path, self.bucket, key)
+        if move:
+            os.unlink(path)
+        return self.uri(key)
+
+    def put_bytes(self, key, data):
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=data)
+
+    # 전체 내용과 메타데이터(head와 같은 형태)를 한 번의 요청으로
+    def get(self, key):
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                raise StorageNotFound(key)
+            raise
+        meta = {
+            "size": response["ContentLength"],
+            "etag": response["ETag"].strip('"'),
+            "last_modified": response["LastModified"].isoformat(),
+        }
+        return response["Body"].read(), meta
+
+    # byte_range: (start, end) 반열린 구간
+    def get_bytes(self, key, byte_range=None):
+        kwargs = {}
+        if byte_range:
+            kwargs["Range"] = f"bytes={byte_range[0]}-{byte_range[1] - 1}"
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=key, **kwargs)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                raise StorageNotFound(key)
+            raise
+        return response["Body"].read()
+
+    def head(self, key):
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                raise StorageNotFound(key)
+            raise
+        return {
+            "size": head["ContentLength"],
+            "etag": head["ETag"].strip('"'),
+            "last_modified": head["LastModified"].isoformat(),
+        }
+
+    def exists(self, key):
+        try:
+            self.head(key)
+            return True
+        except StorageNotFound:
+            return False
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def presigned_url(self, key, expires_in=900):
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": key}, ExpiresIn=expires_in
+        )
+
+    def start_multipart(self, key):
+        return self.client.create_multipart_upload(Bucket=self.bucket, Key=key)["UploadId"]
+
+    def upload_part(self, key, upload_id, part_number, data):
+        response = self.client.upload_part(
+            Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=data
+        )
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    def complete_multipart(self, key, upload_id, parts):
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": sorted(parts, key=lambda p: p["PartNumber"])},
+        )
+        return self.uri(key)
+
+    def abort_multipart(self, key, upload_id):
+        self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+
+
+class LocalStorage:
+    kind = "local"
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.tmp_dir = os.path.join(self.root, ".tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def path(self, key):
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def uri(self, key):
+        return f"file://{self.path(key)}"
+
+    def key_for_uri(self, uri):
+        prefix = f"file://{self.root}{os.sep}"
+        if not uri.startswith(prefix):
+            raise ValueError(f"URI is not in this storage: {uri}")
+        return uri[len(prefix):].replace(os.sep, "/")
+
+    # move=True: rename(같은 파일시스템이 아니면 복사 후 삭제), False: 하드 링크(불가하면 복사)
+    def put_file(self, path, key, move=False):
+        dest = self.path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        if move:
+            try:
+                os.replace(path, dest)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                shutil.move(path, dest)
+        else:
+            if os.path.exists(dest):
+                os.unlink(dest)
+            try:
+                os.link(path, dest)
+            except OSError:
+                shutil.copyfile(path, dest)
+        return self.uri(key)
+
+    # 임시 파일에 쓰고 rename해서 읽는 쪽이 쓰다 만 파일을 보지 않도록 함
+    def put_bytes(self, key, data):
+        dest = self.path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, dest)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def get_bytes(self, key, byte_range=None):
+        try:
+            with open(self.path(key), "rb") as f:
+                if not byte_range:
+                    return f.read()
+                f.seek(byte_range[0])
+                return f.read(byte_range[1] - byte_range[0])
+        except FileNotFoundError:
+            raise StorageNotFound(key)
+
+    def get(self, key):
+        try:
+            with open(self.path(key), "rb") as f:
+                return f.read(), self._meta(os.fstat(f.fileno()))
+        except FileNotFoundError:
+            raise StorageNotFound(key)
+
+    def _meta(self, stat):
+        return {
+            "size": stat.st_size,
+            "etag": f"{stat.st_mtime_ns:x}-{stat.st_size:x}",
+            "last_modified": datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).isoformat(),
+        }
+
+    def head(self, key):
+        try:
+            return self._meta(os.stat(self.path(key)))
+        except FileNotFoundError:
+            raise StorageNotFound(key)
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    # upload_id: tmp_dir 아래 파트 디렉터리 이름
+    def _part_dir(self, upload_id):
+        part_dir = os.path.join(self.tmp_dir, upload_id)
+        if os.path.dirname(part_dir) != self.tmp_dir:
+            raise ValueError(f"Invalid upload id: {upload_id}")
+        return part_dir
+
+    def start_multipart(self, key):
+        self.path(key)
+        return os.path.basename(tempfile.mkdtemp(prefix="multipart-", dir=self.tmp_dir))
+
+    def upload_part(self, key, upload_id, part_number, data):
+        with open(os.path.join(self._part_dir(upload_id), f"{part_number:05d}"), "wb") as f:
+            f.write(data)
+        return {"PartNumber": part_number}
+
+    def complete_multipart(self, key, upload_id, parts):
+        part_dir = self._part_dir(upload_id)
+        assembled = os.path.join(part_dir, "assembled")
+        with open(assembled, "wb") as out:
+            for part in sorted(parts, key=lambda p: p["PartNumber"]):
+                with open(os.path.join(part_dir, f"{part['PartNumber']:05d}"), "rb") as f:
+                    shutil.copyfileobj(f, out)
+        uri = self.put_file(assembled, key, move=True)
+        shutil.rmtree(part_dir, ignore_errors=True)
+        return uri
+
+    def abort_multipart(self, key, upload_id):
+        shutil.rmtree(self._part_dir(upload_id), ignore_errors=True)
+
+    def delete(self, key):
+        try:
+            os.unlink(self.path(key))
+        except FileNotFoundError:
+            pass
+
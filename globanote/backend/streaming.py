@@ -0,0 +1,173 @@
+import asyncio
+import logging
+
+# 실시간 스트리밍 음성 인식
+# - 인식기는 start / feed / end / results 인터페이스를 따름
+# - results()는 {"type": "partial"|"final", "speaker", "start", "end", "text"} 를 비동기로 생성
+# - 원본 오디오는 AudioArchiver가 저장소 multipart 쓰기로 병렬 보관
+#   (동시에 올리는 파트 수를 제한해 느린 연결에서도 소켓당 버퍼 메모리가 일정)
+
+logger = logging.getLogger(__name__)
+
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+# 테스트용 가짜 인식기: PCM16 길이만으로 결정적인 부분/최종 결과 생성
+class FakeStreamingRecognizer:
+    def __init__(self, sample_rate=16000, segment_seconds=2.0, partial_seconds=0.5, speakers=2):
+        self.bytes_per_second = sample_rate * 2
+        self.segment_seconds = segment_seconds
+        self.partial_seconds = partial_seconds
+        self.speakers = speakers
+        self.received = 0
+        self.segment_start = 0.0
+        self.segment_no = 0
+        self.next_partial = partial_seconds
+        self.queue = asyncio.Queue()
+
+    async def start(self):
+        pass
+
+    def _segment(self, end, final):
+        words = " ".join(f"발화{self.segment_no + 1}-{i + 1}" for i in range(int(end - self.segment_start) + 1))
+        return {
+            "type": "final" if final else "partial",
+            "speaker": self.segment_no % self.speakers + 1,
+            "start": self.segment_start,
+            "end": end,
+            "text": words,
+        }
+
+    async def feed(self, chunk):
+        self.received += len(chunk)
+        now = self.received / self.bytes_per_second
+        while now >= self.segment_start + self.segment_seconds:
+            end = self.segment_start + self.segment_seconds
+            await self.queue.put(self._segment(end, True))
+            self.segment_no += 1
+            self.segment_start = end
+            self.next_partial = end + self.partial_seconds
+        if now >= self.next_partial:
+            await self.queue.put(self._segment(now, False))
+            self.next_partial = now + self.partial_seconds
+
+    async def end(self):
+        now = self.received / self.bytes_per_second
+        if now > self.segment_start:
+            await self.queue.put(self._segment(now, True))
+        await self.queue.put(None)
+
+    async def results(self):
+        while True:
+            result = await self.queue.get()
+            if result is None:
+                return
+            yield result
+
+
+# Amazon Transcribe Streaming (amazon-transcribe 패키지) 인식기
+class TranscribeStreamingRecognizer:
+    def __init__(self, region, language_code, sample_rate=16000, access_key=None, secret_key=None):
+        from amazon_transcribe.client import TranscribeStreamingClient
+
+        credential_resolver = None
+        if access_key and secret_key:
+            from amazon_transcribe.auth import StaticCredentialResolver
+
+            credential_resolver = StaticCredentialResolver(access_key, secret_key)
+        self.client = TranscribeStreamingClient(
+            region=region, credential_resolver=credential_resolver
+        )
+        self.language_code = language_code
+        self.sample_rate = sample_rate
+        self.stream = None
+
+    async def start(self):
+        self.stream = await self.client.start_stream_transcription(
+            language_code=self.language_code,
+            media_sample_rate_hz=self.sample_rate,
+            media_encoding="pcm",
+            show_speaker_label=True,
+        )
+
+    async def feed(self, chunk):
+        await self.stream.input_stream.send_audio_event(audio_chunk=chunk)
+
+    async def end(self):
+        await self.stream.input_stream.end_stream()
+
+    async def results(self):
+        async for event in self.stream.output_stream:
+            for result in event.transcript.results:
+                if not result.alternatives:
+                    continue
+                alternative = result.alternatives[0]
+                speaker = 1
+                for item in alternative.items or []:
+                    if getattr(item, "speaker", None) is not None:
+                        try:
+                            speaker = int(item.speaker) + 1
+                        except ValueError:
+                            pass
+                        break
+                yield {
+                    "type": "partial" if result.is_partial else "final",
+                    "speaker": speaker,
+                    "start": result.start_time,
+                    "end": result.end_time,
+                    "text": alternative.transcript,
+                }
+
+
+# 수신한 오디오 프레임을 인식과 병렬로 보관
+class AudioArchiver:
+    # max_inflight_parts: 동시에 올리는 파트 수, 가득 차면 write가 자리가 날 때까지 대기
+    def __init__(self, storage, key, part_size=S3_MIN_PART_SIZE, max_inflight_parts=2):
+        self.storage = storage
+        self.key = key
+        self.part_size = part_size
+        self.slots = asyncio.Semaphore(max_inflight_parts)
+        self.buffer = bytearray()
+        self.tasks = []
+        self.upload_id = None
+        self.size = 0
+
+    async def open(self):
+        self.upload_id = await asyncio.to_thread(self.storage.start_multipart, self.key)
+
+    async def _upload_part(self, part_number, data):
+        try:
+            return await asyncio.to_thread(
+                self.storage.upload_part, self.key, self.upload_id, part_number, data
+            )
+        finally:
+            self.slots.release()
+
+    async def _schedule_part(self):
+        await self.slots.acquire()
+        part_number = len(self.tasks) + 1
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        self.tasks.append(asyncio.ensure_future(self._upload_part(part_number, data)))
+
+    async def write(self, chunk):
+        self.size += len(chunk)
+        self.buffer += chunk
+        if len(self.buffer) >= self.part_size:
+            await self._schedule_part()
+
+    async def close(self):
+        if self.buffer or not self.tasks:
+            await self._schedule_part()
+        parts = await asyncio.gather(*self.tasks)
+        return await asyncio.to_thread(
+            self.storage.complete_multipart, self.key, self.upload_id, list(parts)
+        )
+
+    async def abort(self):
+        if self.upload_id:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+            try:
+                await asyncio.to_thread(self.storage.abort_multipart, self.key, self.upload_id)
+            except Exception as e:
+                logger.warning(f"Failed to abort multipart upload {self.key}: {str(e)}")
@@ -0,0 +1,387 @@
+import argparse
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# 작업(job_id) 단위 추적: 업로드 -> 상태 조회(여러 번) -> 파이프라인 -> 요약을 하나의 trace로 연결
+# - trace_id는 job_id에서 결정적으로 만듦 (요청/프로세스가 달라도 같은 작업이면 같은 trace)
+# - 현재 span은 contextvars로 전달 (asyncio.to_thread도 컨텍스트를 복사하므로 스레드의 boto3 호출까지 이어짐)
+# - 요청(또는 파이프라인 작업) 하나의 span을 모아 두었다가 끝날 때 exporter로 내보냄
+#   job_id를 나중에 알게 되는 요청(업로드)은 bind_job()을 호출하면 그 요청의 span 전체가 job trace로 옮겨짐
+# - exporter가 없으면 span()은 아무 것도 하지 않음
+#
+# 한 작업의 경로 보기: python tracing.py test/traces.jsonl --job <job_id>
+
+logger = logging.getLogger(__name__)
+
+
+def trace_id_for_job(job_id):
+    return hashlib.sha1(f"job:{job_id}".encode("utf-8")).hexdigest()[:32]
+
+
+def new_id(length=16):
+    return uuid.uuid4().hex[:length]
+
+
+class Span:
+    __slots__ = ("span_id", "parent_id", "name", "start", "started", "duration", "attributes", "error")
+
+    def __init__(self, name, parent_id=None, attributes=None):
+        self.span_id = new_id()
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.time()
+        self.started = time.perf_counter()
+        self.duration = None
+        self.attributes = attributes or {}
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def finish(self, error=None):
+        if self.duration is None:
+            self.duration = time.perf_counter() - self.started
+            if error is not None:
+                self.error = error if isinstance(error, str) else f"{type(error).__name__}: {error}"
+
+    def to_dict(self, trace_id):
+        return {
+            "trace_id": trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_ms": round((self.duration or 0.0) * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+# 요청 하나에서 나온 span 모음 (스레드에서도 추가되므로 잠금 사용)
+class TraceBuffer:
+    def __init__(self, trace_id=None, job_id=None):
+        self.trace_id = trace_id or new_id(32)
+        self.job_id = job_id
+        self.spans = []
+        self.lock = threading.Lock()
+
+    def add(self, span):
+        with self.lock:
+            self.spans.append(span)
+
+
+# (TraceBuffer, 현재 span)
+_current = contextvars.ContextVar("globanote_trace", default=None)
+
+
+class NullSpan:
+    def set(self, **attributes):
+        pass
+
+    def finish(self, error=None):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class ConsoleExporter:
+    def export(self, trace_id, spans):
+        children = {}
+        for span in spans:
+            children.setdefault(span.parent_id, []).append(span)
+        ids = {span.span_id for span in spans}
+        lines = []
+
+        def walk(span, depth):
+            error = f" ERROR {span.error}" if span.error else ""
+            lines.append(f"{'  ' * depth}{span.name} {(span.duration or 0) * 1000:.1f}ms{error}")
+            for child in sorted(children.get(span.span_id, []), key=lambda s: s.started):
+                walk(child, depth + 1)
+
+        for root in sorted((s for s in spans if s.parent_id not in ids), key=lambda s: s.started):
+            walk(root, 0)
+        logger.info(f"trace {trace_id}\n" + "\n".join(lines))
+
+
+# span 하나당 JSON 한 줄
+class FileExporter:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def export(self, trace_id, spans):
+        data = "".join(json.dumps(span.to_dict(trace_id), ensure_ascii=False) + "\n" for span in spans)
+        with self.lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+
+
+class Tracer:
+    def __init__(self, exporters=()):
+        self.exporters = list(exporters)
+
+    @property
+    def enabled(self):
+        return bool(self.exporters)
+
+    # 요청/파이프라인 작업의 루트 span: 끝나면 모인 span을 내보냄
+    # ignore: 정상 흐름에서 쓰는 예외(예: 재시도 요청)는 오류 대신 outcome으로 기록
+    @contextmanager
+    def request(self, name, job_id=None, ignore=(), **attributes):
+        if not self.enabled:
+            yield NULL_SPAN
+            return
+        buffer = TraceBuffer(trace_id_for_job(job_id) if job_id else None, job_id)
+        root = Span(name, attributes=attributes)
+        if job_id:
+            root.set(job_id=job_id)
+        buffer.add(root)
+        token = _current.set((buffer, root))
+        error = None
+        try:
+            yield root
+        except ignore as e:
+            root.set(outcome=type(e).__name__)
+            raise
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current.reset(token)
+            root.finish(error)
+            self.export(buffer)
+
+    # 현재 요청 안의 하위 span (요청 밖이면 단독 trace로 내보냄)
+    @contextmanager
+    def span(self, name, ignore=(), **attributes):
+        current = _current.get()
+        if current is None:
+            if not self.enabled:
+                yield NULL_SPAN
+            else:
+                with self.request(name, ignore=ignore, **attributes) as span:
+                    yield span
+            return
+        buffer, parent = current
+        span = Span(name, parent.span_id, attributes)
+        buffer.add(span)
+        token = _current.set((buffer, span))
+        error = None
+        try:
+            yield span
+        except ignore as e:
+            span.set(outcome=type(e).__name__)
+            raise
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current.reset(token)
+            span.finish(error)
+
+    # 현재 span을 부모로 하는 span 시작 (with로 감쌀 수 없는 이벤트 훅용, finish()로 종료)
+    def start_span(self, name, **attributes):
+        current = _current.get()
+        if current is None:
+            return NULL_SPAN
+        buffer, parent = current
+        span = Span(name, parent.span_id, attributes)
+        buffer.add(span)
+        return span
+
+    # 현재 span에 속성 추가 (토큰 수 등)
+    def annotate(self, **attributes):
+        current = _current.get()
+        if current is not None:
+            current[1].set(**attributes)
+
+    # 현재 요청을 job trace에 연결
+    def bind_job(self, job_id):
+        current = _current.get()
+        if current is None or not job_id:
+            return
+        buffer, _ = current
+        if buffer.job_id is None:
+            buffer.job_id = job_id
+            buffer.trace_id = trace_id_for_job(job_id)
+            buffer.spans[0].set(job_id=job_id)
+
+    def export(self, buffer):
+        for exporter in self.exporters:
+            try:
+                exporter.export(buffer.trace_id, buffer.spans)
+            except Exception as e:
+                logger.warning(f"Trace export failed ({type(exporter).__name__}): {e}")
+
+
+# TRACE_EXPORTER: "none" | "console" | "file" | "console,file"
+def create_tracer(exporter_names, file_path):
+    exporters = []
+    for name in (n.strip().lower() for n in exporter_names.split(",")):
+        if name == "console":
+            exporters.append(ConsoleExporter())
+        elif name == "file":
+            exporters.append(FileExporter(file_path))
+        elif name not in ("", "none"):
+            logger.warning(f"Unknown trace exporter: {name}")
+    return Tracer(exporters)
+
+
+# 객체의 메서드 호출마다 span (저장소, Transcribe 클라이언트)
+class TracedProxy:
+    def __init__(self, target, tracer, prefix, ignore=()):
+        self._target = target
+        self._tracer = tracer
+        self._prefix = prefix
+        self._ignore = ignore
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if not callable(value) or name.startswith("_") or not self._tracer.enabled:
+            return value
+
+        def call(*args, **kwargs):
+            with self._tracer.span(f"{self._prefix}.{name}", ignore=self._ignore):
+                return value(*args, **kwargs)
+
+        return call
+
+
+# boto3 클라이언트의 API 호출마다 span (재시도 포함 호출 단위)
+def trace_boto_client(client, tracer):
+    if not tracer.enabled:
+        return client
+    service = client.meta.service_model.service_name
+
+    def before_call(model, context, **kwargs):
+        context["trace_span"] = tracer.start_span(f"aws.{service}.{model.name}")
+
+    def after_call(context, http_response=None, **kwargs):
+        span = context.pop("trace_span", None)
+        if span:
+            status = getattr(http_response, "status_code", None)
+            span.set(http_status=status)
+            span.finish(f"HTTP {status}" if status and status >= 300 else None)
+
+    def after_call_error(context, exception=None, **kwargs):
+        span = context.pop("trace_span", None)
+        if span:
+            span.finish(exception or "error")
+
+    client.meta.events.register("before-call", before_call)
+    client.meta.events.register("after-call", after_call)
+    client.meta.events.register("after-call-error", after_call_error)
+    return client
+
+
+# HTTP 요청마다 루트 span (경로 템플릿 이름, path의 job_id로 job trace 연결)
+class TracingMiddleware:
+    def __init__(self, app, tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        with self.tracer.request(f"{scope['method']} {scope['path']}") as root:
+
+            async def traced_send(message):
+                if message["type"] == "http.response.start":
+                    root.set(http_status=message["status"])
+                await send(message)
+
+            try:
+                await self.app(scope, receive, traced_send)
+            finally:
+                route = scope.get("route")
+                if route is not None and getattr(route, "path", None):
+                    root.name = f"{scope['method']} {route.path}"
+                job_id = scope.get("path_params", {}).get("job_id")
+                if job_id:
+                    self.tracer.bind_job(job_id)
+
+
+# ---- 파일 exporter 결과 분석 ----
+def load_trace(path, trace_id):
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            span = json.loads(line)
+            if span["trace_id"] == trace_id:
+                spans.append(span)
+    return sorted(spans, key=lambda s: s["start"])
+
+
+# 작업의 경과 시간 분해: 요청/작업별 시간, 그 사이 대기(외부 처리, 폴링 간격)
+def critical_path(spans):
+    ids = {s["span_id"] for s in spans}
+    roots = [s for s in spans if s["parent_id"] not in ids]
+    begin = roots[0]["start"]
+    end = max(s["start"] + s["duration_ms"] / 1000 for s in roots)
+    busy = []
+    cursor = begin
+    for root in roots:
+        root_end = root["start"] + root["duration_ms"] / 1000
+        if root_end <= cursor:
+            continue
+        busy.append((max(root["start"], cursor), root_end, root))
+        cursor = root_end
+    idle = (end - begin) - sum(e - s for s, e, _ in busy)
+    return begin, end, busy, idle
+
+
+def print_trace(spans):
+    children = {}
+    for span in spans:
+        children.setdefault(span["parent_id"], []).append(span)
+    ids = {s["span_id"] for s in spans}
+    begin, end, busy, idle = critical_path(spans)
+
+    def walk(span, depth):
+        error = f"  ERROR {span['error']}" if span["error"] else ""
+        offset = span["start"] - begin
+        print(f"{offset:10.3f}s {span['duration_ms']:10.1f}ms  {'  ' * depth}{span['name']}{error}")
+        for child in children.get(span["span_id"], []):
+            walk(child, depth + 1)
+
+    print(f"{'offset':>11} {'duration':>12}  span")
+    for root in (s for s in spans if s["parent_id"] not in ids):
+        walk(root, 0)
+
+    # 가장 오래 걸린 하위 작업 (self time 기준)
+    self_ms = {}
+    for span in spans:
+        own = span["duration_ms"] - sum(c["duration_ms"] for c in children.get(span["span_id"], []))
+        self_ms[span["name"]] = self_ms.get(span["name"], 0.0) + max(own, 0.0)
+    wall = end - begin
+    print(f"\nwall clock {wall:.3f}s: busy {wall - idle:.3f}s in {len(busy)} request(s), idle/waiting {idle:.3f}s")
+    print("top self time:")
+    for name, ms in sorted(self_ms.items(), key=lambda kv: -kv[1])[:10]:
+        print(f"  {ms:10.1f}ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the spans recorded for one job")
+    parser.add_argument("path", help="trace file written by the file exporter")
+    parser.add_argument("--job", help="job_id")
+    parser.add_argument("--trace", help="trace_id (instead of --job)")
+    args = parser.parse_args()
+    if not args.job and not args.trace:
+        parser.error("--job or --trace is required")
+    spans = load_trace(args.path, args.trace or trace_id_for_job(args.job))
+    if not spans:
+        raise SystemExit("no spans found")
+    print_trace(spans)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import bisect
+
+# Transcribe 결과 JSON -> 발화(turn) 목록 / 화면용 트랜스크립트 변환
+
+
+# 시간 포맷 (00:00~00:03)
+def sec2str(sec):
+    m, s = divmod(int(sec), 60)
+    return f"{m:02}:{s:02}"
+
+
+def speaker_number(speaker_label):
+    # spk_0 -> 1
+    spk_num = 1
+    if speaker_label.startswith("spk_"):
+        try:
+            spk_num = int(speaker_label.split("_")[1]) + 1
+        except:
+            pass
+    return spk_num
+
+
+# 발화 단위 목록 생성: {"speaker", "start", "end", "text"}
+def build_turns(transcript_data):
+    results = transcript_data["results"]
+    items = results.get("items", [])
+
+    if "speaker_labels" not in results:
+        # 화자 구분이 없으면 문장부호 기준으로 발화를 나눔
+        turns = []
+        words = []
+        start_time = end_time = None
+        for item in items:
+            content = item["alternatives"][0]["content"]
+            if "start_time" in item and "end_time" in item:
+                if start_time is None:
+                    start_time = float(item["start_time"])
+                end_time = float(item["end_time"])
+                words.append(content)
+            elif words:
+                words[-1] += content
+                if content in (".", "?", "!"):
+                    turns.append({"speaker": None, "start": start_time, "end": end_time, "text": " ".join(words)})
+                    words = []
+                    start_time = None
+        if words:
+            turns.append({"speaker": None, "start": start_time, "end": end_time, "text": " ".join(words)})
+        return turns
+
+    segments = results["speaker_labels"]["segments"]
+
+    # 각 segment(발화 단위)별로 시간순 정렬
+    turns = []
+    for segment in segments:
+        start_time = float(segment["start_time"])
+        end_time = float(segment["end_time"])
+        # 해당 segment의 단어 추출
+        segment_items = [
+            item for item in items
+            if "start_time" in item and "end_time" in item
+            and float(item["start_time"]) >= start_time
+            and float(item["end_time"]) <= end_time
+        ]
+        segment_text = " ".join(
+            [item["alternatives"][0]["content"] for item in segment_items]
+        )
+        if segment_text.strip():
+            turns.append({
+                "speaker": speaker_number(segment["speaker_label"]),
+                "start": start_time,
+                "end": end_time,
+                "text": segment_text,
+            })
+    return turns
+
+
+def render_turn(turn):
+    time_str = f"{sec2str(turn['start'])}~{sec2str(turn['end'])}"
+    if turn["speaker"] is None:
+        return f"({time_str}) {turn['text']}"
+    return f"[화자{turn['speaker']}] ({time_str}) {turn['text']}"
+
+
+# 시간순 대화 흐름 트랜스크립트 생성
+def format_transcript(transcript_data, turns=None):
+    if "speaker_labels" not in transcript_data["results"]:
+        return transcript_data["results"]["transcripts"][0]["transcript"]
+    if turns is None:
+        turns = build_turns(transcript_data)
+    return "\n".join(render_turn(turn) for turn in turns)
+
+
+# 발화 텍스트 파일(줄 단위) + 바이트 오프셋 인덱스 생성
+# 인덱스는 컬럼형 배열로 저장해 크기를 줄이고 bisect 검색에 바로 사용
+def build_segment_index(turns):
+    index = {"offset": [], "length": [], "speaker": [], "start_ms": [], "end_ms": []}
+    chunks = []
+    offset = 0
+    for turn in turns:
+        data = (turn["text"] + "\n").encode("utf-8")
+        index["offset"].append(offset)
+        index["length"].append(len(data))
+        index["speaker"].append(turn["speaker"])
+        index["start_ms"].append(int(round(turn["start"] * 1000)))
+        index["end_ms"].append(int(round(turn["end"] * 1000)))
+        chunks.append(data)
+        offset += len(data)
+    return b"".join(chunks), index
+
+
+# 요청 범위에 해당하는 발화 구간 [first, last) 계산
+def select_turn_range(
+    index, start_ms=None, end_ms=None, turn_start=None, turn_end=None, last=None
+):
+    total = len(index["offset"])
+    first, stop = 0, total
+    if start_ms is not None:
+        # start_ms 이후에 끝나는 첫 발화
+        first = bisect.bisect_right(index["end_ms"], start_ms)
+    if end_ms is not None:
+        # end_ms 이전에 시작하는 마지막 발화까지
+        stop = bisect.bisect_left(index["start_ms"], end_ms)
+    if turn_start is not None:
+        first = max(first, turn_start)
+    if turn_end is not None:
+        stop = min(stop, turn_end)
+    if last is not None:
+        first = max(first, stop - last)
+    return min(first, total), max(min(stop, total), 0)
+
+
+# 인덱스 구간 + 해당 바이트 범위의 텍스트 -> 발화 목록
+def slice_turns(index, first, stop, data):
+    base = index["offset"][first] if first < stop else 0
+    turns = []
+    for i in range(first, stop):
+        start = index["offset"][i] - base
+        text = data[start:start + index["length"][i]].decode("utf-8").rstrip("\n")
+        turns.append({
+            "turn": i,
+            "speaker": index["speaker"][i],
+            "start": index["start_ms"][i] / 1000,
+            "end": index["end_ms"][i] / 1000,
+            "text": text,
+        })
+    return turns
@@ -0,0 +1,153 @@
+import os
+import tempfile
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from audio_probe import PROBE_BYTES, probe_header
+
+# multipart 업로드를 스트리밍으로 받아 임시 파일에 기록
+# 파일 파트의 첫 PROBE_BYTES가 모이면 바로 헤더를 검사해 잘못된 입력은 본문을 다 받기 전에 거절
+# - Content-Length는 multipart 본문 전체 길이라 파일 크기로 쓰지 않음: 검증은 크기 없이 하고,
+#   파일 파트를 다 받은 뒤 실제 크기로 다시 프로브해 비트레이트 기반 길이를 채움
+# - max_bytes: 실제로 받은 본문 바이트 기준 한도 (chunked 본문처럼 Content-Length가 없어도 적용)
+# - on_bytes(received): 청크를 받을 때마다 지금까지 받은 본문 바이트 수로 호출 (입장 제어 계산용)
+
+
+class UploadRejected(Exception):
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+class StreamedUpload:
+    def __init__(self, file_field, validate, temp_dir=None):
+        self.file_field = file_field
+        self.validate = validate
+        self.temp_dir = temp_dir
+        self.fields = {}
+        self.filename = None
+        self.temp_path = None
+        self.size = 0
+        self.probe = None
+        self.error = None
+        self._file = None
+        self._header = bytearray()
+        self._probed_header = None
+        self._name = None
+        self._value = bytearray()
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._headers = {}
+
+    # --- MultipartParser 콜백 ---
+    def on_part_begin(self):
+        self._headers = {}
+        self._name = None
+        self._value = bytearray()
+
+    def on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[bytes(self._header_field).lower()] = bytes(self._header_value)
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._name = options.get(b"name", b"").decode("utf-8")
+        if self._name == self.file_field:
+            # 파일 파트는 하나만 허용 (앞 임시 파일은 거절 후 discard에서 삭제)
+            if self.temp_path is not None:
+                self.error = UploadRejected(400, f"Only one {self.file_field} part is allowed")
+                self._name = None
+                return
+            self.filename = options.get(b"filename", b"").decode("utf-8")
+            suffix = os.path.splitext(self.filename)[1]
+            self._file = tempfile.NamedTemporaryFile(
+                delete=False, suffix=suffix, dir=self.temp_dir
+            )
+            self.temp_path = self._file.name
+
+    def on_part_data(self, data, start, end):
+        if self.error:
+            return
+        chunk = data[start:end]
+        if self._file is None:
+            self._value += chunk
+            return
+        self._file.write(chunk)
+        self.size += len(chunk)
+        if self.probe is None:
+            self._header += chunk
+            if len(self._header) >= PROBE_BYTES:
+                self._check_header()
+
+    def on_part_end(self):
+        if self._file is not None:
+            if self.probe is None and not self.error:
+                self._check_header()
+            if not self.error and self.probe.get("duration") is None:
+                self.probe = probe_header(self._probed_header, self.size)
+            self._file.close()
+            self._file = None
+        elif self._name:
+            self.fields[self._name] = self._value.decode("utf-8")
+
+    def _check_header(self):
+        self._probed_header = bytes(self._header[:PROBE_BYTES])
+        self.probe = probe_header(self._probed_header)
+        self._header = bytearray()
+        try:
+            self.validate(self.filename, self.probe)
+        except UploadRejected as e:
+            self.error = e
+
+    def callbacks(self):
+        return {
+            name: getattr(self, name)
+            for name in (
+                "on_part_begin", "on_header_field", "on_header_value", "on_header_end",
+                "on_headers_finished", "on_part_data", "on_part_end",
+            )
+        }
+
+    def discard(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.temp_path and os.path.exists(self.temp_path):
+            os.unlink(self.temp_path)
+
+
+# validate(filename, probe)는 거절 시 UploadRejected를 발생
+# temp_dir: 임시 파일 위치 (로컬 저장소면 같은 파일시스템에 두어 복사 없이 이동)
+async def receive_upload(request, file_field, validate, temp_dir=None, max_bytes=None, on_bytes=None):
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in options:
+        raise UploadRejected(400, "multipart/form-data body is required")
+    upload = StreamedUpload(file_field, validate, temp_dir)
+    parser = MultipartParser(options[b"boundary"], upload.callbacks())
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if max_bytes and received > max_bytes:
+                raise UploadRejected(413, f"Request body exceeds {max_bytes} bytes")
+            if on_bytes:
+                on_bytes(received)
+            parser.write(chunk)
+            if upload.error:
+                raise upload.error
+        parser.finalize()
+        if upload.error:
+            raise upload.error
+        if upload.temp_path is None:
+            raise UploadRejected(400, f"{file_field} is required")
+    except Exception:
+        upload.discard()
+        raise
+    return upload
@@ -0,0 +1,188 @@
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from decimal import Decimal
+
+# 사용량 집계 (Bedrock 토큰/임베딩, Transcribe 오디오 길이)
+# - 호출마다 메모리에서 (user_id, 날짜(UTC), model) 키로 합산만 하고
+#   flush_interval마다 키 하나당 update_item 한 번(ADD, 원자적 증가)으로 기록
+# - 기록에 실패한 키는 다시 합쳐 두었다가 다음 flush에서 재시도
+# - 종료 시 남은 값 flush
+#
+# 테이블 항목: user_id(HASH), usage_key(RANGE, "YYYY-MM-DD#model"),
+#             day, model, calls, jobs, inputTokens, outputTokens, audioSeconds, updatedAt
+
+logger = logging.getLogger(__name__)
+
+ANONYMOUS_USER = "anonymous"
+TRANSCRIBE_MODEL = "transcribe"
+TRANSCRIBE_STREAMING_MODEL = "transcribe-streaming"
+
+# user_id를 인자로 넘기기 어려운 호출(임베딩은 VectorIndex 안에서 호출)의 사용자
+# asyncio.to_thread는 컨텍스트를 복사하므로 엔드포인트에서 설정하면 스레드까지 전달됨
+current_user = contextvars.ContextVar("globanote_usage_user", default=ANONYMOUS_USER)
+
+
+@contextmanager
+def usage_user(user_id):
+    token = current_user.set(user_id or ANONYMOUS_USER)
+    try:
+        yield
+    finally:
+        current_user.reset(token)
+
+# 집계 이름 -> 테이블 속성 이름
+FIELDS = {
+    "calls": "calls",
+    "jobs": "jobs",
+    "input_tokens": "inputTokens",
+    "output_tokens": "outputTokens",
+    "audio_seconds": "audioSeconds",
+}
+
+
+def usage_day(timestamp=None):
+    return datetime.fromtimestamp(timestamp or time.time(), timezone.utc).strftime("%Y-%m-%d")
+
+
+def usage_key(day, model):
+    return f"{day}#{model}"
+
+
+def to_dynamodb_number(value):
+    if isinstance(value, float):
+        return Decimal(str(round(value, 3)))
+    return value
+
+
+class UsageAccumulator:
+    def __init__(self, write=None, flush_interval=60.0):
+        self.write = write
+        self.flush_interval = flush_interval
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.flushed_items = 0
+        self.failed_items = 0
+
+    def add(self, user_id, model, **amounts):
+        key = (user_id or ANONYMOUS_USER, usage_day(), model)
+        with self.lock:
+            counter = self.pending.setdefault(key, Counter())
+            for name, value in amounts.items():
+                if value:
+                    counter[name] += value
+
+    def drain(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        return pending
+
+    def restore(self, key, amounts):
+        with self.lock:
+            self.pending.setdefault(key, Counter()).update(amounts)
+
+    # 한 번에 하나의 flush만 실행 (주기 flush와 종료 시 flush가 겹치지 않도록)
+    def flush(self):
+        if self.write is None:
+            return 0
+        with self.flush_lock:
+            written = 0
+            for key, amounts in self.drain().items():
+                if not amounts:
+                    continue
+                try:
+                    self.write(key, amounts)
+                    written += 1
+                except Exception as e:
+                    self.failed_items += 1
+                    logger.warning(f"Usage flush failed for {key}: {str(e)}")
+                    self.restore(key, amounts)
+            self.flushed_items += written
+            return written
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await asyncio.to_thread(self.flush)
+
+    # 아직 기록되지 않은 값 (조회 응답에 더함)
+    def pending_for(self, user_id, prefix=""):
+        with self.lock:
+            return {
+                (day, model): dict(amounts)
+                for (user, day, model), amounts in self.pending.items()
+                if user == user_id and day.startswith(prefix)
+            }
+
+    def stats(self):
+        with self.lock:
+            pending = len(self.pending)
+        return {
+            "pending_items": pending,
+            "flushed_items": self.flushed_items,
+            "failed_items": self.failed_items,
+            "flush_interval": self.flush_interval,
+        }
+
+
+# update_item 한 번으로 모든 값을 ADD (항목이 없으면 생성)
+def write_usage_item(table, key, amounts):
+    user_id, day, model = key
+    names = {"#day": "day", "#model": "model", "#updated": "updatedAt"}
+    values = {":day": day, ":model": model, ":updated": datetime.now(timezone.utc).isoformat()}
+    adds = []
+    for i, (name, value) in enumerate(sorted(amounts.items())):
+        names[f"#a{i}"] = FIELDS[name]
+        values[f":a{i}"] = to_dynamodb_number(value)
+        adds.append(f"#a{i} :a{i}")
+    table.update_item(
+        Key={"user_id": user_id, "usage_key": usage_key(day, model)},
+        UpdateExpression="ADD " + ", ".join(adds) + " SET #day = :day, #model = :model, #updated = :updated",
+        ExpressionAttributeNames=names,
+        ExpressionAttributeValues=values,
+    )
+
+
+# 테이블 항목 + 미기록 값 -> 일별/모델별 행과 모델별 합계 (prices가 있으면 예상 비용)
+# prices: {"model": {"input_per_1k_tokens": .., "output_per_1k_tokens": .., "per_audio_minute": ..}}
+def summarize_usage(items, pending, prices=None):
+    rows = {}
+    for item in items:
+        day, model = item["day"], item["model"]
+        rows[(day, model)] = Counter({
+            name: float(item[attr]) for name, attr in FIELDS.items() if attr in item
+        })
+    for key, amounts in pending.items():
+        rows.setdefault(key, Counter()).update(amounts)
+
+    totals = {}
+    for (day, model), amounts in rows.items():
+        totals.setdefault(model, Counter()).update(amounts)
+    result = {
+        "days": [
+            dict({"day": day, "model": model}, **{k: round(v, 3) for k, v in amounts.items()})
+            for (day, model), amounts in sorted(rows.items())
+        ],
+        "totals": {model: {k: round(v, 3) for k, v in amounts.items()} for model, amounts in totals.items()},
+    }
+    if prices:
+        cost = {}
+        for model, amounts in totals.items():
+            price = prices.get(model)
+            if not price:
+                continue
+            cost[model] = round(
+                amounts["input_tokens"] / 1000 * price.get("input_per_1k_tokens", 0)
+                + amounts["output_tokens"] / 1000 * price.get("output_per_1k_tokens", 0)
+                + amounts["audio_seconds"] / 60 * price.get("per_audio_minute", 0),
+                6,
+            )
+        result["estimated_cost"] = cost
+        result["estimated_total"] = round(sum(cost.values()), 6)
+    return result
@@ -0,0 +1,258 @@
+import bisect
+import os
+import subprocess
+import tempfile
+import wave
+import numpy as np
+
+# 에너지 기반 음성 구간 검출(VAD) / 긴 무음 압축
+# - 오디오는 블록 단위로 읽어(파일 전체를 메모리에 올리지 않음) 프레임 단위 RMS(dB)만 누적,
+#   노이즈 바닥 + 여유값으로 음성 판정
+# - 남길 구간을 정한 뒤 다시 블록 단위로 읽으며 해당 구간만 출력 파일에 씀
+#   (wav가 아니면 1차에서 ffmpeg로 디코딩한 mono PCM을 임시 파일에 두고 2차에서 재사용)
+# - min_silence 이상 무음은 keep_silence 길이만 남기고 제거
+# - offset map([[trimmed_start, original_start], ...])으로 트랜스크립트 시간을 원본 기준으로 되돌림
+
+
+BLOCK_SECONDS = 10
+
+
+# 16비트 PCM wav면 원본 샘플레이트 그대로, 아니면 ffmpeg로 sample_rate mono 디코딩
+def wav_format(path):
+    if not path.lower().endswith(".wav"):
+        return None
+    try:
+        with wave.open(path, "rb") as wav:
+            if wav.getsampwidth() == 2:
+                return wav.getframerate(), wav.getnchannels()
+    except wave.Error:
+        pass
+    return None
+
+
+# wav -> int16 mono 블록 (다채널은 블록마다 int32로 평균)
+def wav_blocks(path, block_seconds=BLOCK_SECONDS):
+    with wave.open(path, "rb") as wav:
+        channels = wav.getnchannels()
+        block_frames = int(wav.getframerate() * block_seconds)
+        while True:
+            data = wav.readframes(block_frames)
+            if not data:
+                return
+            samples = np.frombuffer(data, dtype=np.int16)
+            if channels > 1:
+                samples = (samples.reshape(-1, channels).astype(np.int32).sum(axis=1) // channels).astype(np.int16)
+            yield samples
+
+
+def ffmpeg_blocks(path, sample_rate, block_seconds=BLOCK_SECONDS):
+    process = subprocess.Popen(
+        ["ffmpeg", "-v", "error", "-i", path, "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "-"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    block_bytes = int(sample_rate * block_seconds) * 2
+    try:
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data:
+                break
+            yield np.frombuffer(data[:len(data) // 2 * 2], dtype=np.int16)
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        if process.wait() != 0:
+            raise subprocess.CalledProcessError(process.returncode, "ffmpeg", stderr=stderr)
+
+
+def raw_blocks(path, sample_rate, block_seconds=BLOCK_SECONDS):
+    block_bytes = int(sample_rate * block_seconds) * 2
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(block_bytes)
+            if not data:
+                return
+            yield np.frombuffer(data, dtype=np.int16)
+
+
+# 블록 스트림 -> 프레임별 dB (블록 경계에 걸친 샘플은 다음 블록으로 넘김)
+class FrameEnergy:
+    def __init__(self, sample_rate, frame_ms=30):
+        self.frame = max(1, int(sample_rate * frame_ms / 1000))
+        self.carry = np.zeros(0, dtype=np.int16)
+        self.db = []
+        self.total_samples = 0
+
+    def add(self, samples):
+        self.total_samples += len(samples)
+        if len(self.carry):
+            samples = np.concatenate([self.carry, samples])
+        n_frames = len(samples) // self.frame
+        frames = samples[:n_frames * self.frame].astype(np.float32).reshape(n_frames, self.frame)
+        rms = np.sqrt(np.mean(frames * frames, axis=1)) + 1e-9
+        self.db.append(20 * np.log10(rms / 32768.0))
+        self.carry = samples[n_frames * self.frame:].copy()
+
+    def result(self):
+        return np.concatenate(self.db) if self.db else np.zeros(0, dtype=np.float32)
+
+
+# 프레임별 음성 여부 (hangover만큼 앞뒤로 확장)
+def detect_speech(db, frame_ms=30, margin_db=12, min_threshold_db=-60, hangover_ms=300):
+    if len(db) == 0:
+        return np.ones(1, dtype=bool)
+    # 하위 10% 프레임을 노이즈 바닥으로 추정
+    threshold = max(np.percentile(db, 10) + margin_db, min_threshold_db)
+    speech = db > threshold
+    k = max(1, hangover_ms // frame_ms)
+    return np.convolve(speech.astype(np.int32), np.ones(2 * k + 1, dtype=np.int32), mode="same") > 0
+
+
+# 남길 원본 샘플 구간 [(start, end), ...]
+def plan_keep_ranges(speech, frame, total_samples, sample_rate, min_silence=2.0, keep_silence=0.5):
+    padded = np.concatenate([[1], speech.astype(np.int8), [1]])
+    edges = np.diff(padded)
+    silence_starts = np.flatnonzero(edges == -1)
+    silence_ends = np.flatnonzero(edges == 1)
+    long_runs = (silence_ends - silence_starts) * frame >= min_silence * sample_rate
+    half_keep = int(keep_silence * sample_rate / 2)
+
+    ranges = []
+    cursor = 0
+    for start, end in zip(silence_starts[long_runs] * frame, silence_ends[long_runs] * frame):
+        end = min(end, total_samples)
+        cut_start, cut_end = start + half_keep, end - half_keep
+        if cut_end <= cut_start:
+            continue
+        if cut_start > cursor:
+            ranges.append((cursor, cut_start))
+        cursor = cut_end
+    if cursor < total_samples:
+        ranges.append((cursor, total_samples))
+    return ranges
+
+
+def offset_map_for(ranges, sample_rate):
+    if not ranges:
+        return [[0.0, 0.0]]
+    offset_map = []
+    trimmed_pos = 0
+    for start, end in ranges:
+        offset_map.append([float(trimmed_pos / sample_rate), float(start / sample_rate)])
+        trimmed_pos += end - start
+    return offset_map
+
+
+# 블록 스트림에서 ranges에 속한 샘플만 골라 writer로 전달
+def copy_ranges(blocks, ranges, write):
+    position = 0
+    i = 0
+    for samples in blocks:
+        block_end = position + len(samples)
+        while i < len(ranges) and ranges[i][0] < block_end:
+            start, end = ranges[i]
+            write(samples[max(start - position, 0):min(end, block_end) - position])
+            if end > block_end:
+                break
+            i += 1
+        position = block_end
+
+
+# mono int16 출력 (wav는 직접, 그 외 형식은 ffmpeg 인코딩)
+class AudioWriter:
+    def __init__(self, path, sample_rate):
+        self.wav = None
+        self.process = None
+        if path.lower().endswith(".wav"):
+            self.wav = wave.open(path, "wb")
+            self.wav.setnchannels(1)
+            self.wav.setsampwidth(2)
+            self.wav.setframerate(sample_rate)
+        else:
+            self.process = subprocess.Popen(
+                ["ffmpeg", "-v", "error", "-y", "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "-", path],
+                stdin=subprocess.PIPE,
+            )
+
+    def write(self, samples):
+        data = samples.astype(np.int16, copy=False).tobytes()
+        if self.wav:
+            self.wav.writeframes(data)
+        else:
+            self.process.stdin.write(data)
+
+    def close(self):
+        if self.wav:
+            self.wav.close()
+            return
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise subprocess.CalledProcessError(self.process.returncode, "ffmpeg")
+
+
+# 긴 무음을 압축해 out_path에 저장 -> (offset map, 원본 길이(초), 결과 길이(초))
+def trim_silence_file(path, out_path, min_silence=2.0, keep_silence=0.5, sample_rate=16000, frame_ms=30):
+    fmt = wav_format(path)
+    spool = None
+    if fmt:
+        sample_rate = fmt[0]
+    try:
+        energy = FrameEnergy(sample_rate, frame_ms)
+        if fmt:
+            for samples in wav_blocks(path):
+                energy.add(samples)
+        else:
+            fd, spool = tempfile.mkstemp(suffix=".pcm", dir=os.path.dirname(out_path) or None)
+            with os.fdopen(fd, "wb") as f:
+                for samples in ffmpeg_blocks(path, sample_rate):
+                    energy.add(samples)
+                    f.write(samples.tobytes())
+
+        speech = detect_speech(energy.result(), frame_ms)
+        ranges = plan_keep_ranges(
+            speech, energy.frame, energy.total_samples, sample_rate, min_silence, keep_silence
+        )
+        writer = AudioWriter(out_path, sample_rate)
+        try:
+            blocks = wav_blocks(path) if fmt else raw_blocks(spool, sample_rate)
+            copy_ranges(blocks, ranges, writer.write)
+        finally:
+            writer.close()
+    finally:
+        if spool and os.path.exists(spool):
+            os.unlink(spool)
+    kept = sum(end - start for start, end in ranges)
+    return offset_map_for(ranges, sample_rate), energy.total_samples / sample_rate, kept / sample_rate
+
+
+# 잘라낸 오디오 기준 시간 -> 원본 녹음 기준 시간
+# 구간 경계에 걸린 종료 시각은 앞 구간에 속하도록 처리
+def to_original_time(offset_map, t, is_end=False, starts=None):
+    if starts is None:
+        starts = [entry[0] for entry in offset_map]
+    if is_end:
+        i = max(bisect.bisect_left(starts, t) - 1, 0)
+    else:
+        i = max(bisect.bisect_right(starts, t) - 1, 0)
+    return t - offset_map[i][0] + offset_map[i][1]
+
+
+def remap_transcript(transcript_data, offset_map):
+    results = transcript_data["results"]
+    starts = [entry[0] for entry in offset_map]
+
+    def remap(entry):
+        if "start_time" in entry:
+            start = to_original_time(offset_map, float(entry["start_time"]), starts=starts)
+            entry["start_time"] = f"{start:.3f}"
+        if "end_time" in entry:
+            end = to_original_time(offset_map, float(entry["end_time"]), True, starts)
+            entry["end_time"] = f"{end:.3f}"
+
+    for item in results.get("items", []):
+        remap(item)
+    for segment in results.get("speaker_labels", {}).get("segments", []):
+        remap(segment)
+        for item in segment.get("items", []):
+            remap(item)
+    return transcript_data
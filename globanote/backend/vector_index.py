@@ -0,0 +1,404 @@
+import os
+import re
+import json
+import hashlib
+import threading
+import logging
+import numpy as np
+
+from search_index import tokenize
+
+# 회의 챗봇용 트랜스크립트 청크 벡터 검색
+# - 화자 발화(turn) 경계로 청크를 나누고 임베딩을 (N, dim) float32 행렬에 저장
+# - 저장은 추가 전용: vectors.f32(행렬 raw 행) + chunks.jsonl(작업마다 한 줄, 청크 메타데이터)
+#   flush는 새 행/줄만 덧붙이고, 삭제(재색인)된 행이 많아지면 한 번에 다시 씀(compaction)
+# - 질의 여러 개를 블록 단위 행렬곱으로 코사인 top-k 검색 (mmap 행렬을 메모리로 복사하지 않음)
+# - 임베딩 모델(이름-차원)마다 하위 디렉터리를 따로 사용: 모델을 바꿨다 되돌려도 서로의 파일에
+#   다른 차원의 행을 덧붙이지 않고, 되돌리면 이전 색인을 그대로 씀
+
+logger = logging.getLogger(__name__)
+
+
+# 발화 경계를 유지하면서 max_chars 이하로 청크 생성
+def chunk_turns(turns, max_chars=1000):
+    chunks = []
+    current = []
+    size = 0
+    for turn in turns:
+        line = turn["text"] if turn["speaker"] is None else f"[화자{turn['speaker']}] {turn['text']}"
+        if current and size + len(line) > max_chars:
+            chunks.append(current)
+            current, size = [], 0
+        current.append((turn, line))
+        size += len(line) + 1
+    if current:
+        chunks.append(current)
+    return [
+        {
+            "start_ms": int(round(group[0][0]["start"] * 1000)),
+            "end_ms": int(round(group[-1][0]["end"] * 1000)),
+            "text": "\n".join(line for _, line in group),
+        }
+        for group in chunks
+    ]
+
+
+def normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+# 로컬 결정적 임베딩 (토큰 feature hashing), 테스트/오프라인용
+class HashingEmbedder:
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                h = int.from_bytes(hashlib.md5(token.encode("utf-8")).digest()[:8], "little")
+                matrix[row, h % self.dim] += 1.0 if (h >> 63) & 1 else -1.0
+        return normalize_rows(matrix)
+
+
+# Bedrock Titan 텍스트 임베딩
+# on_usage(model_id, calls, input_tokens): embed 호출마다 한 번 사용량 보고
+class BedrockEmbedder:
+    def __init__(self, client, model_id="amazon.titan-embed-text-v2:0", dim=512, on_usage=None):
+        self.client = client
+        self.model_id = model_id
+        self.dim = dim
+        self.on_usage = on_usage
+        self.name = f"{model_id}-{dim}"
+
+    def embed(self, texts):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        calls = input_tokens = 0
+        try:
+            for row, text in enumerate(texts):
+                response = self.client.invoke_model(
+                    modelId=self.model_id,
+                    body=json.dumps({"inputText": text, "dimensions": self.dim, "normalize": True}),
+                )
+                body = json.loads(response["body"].read())
+                matrix[row] = body["embedding"]
+                calls += 1
+                input_tokens += body.get("inputTextTokenCount", 0)
+        finally:
+            # 중간에 실패해도 이미 호출한 만큼은 보고
+            if self.on_usage and calls:
+                self.on_usage(self.model_id, calls, input_tokens)
+        return normalize_rows(matrix)
+
+
+# 임베딩 모델 이름 -> 하위 디렉터리 이름 (':' 등 파일 이름에 쓸 수 없는 문자 치환)
+def embedder_dir_name(name):
+    return re.sub(r"[^A-Za-z0-9._-]", "_", name)
+
+
+# 검색 시 한 번에 점수를 계산하는 행 수 (질의 수 x 행 수 점수 행렬 크기 제한)
+SEARCH_BLOCK_ROWS = 65536
+# mmap을 쓰지 않을 때 메모리에 유지하는 저장된 블록 수 상한
+MAX_MEMORY_BLOCKS = 32
+
+
+class VectorIndex:
+    def __init__(self, directory, embedder, mmap=False, save_rows=256, compact_ratio=0.5):
+        self.root = directory
+        self.directory = os.path.join(directory, embedder_dir_name(embedder.name))
+        self.embedder = embedder
+        self.mmap = mmap
+        self.save_rows = save_rows
+        self.compact_ratio = compact_ratio
+        self._lock = threading.RLock()
+        # 저장된 행렬 블록 (mmap이면 파일 전체 하나, 아니면 flush마다 하나씩 추가)
+        self.blocks = []
+        self.saved_rows = 0
+        self.pending = []  # 아직 저장되지 않은 (n, dim) 블록
+        self.pending_jobs = []  # 아직 저장되지 않은 chunks.jsonl 줄
+        # 행 번호 -> [job_id, chunk_no, start_ms, end_ms, text]
+        self.ids = []
+        self.alive = bytearray()
+        # job_id -> 내용 해시, job_id -> 행 번호 목록
+        self.jobs = {}
+        self.job_rows = {}
+        os.makedirs(self.directory, exist_ok=True)
+        self._move_root_index()
+        self.load()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    # 하위 디렉터리를 쓰기 전의 색인(디렉터리 최상위)은 만든 모델의 하위 디렉터리로 옮김
+    def _move_root_index(self):
+        for meta_name, files in (
+            ("meta.json", ("vectors.f32", "chunks.jsonl", "meta.json")),
+            ("ids.json", ("vectors.npy", "ids.json")),
+        ):
+            meta_path = os.path.join(self.root, meta_name)
+            if not os.path.exists(meta_path):
+                continue
+            with open(meta_path) as f:
+                name = json.load(f)["embedder"]
+            target = os.path.join(self.root, embedder_dir_name(name))
+            if os.path.exists(os.path.join(target, meta_name)):
+                logger.warning(f"Vector index already exists in {target}, leaving {meta_path}")
+                continue
+            os.makedirs(target, exist_ok=True)
+            # 메타 파일을 마지막에 옮겨 중간에 죽어도 다음 시작에서 이어서 옮김
+            for file_name in files:
+                if os.path.exists(os.path.join(self.root, file_name)):
+                    os.replace(os.path.join(self.root, file_name), os.path.join(target, file_name))
+            logger.info(f"Vector index moved to {target}")
+
+    def _append_rows(self, job_id, digest, chunks):
+        self._remove(job_id)
+        rows = list(range(len(self.ids), len(self.ids) + len(chunks)))
+        for chunk_no, start_ms, end_ms, text in chunks:
+            self.ids.append([job_id, chunk_no, start_ms, end_ms, text])
+        self.alive.extend(b"\x01" * len(chunks))
+        self.jobs[job_id] = digest
+        self.job_rows[job_id] = rows
+
+    def load(self):
+        if not os.path.exists(self._path("meta.json")):
+            if os.path.exists(self._path("ids.json")):
+                self._load_legacy()
+            return
+        with open(self._path("meta.json")) as f:
+            meta = json.load(f)
+        # 디렉터리 이름 치환이 겹친 경우 (다른 모델의 행을 섞지 않도록 실패)
+        if meta["embedder"] != self.embedder.name:
+            raise ValueError(
+                f"{self.directory} holds a vector index built with {meta['embedder']}, not {self.embedder.name}"
+            )
+        # 마지막 줄이 중간에 끊겼으면(저장 중 종료) 그 앞까지만 사용
+        good_bytes = 0
+        with open(self._path("chunks.jsonl"), "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                self._append_rows(entry["job"], entry["hash"], entry["chunks"])
+                good_bytes += len(line)
+        rows = len(self.ids)
+        # 행렬을 먼저 쓰고 줄을 나중에 쓰므로 남는 행은 기록되지 않은 것 -> 잘라냄
+        row_bytes = 4 * self.embedder.dim
+        if os.path.getsize(self._path("vectors.f32")) < rows * row_bytes:
+            raise ValueError(f"{self._path('vectors.f32')} is shorter than chunks.jsonl")
+        os.truncate(self._path("vectors.f32"), rows * row_bytes)
+        os.truncate(self._path("chunks.jsonl"), good_bytes)
+        self.saved_rows = rows
+        self.blocks = [self._read_matrix(rows)] if rows else []
+        logger.info(f"Vector index loaded: {rows} chunks, {len(self.jobs)} jobs")
+
+    def _read_matrix(self, rows):
+        path = self._path("vectors.f32")
+        if self.mmap:
+            return np.memmap(path, dtype=np.float32, mode="r", shape=(rows, self.embedder.dim))
+        return np.fromfile(path, dtype=np.float32, count=rows * self.embedder.dim).reshape(
+            rows, self.embedder.dim
+        )
+
+    # 이전 형식(vectors.npy + ids.json)은 새 형식으로 한 번 변환
+    def _load_legacy(self):
+        with open(self._path("ids.json")) as f:
+            meta = json.load(f)
+        # 디렉터리 이름 치환이 겹친 경우 (다른 모델의 행을 섞지 않도록 실패)
+        if meta["embedder"] != self.embedder.name:
+            raise ValueError(
+                f"{self.directory} holds a vector index built with {meta['embedder']}, not {self.embedder.name}"
+            )
+        matrix = np.load(self._path("vectors.npy"))
+        for job_id, digest in meta["jobs"].items():
+            self.jobs[job_id] = digest
+            self.job_rows[job_id] = []
+        for row, item in enumerate(meta["ids"]):
+            self.ids.append(item)
+            self.job_rows.setdefault(item[0], []).append(row)
+        self.alive = bytearray(b"\x01" * len(self.ids))
+        self.pending = [matrix]
+        self.save(compact=True)
+        os.remove(self._path("ids.json"))
+        os.remove(self._path("vectors.npy"))
+        logger.info(f"Vector index converted: {len(self.ids)} chunks, {len(self.jobs)} jobs")
+
+    def save(self, compact=None):
+        with self._lock:
+            dead = self.alive.count(0)
+            if compact is None:
+                compact = dead > max(self.save_rows, self.compact_ratio * len(self.alive))
+            if compact:
+                self._compact()
+                return
+            # 행렬을 먼저 덧붙이고 메타데이터 줄을 덧붙임 (중간에 죽으면 load에서 남는 행을 잘라냄)
+            with open(self._path("vectors.f32"), "ab") as f:
+                for block in self.pending:
+                    f.write(np.ascontiguousarray(block, dtype=np.float32).tobytes())
+            with open(self._path("chunks.jsonl"), "a", encoding="utf-8") as f:
+                for entry in self.pending_jobs:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._write_meta()
+            self.saved_rows = len(self.ids)
+            if self.mmap:
+                self.blocks = [self._read_matrix(self.saved_rows)] if self.saved_rows else []
+            else:
+                self.blocks.extend(self.pending)
+                # 작은 블록이 너무 많아지면 하나로 합침 (검색 시 블록별 오버헤드)
+                if len(self.blocks) > MAX_MEMORY_BLOCKS:
+                    self.blocks = [np.concatenate(self.blocks)]
+            self.pending = []
+            self.pending_jobs = []
+
+    def _write_meta(self):
+        if os.path.exists(self._path("meta.json")):
+            return
+        with open(self._path("meta.json"), "w") as f:
+            json.dump({"embedder": self.embedder.name, "dim": self.embedder.dim}, f)
+
+    # 살아 있는 행만 작업별로 모아 다시 씀
+    def _compact(self):
+        rows = [self.job_rows[job_id] for job_id in self.jobs]
+        order = np.fromiter((row for job in rows for row in job), dtype=np.int64)
+        tmp_vectors = self._path("vectors.f32.tmp")
+        with open(tmp_vectors, "wb") as f:
+            for start in range(0, len(order), SEARCH_BLOCK_ROWS):
+                f.write(self._gather(order[start:start + SEARCH_BLOCK_ROWS]).tobytes())
+        tmp_chunks = self._path("chunks.jsonl.tmp")
+        with open(tmp_chunks, "w", encoding="utf-8") as f:
+            for job_id, job in zip(self.jobs, rows):
+                chunks = [self.ids[row][1:] for row in job]
+                f.write(json.dumps({"job": job_id, "hash": self.jobs[job_id], "chunks": chunks}, ensure_ascii=False) + "\n")
+        ids = [self.ids[row] for row in order]
+        jobs = dict(self.jobs)
+        self.blocks = []
+        os.replace(tmp_vectors, self._path("vectors.f32"))
+        os.replace(tmp_chunks, self._path("chunks.jsonl"))
+        self._write_meta()
+        self.ids, self.alive, self.jobs, self.job_rows = [], bytearray(), {}, {}
+        offset = 0
+        for job_id, job in zip(jobs, rows):
+            self.ids.extend(ids[offset:offset + len(job)])
+            self.job_rows[job_id] = list(range(offset, offset + len(job)))
+            offset += len(job)
+        self.jobs = jobs
+        self.alive = bytearray(b"\x01" * len(self.ids))
+        self.saved_rows = len(self.ids)
+        self.blocks = [self._read_matrix(self.saved_rows)] if self.saved_rows else []
+        self.pending = []
+        self.pending_jobs = []
+
+    # 행 번호 목록 -> (n, dim) (저장된 블록과 미저장 블록에 걸쳐 있을 수 있음)
+    def _gather(self, rows):
+        out = np.empty((len(rows), self.embedder.dim), dtype=np.float32)
+        offset = 0
+        for block in self.blocks + self.pending:
+            selected = (rows >= offset) & (rows < offset + len(block))
+            if selected.any():
+                out[selected] = block[rows[selected] - offset]
+            offset += len(block)
+        return out
+
+    # (시작 행 번호, 행렬 조각) 목록: 저장된 블록 -> 미저장 블록 순서
+    def _slabs(self):
+        slabs = []
+        offset = 0
+        for block in self.blocks + self.pending:
+            for start in range(0, len(block), SEARCH_BLOCK_ROWS):
+                slabs.append((offset + start, block[start:start + SEARCH_BLOCK_ROWS]))
+            offset += len(block)
+        return slabs
+
+    # 완료된 트랜스크립트를 청크 단위로 임베딩해 추가 (내용이 같으면 건너뜀)
+    def index_transcript(self, job_id, turns):
+        chunks = chunk_turns(turns)
+        digest = hashlib.sha1(
+            "\n".join(chunk["text"] for chunk in chunks).encode("utf-8")
+        ).hexdigest()
+        with self._lock:
+            if self.jobs.get(job_id) == digest:
+                return False
+        vectors = self.embedder.embed([chunk["text"] for chunk in chunks]) if chunks else None
+        with self._lock:
+            entry = [[i, c["start_ms"], c["end_ms"], c["text"]] for i, c in enumerate(chunks)]
+            if vectors is not None:
+                self.pending.append(vectors.astype(np.float32))
+            self._append_rows(job_id, digest, entry)
+            self.pending_jobs.append({"job": job_id, "hash": digest, "chunks": entry})
+            if sum(len(block) for block in self.pending) >= self.save_rows:
+                self.save()
+        return True
+
+    def flush(self):
+        with self._lock:
+            if self.pending_jobs:
+                self.save()
+
+    def _remove(self, job_id):
+        for row in self.job_rows.pop(job_id, ()):
+            self.alive[row] = 0
+        self.jobs.pop(job_id, None)
+
+    # 질의 목록 -> 질의별 top-k 청크 (코사인 유사도)
+    # 블록마다 top-k 후보를 구한 뒤 합쳐서 다시 top-k
+    def search(self, queries, k=5, job_ids=None):
+        if not queries:
+            return []
+        query_vectors = self.embedder.embed(queries)
+        with self._lock:
+            slabs = self._slabs()
+            # 행은 덧붙이기만 하고 compaction은 새 리스트로 바꾸므로 복사 없이 참조
+            ids = self.ids
+            if job_ids:
+                mask = np.zeros(len(ids), dtype=bool)
+                for job_id in set(job_ids):
+                    mask[self.job_rows.get(job_id, [])] = True
+                mask &= np.frombuffer(bytes(self.alive), dtype=bool)
+            else:
+                mask = np.frombuffer(bytes(self.alive), dtype=bool)
+        if not mask.any():
+            return [[] for _ in queries]
+        k = min(k, int(mask.sum()))
+
+        candidate_rows = []
+        candidate_scores = []
+        for offset, slab in slabs:
+            slab_mask = mask[offset:offset + len(slab)]
+            if not slab_mask.any():
+                continue
+            # (Q, dim) @ (dim, n) -> (Q, n), 임베딩은 정규화되어 있으므로 내적 = 코사인
+            scores = query_vectors @ slab.T
+            scores[:, ~slab_mask] = -np.inf
+            slab_k = min(k, len(slab))
+            top = np.argpartition(-scores, slab_k - 1, axis=1)[:, :slab_k]
+            candidate_scores.append(np.take_along_axis(scores, top, axis=1))
+            candidate_rows.append(top + offset)
+        scores = np.concatenate(candidate_scores, axis=1)
+        rows = np.concatenate(candidate_rows, axis=1)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(np.take_along_axis(rows, top, axis=1), order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        results = []
+        for rows, row_scores in zip(top, top_scores):
+            results.append([
+                {
+                    "job_id": ids[row][0],
+                    "chunk": ids[row][1],
+                    "start_ms": ids[row][2],
+                    "end_ms": ids[row][3],
+                    "text": ids[row][4],
+                    "score": float(score),
+                }
+                for row, score in zip(rows, row_scores)
+                if score > -np.inf
+            ])
+        return results
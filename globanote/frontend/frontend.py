@@ -8,11 +8,12 @@ import os
 from datetime import datetime
 from typing import List, Dict
 import io
-from pydub import AudioSegment
 import re
 import base64
 from dotenv import load_dotenv
 
+from transcript_view import transcript_markdown_lines
+
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -167,30 +168,15 @@ def check_job_status(job_id):
 
 # 트랜스크립트 표시 함수 (시간 순서 & 화자별 출력)
 def show_transcript_formatted(transcript: str):
-    lines = transcript.split("\n")
-    for line in lines:
-        if line.strip():
-            # [화자N] (00:00~00:03) 텍스트
-            match = re.match(r"\[화자(\d+)\] \((\d{2}:\d{2}~\d{2}:\d{2})\) (.+)", line)
-            if match:
-                speaker_num = match.group(1)
-                time_range = match.group(2)
-                text = match.group(3)
-                st.markdown(f"<div style='margin-bottom: 10px;'><strong>[화자{speaker_num}]</strong> <span style='color:gray'>({time_range})</span> {text}</div>", unsafe_allow_html=True)
-            else:
-                # 이전 방식 호환: [spk_0] 또는 [speaker_0] 등
-                speaker_match = re.search(r"\[(spk_(\d+)|speaker_(\d+))\]", line)
-                if speaker_match:
-                    speaker_num = int(speaker_match.group(2) or speaker_match.group(3)) + 1
-                    speaker_label = f"[화자{speaker_num}]"
-                    text = re.sub(r"\[spk_\d+\]|\[speaker_\d+\]", "", line).strip()
-                    st.markdown(f"<div style='margin-bottom: 10px;'><strong>{speaker_label}</strong> {text}</div>", unsafe_allow_html=True)
-                else:
-                    st.markdown(line)
+    for markdown, unsafe_allow_html in transcript_markdown_lines(transcript):
+        st.markdown(markdown, unsafe_allow_html=unsafe_allow_html)
 
 # WAV를 MP3로 변환하는 함수
 def convert_wav_to_mp3(wav_data, output_filename):
     try:
+        # pydub은 녹음 변환에만 필요하므로 처음 쓸 때 import (앱 시작 시간에서 제외)
+        from pydub import AudioSegment
+
         temp_wav_filename = f"temp_{uuid.uuid4()}.wav"
         with open(temp_wav_filename, "wb") as f:
             f.write(wav_data)
@@ -0,0 +1,36 @@
+import re
+
+# 트랜스크립트 텍스트 -> 화면 표시용 markdown (streamlit 없이 사용 가능)
+
+TURN_LINE_RE = re.compile(r"\[화자(\d+)\] \((\d{2}:\d{2}~\d{2}:\d{2})\) (.+)")
+LEGACY_SPEAKER_RE = re.compile(r"\[(spk_(\d+)|speaker_(\d+))\]")
+LEGACY_SPEAKER_SUB_RE = re.compile(r"\[spk_\d+\]|\[speaker_\d+\]")
+
+
+# 줄마다 (markdown, unsafe_allow_html) 반환
+def transcript_markdown_lines(transcript: str):
+    lines = []
+    for line in transcript.split("\n"):
+        if not line.strip():
+            continue
+        # [화자N] (00:00~00:03) 텍스트
+        match = TURN_LINE_RE.match(line)
+        if match:
+            speaker_num, time_range, text = match.groups()
+            lines.append((
+                f"<div style='margin-bottom: 10px;'><strong>[화자{speaker_num}]</strong> <span style='color:gray'>({time_range})</span> {text}</div>",
+                True,
+            ))
+            continue
+        # 이전 방식 호환: [spk_0] 또는 [speaker_0] 등
+        speaker_match = LEGACY_SPEAKER_RE.search(line)
+        if speaker_match:
+            speaker_num = int(speaker_match.group(2) or speaker_match.group(3)) + 1
+            text = LEGACY_SPEAKER_SUB_RE.sub("", line).strip()
+            lines.append((
+                f"<div style='margin-bottom: 10px;'><strong>[화자{speaker_num}]</strong> {text}</div>",
+                True,
+            ))
+        else:
+            lines.append((line, False))
+    return lines